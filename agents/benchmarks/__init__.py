@@ -0,0 +1 @@
+"""Teko Agent Benchmarks Package"""
@@ -0,0 +1,107 @@
+"""
+Agent Creation Benchmark
+
+Creates many AI-enabled CodebaseAnalysisAgents through
+Orchestrator.create_agent, once with every agent owning its own clients
+(an unshared client registry, the previous behavior) and once sharing
+clients through the process-wide registry. Each mode runs in a fresh child
+process; the benchmark reports the time and peak memory per agent.
+
+No requests are sent, but the OpenAI clients need an API key to be
+constructed; a placeholder is used if OPENAI_API_KEY is not set.
+
+Usage:
+    python -m agents.benchmarks.agent_creation --agents 200
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+import warnings
+from typing import Tuple
+
+
+def _create_agents(num_agents: int, shared: bool, data_dir: str, results) -> None:
+    """Child process body: create the agents and report elapsed time and RSS growth."""
+    from agents.core.client_registry import ClientRegistry, get_client_registry, set_client_registry
+    from agents.core.orchestrator import Orchestrator
+    from agents.implementations.codebase_analysis_agent import CodebaseAnalysisAgent
+
+    warnings.simplefilter("ignore")
+    logging.getLogger("teko").setLevel(logging.WARNING)
+    if not shared:
+        set_client_registry(ClientRegistry(shared=False))
+
+    config = {
+        "response_cache_path": os.path.join(data_dir, "llm_cache.sqlite3"),
+        "embedding_cache_path": os.path.join(data_dir, "embedding_cache"),
+    }
+    orchestrator = Orchestrator()
+    orchestrator.register_agent_class("codebase_analysis", CodebaseAnalysisAgent)
+
+    # Create one agent first so imports and lazy module state are not measured
+    orchestrator.create_agent("codebase_analysis", "warmup", config)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    try:
+        start = time.perf_counter()
+        for i in range(num_agents):
+            orchestrator.create_agent("codebase_analysis", f"agent-{i:04d}", config)
+        elapsed = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    clients = sum(get_client_registry().stats().values())
+    orchestrator.close()
+    results.put((elapsed, rss_kb, clients))
+
+
+def measure(num_agents: int, shared: bool) -> Tuple[float, int, int]:
+    """
+    Create agents in a fresh process.
+
+    Args:
+        num_agents: Number of agents to create
+        shared: Share clients through the registry
+
+    Returns:
+        Tuple of (elapsed seconds, peak RSS growth in kilobytes, live clients)
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    with tempfile.TemporaryDirectory() as data_dir:
+        process = context.Process(
+            target=_create_agents, args=(num_agents, shared, data_dir, results)
+        )
+        process.start()
+        result = results.get()
+        process.join()
+    return result
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--agents", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+    print(f"{'clients':>9} {'ms/agent':>9} {'KB/agent':>9} {'live clients':>13}")
+    for shared in (False, True):
+        elapsed, rss_kb, clients = measure(args.agents, shared)
+        print(
+            f"{'shared' if shared else 'owned':>9} {elapsed / args.agents * 1000:>9.2f} "
+            f"{rss_kb / args.agents:>9.1f} {clients:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Agent Routing Benchmark
+
+Compares the cost of picking an agent for a task with the original linear
+scan over every registered agent against the Orchestrator's task type index,
+for 10, 100 and 1000 registered agents spread over several task types.
+
+Usage:
+    python -m agents.benchmarks.agent_routing --lookups 20000
+"""
+
+import argparse
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from agents.core.base_agent import BaseAgent
+from agents.core.orchestrator import Orchestrator
+
+TASK_TYPES = [f"analysis_{i}" for i in range(10)]
+
+
+class TypedAgent(BaseAgent):
+    """Agent that handles a single task type for a single repository."""
+
+    def __init__(self, name: str, agent_type: str, config: Optional[Dict[str, Any]] = None):
+        super().__init__(name, agent_type, config)
+        self.handled_task_types = (self.config["task_type"],)
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        task_type = task.get("type", "").lower()
+        return task_type == self.config["task_type"] and "repository_id" in task
+
+
+def linear_scan(orchestrator: Orchestrator, task: Dict[str, Any]) -> Optional[BaseAgent]:
+    """The original routing loop: ask every registered agent in turn."""
+    for agent in orchestrator.agents.values():
+        if agent.can_handle_task(task):
+            return agent
+    return None
+
+
+def indexed(orchestrator: Orchestrator, task: Dict[str, Any]) -> Optional[BaseAgent]:
+    """Indexed routing, releasing the agent so every lookup sees the same load."""
+    agent = orchestrator._find_agent_for_task(task)
+    if agent is not None:
+        orchestrator._release_agent(agent)
+    return agent
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    logging.getLogger("teko").setLevel(logging.WARNING)
+
+    print(f"{'agents':>8} {'linear us/task':>16} {'indexed us/task':>16}")
+    for num_agents in (10, 100, 1000):
+        orchestrator = Orchestrator()
+        orchestrator.register_agent_class("typed", TypedAgent)
+        for i in range(num_agents):
+            # Agents are registered in blocks per type, as they are created per language
+            task_type = TASK_TYPES[i * len(TASK_TYPES) // num_agents]
+            orchestrator.create_agent("typed", f"agent_{i}", {"task_type": task_type})
+
+        # Route tasks for the type registered last, the worst case for a scan
+        task = {"type": TASK_TYPES[-1], "repository_id": "repo"}
+        timings = []
+        for router in (linear_scan, indexed):
+            start = time.perf_counter()
+            for _ in range(args.lookups):
+                router(orchestrator, task)
+            timings.append((time.perf_counter() - start) / args.lookups * 1e6)
+
+        print(f"{num_agents:>8} {timings[0]:>16.2f} {timings[1]:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
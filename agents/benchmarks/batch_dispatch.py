@@ -0,0 +1,89 @@
+"""
+Batch Dispatch Benchmark
+
+Runs CodebaseAnalysisAgent tasks whose AI insights come from a local fake
+LLM with artificial latency, and compares one task per dispatch with the
+orchestrator coalescing queued tasks into batches that share one batched
+LLM round per batch.
+
+Usage:
+    python -m agents.benchmarks.batch_dispatch --tasks 200 --batch-size 16
+"""
+
+import argparse
+import logging
+import time
+
+from agents.benchmarks.async_throughput import FakeLatencyLLM
+from agents.core.langchain_wrapper import TekoChatModel
+from agents.core.orchestrator import Orchestrator
+from agents.implementations.codebase_analysis_agent import CodebaseAnalysisAgent
+
+
+def run(num_tasks: int, latency: float, workers: int, batch_size: int) -> float:
+    """
+    Process analysis tasks and return the observed throughput.
+
+    Args:
+        num_tasks: Number of tasks to process
+        latency: Fake LLM latency in seconds
+        workers: Worker threads
+        batch_size: Maximum number of tasks dispatched to the agent at once
+
+    Returns:
+        Throughput in tasks per second
+    """
+    orchestrator = Orchestrator(max_workers=workers, batch_size=batch_size)
+    orchestrator.register_agent_class("codebase_analysis", CodebaseAnalysisAgent)
+    agent = orchestrator.create_agent("codebase_analysis", "analyzer", {"ai_enabled": False})
+    assert isinstance(agent, CodebaseAnalysisAgent)
+
+    # Enable AI insights against the fake LLM without touching OpenAI or Chroma
+    agent.ai_enabled = True
+    agent.chat_model = TekoChatModel(llm=FakeLatencyLLM(latency=latency))
+
+    orchestrator.add_tasks(
+        [
+            {
+                "id": i,
+                "type": "codebase_analysis",
+                "repository_id": f"repo-{i}",
+                "file_paths": ["app.py", "models.py"],
+                "file_contents": {
+                    "app.py": f"import flask  # {i}\n",
+                    "models.py": "class A: pass\n",
+                },
+            }
+            for i in range(num_tasks)
+        ]
+    )
+
+    start = time.perf_counter()
+    orchestrator.start()
+    orchestrator.stop(drain=True, timeout=600)
+    elapsed = time.perf_counter() - start
+
+    assert orchestrator.tasks_succeeded == num_tasks
+    return num_tasks / elapsed
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+    logging.getLogger("teko").setLevel(logging.WARNING)
+
+    for batch_size in (1, args.batch_size):
+        rate = run(args.tasks, args.latency, args.workers, batch_size)
+        print(
+            f"batch size {batch_size:>3}: {rate:8.1f} tasks/s "
+            f"({args.workers} workers, {args.latency}s LLM)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Daemon Latency Benchmark
+
+Compares the latency of running one codebase analysis task three ways:
+
+    cold spawn       a fresh Python process per task, as scripts/run-agent.sh
+                     used to do: imports, agent and client setup, then the task
+    daemon (CLI)     "python -m agents.daemon submit" against a running daemon,
+                     i.e. a small client process per task
+    daemon (socket)  a task sent over an open connection to the daemon, as a
+                     resident caller such as the Laravel application would
+
+Agents are AI-enabled so their LLM, embedding and Chroma clients are built,
+but the benchmark repository only holds plain text files, so no primary
+language is found and no LLM request is sent. The OpenAI clients need an API
+key to be constructed; a placeholder is used if OPENAI_API_KEY is not set.
+
+Usage:
+    python -m agents.benchmarks.daemon_latency --runs 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from agents.daemon import DaemonClient
+
+# Repository root, so child processes can import the agents package
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLD_SPAWN = """
+import json, sys
+from agents.daemon import build_orchestrator
+
+config, task = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+orchestrator = build_orchestrator({"codebase_analysis": 1}, config)
+orchestrator.start()
+result = orchestrator.submit(task).result()
+orchestrator.close()
+print(json.dumps(result, default=str))
+"""
+
+
+def build_repository(path: str, num_files: int) -> None:
+    """
+    Write a small repository of plain text files.
+
+    Args:
+        path: Directory to create the files in
+        num_files: Number of files to write
+    """
+    for i in range(num_files):
+        with open(os.path.join(path, f"notes_{i}.txt"), "w", encoding="utf-8") as handle:
+            handle.write(f"note {i}\n" * 20)
+
+
+def time_runs(runs: int, run: Callable[[int], Any]) -> List[float]:
+    """
+    Time several calls of a task runner.
+
+    Args:
+        runs: Number of calls
+        run: Runs the task with the given run number
+
+    Returns:
+        Elapsed seconds of each call
+    """
+    elapsed = []
+    for i in range(runs):
+        start = time.perf_counter()
+        run(i)
+        elapsed.append(time.perf_counter() - start)
+    return elapsed
+
+
+def wait_for_daemon(socket_path: str, timeout: float = 120.0) -> None:
+    """Wait until the daemon answers a ping."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with DaemonClient(socket_path) as client:
+                client.request({"op": "ping"})
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger("teko").setLevel(logging.WARNING)
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONWARNINGS="ignore")
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        repository = os.path.join(work_dir, "repository")
+        os.makedirs(repository)
+        build_repository(repository, args.files)
+
+        config_path = os.path.join(work_dir, "agents.json")
+        config: Dict[str, Any] = {
+            "response_cache_path": os.path.join(work_dir, "llm_cache.sqlite3"),
+            "embedding_cache_path": os.path.join(work_dir, "embedding_cache"),
+        }
+        with open(config_path, "w", encoding="utf-8") as handle:
+            json.dump(config, handle)
+
+        def task(run: int) -> Dict[str, Any]:
+            # A new repository id per run, so no run reuses another's analysis state
+            return {
+                "type": "codebase_analysis",
+                "repository_id": f"benchmark-{run}-{time.monotonic_ns()}",
+                "repository_path": repository,
+            }
+
+        def cold_spawn(run: int) -> None:
+            subprocess.run(
+                [sys.executable, "-c", COLD_SPAWN, json.dumps(config), json.dumps(task(run))],
+                cwd=work_dir,
+                env=env,
+                check=True,
+                capture_output=True,
+            )
+
+        socket_path = os.path.join(work_dir, "agents.sock")
+        daemon_args = [sys.executable, "-m", "agents.daemon", "--socket", socket_path]
+
+        def cli_submit(run: int) -> None:
+            subprocess.run(
+                [*daemon_args, "submit", json.dumps(task(run))],
+                cwd=work_dir,
+                env=env,
+                check=True,
+                capture_output=True,
+            )
+
+        results = {"cold spawn": time_runs(args.runs, cold_spawn)}
+
+        daemon = subprocess.Popen(
+            [*daemon_args, "serve", "--config", config_path],
+            cwd=work_dir,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_daemon(socket_path)
+            results["daemon (CLI)"] = time_runs(args.runs, cli_submit)
+            with DaemonClient(socket_path) as client:
+                results["daemon (socket)"] = time_runs(
+                    args.runs, lambda run: client.submit(task(run))
+                )
+        finally:
+            daemon.terminate()
+            daemon.wait(timeout=30)
+
+    cold = statistics.median(results["cold spawn"])
+    print(f"{'mode':<16} {'median ms':>10} {'min ms':>9} {'speedup':>8}")
+    for mode, elapsed in results.items():
+        median = statistics.median(elapsed)
+        print(
+            f"{mode:<16} {median * 1000:>10.1f} {min(elapsed) * 1000:>9.1f} "
+            f"{cold / median:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
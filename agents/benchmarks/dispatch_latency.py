@@ -0,0 +1,89 @@
+"""
+Task Dispatch Latency Benchmark
+
+Measures the time between Orchestrator.add_task and the moment an agent
+starts processing the task, both for an idle orchestrator (tasks arrive one
+at a time) and a loaded one (a burst of tasks shared by several workers).
+
+Usage:
+    python -m agents.benchmarks.dispatch_latency --tasks 500
+"""
+
+import argparse
+import statistics
+import time
+from typing import Any, Dict, List
+
+from agents.core.base_agent import BaseAgent
+from agents.core.orchestrator import Orchestrator
+
+
+class LatencyAgent(BaseAgent):
+    """Agent that records how long each task waited before it started."""
+
+    def __init__(self, name: str, agent_type: str, config=None):
+        super().__init__(name, agent_type, config)
+        self.latencies: List[float] = []
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        self.latencies.append(time.time() - task["added_time"])
+        if task.get("work"):
+            time.sleep(task["work"])
+        return {}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return bool(task.get("type") == "latency")
+
+
+def _summarize(label: str, latencies: List[float]) -> None:
+    """Print latency percentiles in milliseconds."""
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{label:>8}: n={len(ordered)} "
+        f"p50={statistics.median(ordered) * 1000:.3f}ms "
+        f"p99={p99 * 1000:.3f}ms max={ordered[-1] * 1000:.3f}ms"
+    )
+
+
+def run(num_tasks: int, workers: int, interval: float, work: float) -> List[float]:
+    """
+    Submit tasks to a running orchestrator and collect their dispatch latency.
+
+    Args:
+        num_tasks: Number of tasks to submit
+        workers: Number of orchestrator worker threads
+        interval: Pause between submissions in seconds (0 for a burst)
+        work: Simulated processing time per task in seconds
+
+    Returns:
+        List of enqueue-to-start latencies in seconds
+    """
+    orchestrator = Orchestrator(max_workers=workers)
+    orchestrator.register_agent_class("latency", LatencyAgent)
+    agent = orchestrator.create_agent("latency", "latency_agent")
+    orchestrator.start()
+
+    for i in range(num_tasks):
+        orchestrator.add_task({"id": i, "type": "latency", "work": work})
+        if interval:
+            time.sleep(interval)
+
+    orchestrator.stop(drain=True)
+    assert isinstance(agent, LatencyAgent)
+    return agent.latencies
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    _summarize("idle", run(args.tasks, args.workers, interval=0.002, work=0.0))
+    _summarize("loaded", run(args.tasks, args.workers, interval=0.0, work=0.001))
+
+
+if __name__ == "__main__":
+    main()
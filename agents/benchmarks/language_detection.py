@@ -0,0 +1,85 @@
+"""
+Language Detection Benchmark
+
+Classifies a large synthetic list of paths with the original extension scan
+(os.path.splitext plus a search through every language's extension list)
+and with the LanguageIndex used by analyze_file_extensions, checks that
+both give the same counts and reports the time per path.
+
+Usage:
+    python -m agents.benchmarks.language_detection --paths 2000000
+"""
+
+import argparse
+import logging
+import os
+import random
+import time
+from typing import Dict, List
+
+from agents.implementations.codebase_analysis_agent import CodebaseAnalysisAgent
+
+EXTENSIONS = [".py", ".js", ".ts", ".php", ".java", ".go", ".css", ".html", ".md", ".json", ""]
+
+
+def build_paths(num_paths: int) -> List[str]:
+    """
+    Generate synthetic repository paths with a mix of known and unknown extensions.
+
+    Args:
+        num_paths: Number of paths to generate
+
+    Returns:
+        List of paths
+    """
+    rng = random.Random(42)
+    return [
+        f"src/pkg_{rng.randrange(100)}/module_{i}{rng.choice(EXTENSIONS)}" for i in range(num_paths)
+    ]
+
+
+def legacy_counts(language_extensions: Dict[str, List[str]], paths: List[str]) -> Dict[str, int]:
+    """The original per-path scan of the extension lists."""
+    counts: Dict[str, int] = {}
+    for path in paths:
+        ext = os.path.splitext(path)[1].lower()
+        if not ext:
+            continue
+        for language, extensions in language_extensions.items():
+            if ext in extensions:
+                counts[language] = counts.get(language, 0) + 1
+                break
+    return counts
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--paths", type=int, default=2000000)
+    args = parser.parse_args()
+
+    logging.getLogger("teko").setLevel(logging.WARNING)
+    paths = build_paths(args.paths)
+    agent = CodebaseAnalysisAgent(name="benchmark", config={"ai_enabled": False})
+
+    start = time.perf_counter()
+    expected = legacy_counts(agent.language_extensions, paths)
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counts = agent.analyze_file_extensions(paths)
+    index_elapsed = time.perf_counter() - start
+
+    assert counts == expected, "index results differ from the extension scan"
+
+    per_path = 1e9 / len(paths)
+    print(f"paths: {len(paths)}")
+    print(f"extension scan: {legacy_elapsed:7.3f}s ({legacy_elapsed * per_path:6.0f} ns/path)")
+    print(
+        f"language index: {index_elapsed:7.3f}s ({index_elapsed * per_path:6.0f} ns/path, "
+        f"{legacy_elapsed / index_elapsed:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
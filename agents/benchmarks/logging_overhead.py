@@ -0,0 +1,112 @@
+"""
+Logging Overhead Benchmark
+
+Measures the time per trivial task through a running orchestrator with INFO
+logging written to a file three ways: by a plain FileHandler on the worker
+threads (what logging.basicConfig set up), through the queue pipeline with
+buffered writes, and through the pipeline with its default rate limit.
+
+Usage:
+    python -m agents.benchmarks.logging_overhead --tasks 20000
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+from agents.core.base_agent import BaseAgent
+from agents.core.logging_setup import BufferedStreamHandler, LogPipeline, StructuredFormatter
+from agents.core.orchestrator import Orchestrator
+
+
+class NoopAgent(BaseAgent):
+    """Agent that returns immediately, so dispatch and logging dominate."""
+
+    handled_task_types = ("noop",)
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        self.update_status("working")
+        self.update_status("completed")
+        return {}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return True
+
+
+def dispatch(num_tasks: int) -> float:
+    """
+    Time trivial tasks through a running orchestrator.
+
+    Args:
+        num_tasks: Number of tasks to run
+
+    Returns:
+        Seconds per task
+    """
+    orchestrator = Orchestrator(poll_timeout=0.1)
+    orchestrator.register_agent_class("noop", NoopAgent)
+    orchestrator.create_agent("noop", "noop")
+
+    start = time.perf_counter()
+    for i in range(num_tasks):
+        orchestrator.add_task({"id": i, "type": "noop"})
+    orchestrator.start()
+    orchestrator.stop(drain=True, timeout=600)
+    elapsed = time.perf_counter() - start
+    orchestrator.close()
+    return elapsed / num_tasks
+
+
+def with_handler(
+    handler: logging.Handler, install: Callable[[logging.Logger, logging.Handler], Any]
+) -> Any:
+    """Route the teko loggers to a handler through an installer."""
+    logger = logging.getLogger("teko")
+    logger.handlers = []
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler.setFormatter(StructuredFormatter())
+    return install(logger, handler)
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "agents.log")
+        logger = logging.getLogger("teko")
+
+        handler = logging.FileHandler(path)
+        with_handler(handler, lambda logger, handler: logger.addHandler(handler))
+        direct = dispatch(args.tasks)
+        logger.removeHandler(handler)
+        handler.close()
+
+        results = {"file handler": direct}
+        for label, rate in (("queue pipeline", None), ("queue + rate limit", 100.0)):
+            with open(path, "a", encoding="utf-8") as stream:
+                pipeline = with_handler(
+                    BufferedStreamHandler(stream),
+                    lambda logger, handler: LogPipeline([handler], rate=rate),
+                )
+                pipeline.attach(logger)
+                pipeline.start()
+                results[label] = dispatch(args.tasks)
+                pipeline.stop()
+                pipeline.detach(logger)
+
+    for label, seconds in results.items():
+        print(
+            f"{label:<20} {seconds * 1e6:7.2f} us/task "
+            f"({(seconds - direct) / direct * 100:+.1f}%)"
+        )
+
+
+if __name__ == "__main__":
+    main()
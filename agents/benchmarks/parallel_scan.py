@@ -0,0 +1,69 @@
+"""
+Parallel Scanning Benchmark
+
+Analyzes a synthetic in-memory repository with the CodebaseAnalysisAgent
+using 1, 2, 4 and 8 scan workers, checks that every worker count gives the
+same results as the sequential scan, and reports the speedup. Each pool is
+warmed up with one analysis before timing so process startup is excluded.
+
+Usage:
+    python -m agents.benchmarks.parallel_scan --files 100000 --workers 1 2 4 8
+"""
+
+import argparse
+import logging
+import os
+import time
+from typing import Any, Dict
+
+from agents.benchmarks.framework_detection import build_corpus
+from agents.implementations.codebase_analysis_agent import CodebaseAnalysisAgent
+
+
+def analyze(agent: CodebaseAnalysisAgent, corpus: Dict[str, str]) -> Dict[str, Any]:
+    """Run one full (non-incremental) analysis of the corpus."""
+    result = agent.process_task(
+        {"type": "codebase_analysis", "file_paths": list(corpus), "file_contents": corpus}
+    )
+    result.pop("timestamp")
+    return result
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger("teko").setLevel(logging.WARNING)
+    corpus = build_corpus(args.files, args.words)
+    print(f"files: {len(corpus)}, cpus: {os.cpu_count()}")
+
+    baseline = None
+    expected = None
+    for workers in args.workers:
+        agent = CodebaseAnalysisAgent(
+            name="benchmark",
+            config={"ai_enabled": False, "scan_workers": workers, "parallel_scan_min_files": 1},
+        )
+        result = analyze(agent, corpus)
+        if expected is None:
+            expected = result
+        assert result == expected, f"results with {workers} workers differ"
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            analyze(agent, corpus)
+        elapsed = (time.perf_counter() - start) / args.rounds
+
+        baseline = baseline or elapsed
+        print(f"workers: {workers:2d}  {elapsed:8.3f}s  speedup {baseline / elapsed:5.2f}x")
+        if agent._parallel_scanner is not None:
+            agent._parallel_scanner.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Task Queue Backend Benchmark
+
+Measures enqueue and dequeue throughput of the in-memory and SQLite queue
+backends, one task at a time and in batches, for increasing queue sizes.
+
+Usage:
+    python -m agents.benchmarks.queue_backends --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+from agents.core.queue_backends import MemoryQueueBackend, QueueBackend, SQLiteQueueBackend
+
+
+def measure(backend: QueueBackend, num_tasks: int, batch_size: int) -> Tuple[float, float]:
+    """
+    Enqueue and then dequeue/acknowledge num_tasks tasks.
+
+    Args:
+        backend: The backend to measure
+        num_tasks: Number of tasks to move through the queue
+        batch_size: Tasks per put_many/get_many call (1 for single operations)
+
+    Returns:
+        Tuple of (enqueue tasks/s, dequeue tasks/s)
+    """
+    tasks = [{"id": i, "type": "codebase_analysis", "repository_id": i} for i in range(num_tasks)]
+
+    start = time.perf_counter()
+    if batch_size == 1:
+        for task in tasks:
+            backend.put(task, task["id"] % 3)
+    else:
+        for offset in range(0, num_tasks, batch_size):
+            backend.put_many(
+                [(task, task["id"] % 3) for task in tasks[offset : offset + batch_size]]
+            )
+    enqueue_elapsed = time.perf_counter() - start
+
+    ack_many = getattr(backend, "ack_many", None)
+    start = time.perf_counter()
+    received = 0
+    while received < num_tasks:
+        batch = backend.get_many(batch_size, block=False)
+        if ack_many is not None and batch_size > 1:
+            ack_many(batch)
+        else:
+            for task in batch:
+                backend.ack(task)
+        received += len(batch)
+    dequeue_elapsed = time.perf_counter() - start
+
+    return num_tasks / enqueue_elapsed, num_tasks / dequeue_elapsed
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends: List[Tuple[str, Callable[[str], QueueBackend]]] = [
+            ("memory", lambda path: MemoryQueueBackend()),
+            ("sqlite", lambda path: SQLiteQueueBackend(path)),
+        ]
+
+        print(f"{'backend':>8} {'tasks':>9} {'batch':>6} {'enqueue/s':>12} {'dequeue/s':>12}")
+        for size in args.sizes:
+            for name, factory in backends:
+                for batch_size in (1, args.batch_size):
+                    path = os.path.join(directory, f"{name}-{size}-{batch_size}.sqlite3")
+                    backend = factory(path)
+                    enqueue_rate, dequeue_rate = measure(backend, size, batch_size)
+                    backend.close()
+                    print(
+                        f"{name:>8} {size:>9} {batch_size:>6} "
+                        f"{enqueue_rate:>12.0f} {dequeue_rate:>12.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
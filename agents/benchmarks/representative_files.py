@@ -0,0 +1,127 @@
+"""
+Representative File Selection Benchmark
+
+Selects the representative files of a synthetic repository the way
+_select_representative_files used to (an extension scan of every path and a
+substring scan per priority pattern) and with the path index: the one-off
+index build, the update after a commit touching 100 paths, and selection
+with the index the agent keeps per repository.
+
+Usage:
+    python -m agents.benchmarks.representative_files --paths 500000
+"""
+
+import argparse
+import logging
+import time
+from typing import Dict, Mapping
+
+from agents.implementations.analysis_state import RepositoryAnalysisState
+from agents.implementations.codebase_analysis_agent import (
+    PRIORITY_PATTERNS,
+    CodebaseAnalysisAgent,
+)
+from agents.implementations.path_index import PathIndex
+
+
+def make_paths(num_paths: int) -> Dict[str, str]:
+    """
+    Build the contents of a synthetic Laravel-style repository.
+
+    Args:
+        num_paths: Number of files
+
+    Returns:
+        Dictionary mapping file paths to (empty) contents
+    """
+    extensions = (".php", ".php", ".js", ".css", ".md")
+    contents = {
+        f"vendor/package_{i % 2000}/src/Module{i % 97}/File{i}{extensions[i % 5]}": ""
+        for i in range(num_paths)
+    }
+    # The interesting files come last, as they would in a vendored checkout
+    for path in (
+        "app/Http/Controllers/HomeController.php",
+        "app/Models/User.php",
+        "routes/web.php",
+    ):
+        contents[path] = ""
+    return contents
+
+
+def legacy_select(
+    agent: CodebaseAnalysisAgent, file_contents: Mapping[str, str], language: str, max_files: int
+) -> Dict[str, str]:
+    """Select files like the original implementation: scan every path per step."""
+    extensions = agent.language_extensions.get(language, [])
+    language_files = [
+        path for path in file_contents if any(path.endswith(ext) for ext in extensions)
+    ]
+    selected: Dict[str, str] = {}
+    for pattern in PRIORITY_PATTERNS.get(language, []):
+        if len(selected) >= max_files:
+            break
+        for path in language_files:
+            if pattern in path and path not in selected:
+                selected[path] = file_contents[path]
+                break
+    for path in language_files:
+        if len(selected) >= max_files:
+            break
+        if path not in selected:
+            selected[path] = file_contents[path]
+    return selected
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--paths", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.getLogger("teko").setLevel(logging.WARNING)
+
+    contents = make_paths(args.paths)
+    agent = CodebaseAnalysisAgent("bench", config={"ai_enabled": False})
+    detect = agent._get_file_scanner().detect_language
+    path_languages = {path: detect(path) for path in contents}
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        legacy = legacy_select(agent, contents, "php", 5)
+    legacy_seconds = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    index = PathIndex(path_languages.items())
+    build_seconds = time.perf_counter() - start
+
+    # A commit removing 50 files and adding 50, as journaled by the analysis state
+    state = RepositoryAnalysisState()
+    for path, language in path_languages.items():
+        state.set_path(path, language)
+    version = state.paths_version
+    for i, path in enumerate(list(path_languages)[:50]):
+        state.remove_path(path)
+        state.set_path(f"app/Feature{i}/Handler.php", "php")
+    start = time.perf_counter()
+    index.updated(state.path_languages)
+    diff_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    index.updated(state.path_languages, state.paths_changed_since(version))
+    update_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        indexed = agent._select_representative_files(contents, "php", 5, path_index=index)
+    indexed_seconds = (time.perf_counter() - start) / args.repeat
+
+    print(f"{args.paths} paths")
+    print(f"  scan every path:  {legacy_seconds * 1000:10.2f} ms/call  {list(legacy)[:3]}")
+    print(f"  build path index: {build_seconds * 1000:10.2f} ms once")
+    print(f"  diff all paths:   {diff_seconds * 1000:10.2f} ms")
+    print(f"  update 100 paths: {update_seconds * 1000:10.2f} ms")
+    print(f"  indexed select:   {indexed_seconds * 1000:10.3f} ms/call  {list(indexed)[:3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Startup Time Benchmark
+
+Measures the orchestrator startup path in a fresh child process: importing
+agents.core.orchestrator, importing the CodebaseAnalysisAgent module,
+constructing agents through Orchestrator.create_agent with and without AI
+enabled, and the first use of an agent's chat model and vector store, which
+is where the LangChain and Chroma imports and the client construction now
+happen.
+
+No requests are sent, but the OpenAI clients need an API key to be
+constructed; a placeholder is used if OPENAI_API_KEY is not set.
+
+Usage:
+    python -m agents.benchmarks.startup_time --agents 100 --runs 3
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+import warnings
+from typing import Dict, List
+
+
+def _startup(num_agents: int, data_dir: str, results) -> None:
+    """Child process body: time each startup step and report the timings."""
+    warnings.simplefilter("ignore")
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    from agents.core.orchestrator import Orchestrator
+
+    timings["import orchestrator"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from agents.implementations.codebase_analysis_agent import CodebaseAnalysisAgent
+
+    timings["import codebase agent"] = time.perf_counter() - start
+
+    logging.getLogger("teko").setLevel(logging.WARNING)
+    orchestrator = Orchestrator()
+    orchestrator.register_agent_class("codebase_analysis", CodebaseAnalysisAgent)
+    config = {
+        "response_cache_path": os.path.join(data_dir, "llm_cache.sqlite3"),
+        "embedding_cache_path": os.path.join(data_dir, "embedding_cache"),
+    }
+
+    start = time.perf_counter()
+    for i in range(num_agents):
+        orchestrator.create_agent("codebase_analysis", f"plain-{i:04d}", {"ai_enabled": False})
+    timings["create non-AI agent"] = (time.perf_counter() - start) / num_agents
+
+    start = time.perf_counter()
+    agents = [
+        orchestrator.create_agent("codebase_analysis", f"ai-{i:04d}", config)
+        for i in range(num_agents)
+    ]
+    timings["create AI agent"] = (time.perf_counter() - start) / num_agents
+
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    try:
+        start = time.perf_counter()
+        agents[0].chat_model
+        agents[0].vector_store
+        timings["first AI use"] = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+    orchestrator.close()
+    results.put(timings)
+
+
+def measure(num_agents: int) -> Dict[str, float]:
+    """
+    Run the startup path in a fresh process.
+
+    Args:
+        num_agents: Number of agents of each kind to create
+
+    Returns:
+        Dictionary mapping each step to its time in seconds; agent creation
+        times are per agent
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    with tempfile.TemporaryDirectory() as data_dir:
+        process = context.Process(target=_startup, args=(num_agents, data_dir, results))
+        process.start()
+        timings = results.get()
+        process.join()
+    return timings
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--agents", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+    runs: List[Dict[str, float]] = [measure(args.agents) for _ in range(args.runs)]
+    print(f"{'step':<24} {'best ms':>9} {'worst ms':>9}")
+    for step in runs[0]:
+        values = [run[step] * 1000 for run in runs]
+        print(f"{step:<24} {min(values):>9.2f} {max(values):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
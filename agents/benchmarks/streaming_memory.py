@@ -0,0 +1,117 @@
+"""
+Streaming Ingestion Memory Benchmark
+
+Generates synthetic repository checkouts of increasing size and analyzes each
+one twice in a fresh child process: once by loading every file into a
+file_contents dictionary (the original task format) and once by streaming
+the checkout through repository_path. Reports the peak resident set size
+added by the analysis in each mode.
+
+Usage:
+    python -m agents.benchmarks.streaming_memory --sizes 1000 5000 20000 --file-kb 8
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from typing import Dict, Tuple
+
+WORDS = [
+    "def", "class", "import", "return", "self", "value", "data", "for", "if", "else",
+    "print", "result", "function", "const", "let", "config", "request", "response",
+]  # fmt: skip
+
+
+def build_checkout(root: str, num_files: int, file_kb: int) -> None:
+    """
+    Write a synthetic checkout of Python files spread over nested directories.
+
+    Args:
+        root: Directory to write the checkout into
+        num_files: Number of files to generate
+        file_kb: Approximate size of each file in kilobytes
+    """
+    rng = random.Random(42)
+    for i in range(num_files):
+        directory = os.path.join(root, "src", f"pkg_{i % 50}", f"mod_{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        words = rng.choices(WORDS, k=file_kb * 180)
+        if i % 5 == 0:
+            words.append("from flask import Flask")
+        with open(os.path.join(directory, f"file_{i}.py"), "w") as handle:
+            handle.write(" ".join(words))
+
+
+def _peak_rss_kb() -> int:
+    """Peak resident set size of the current process in kilobytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _analyze(root: str, mode: str, results: "multiprocessing.Queue[Tuple[int, float]]") -> None:
+    """Child process body: analyze the checkout and report peak RSS growth and time."""
+    from agents.implementations.codebase_analysis_agent import CodebaseAnalysisAgent
+
+    logging.getLogger("teko").setLevel(logging.WARNING)
+    agent = CodebaseAnalysisAgent(name="benchmark", config={"ai_enabled": False})
+    baseline = _peak_rss_kb()
+    start = time.perf_counter()
+
+    task: Dict[str, object] = {"type": "codebase_analysis", "repository_id": "benchmark"}
+    if mode == "memory":
+        file_contents = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                with open(path, encoding="utf-8", errors="replace") as handle:
+                    file_contents[os.path.relpath(path, root)] = handle.read()
+        task.update(file_paths=list(file_contents), file_contents=file_contents)
+    else:
+        task["repository_path"] = root
+
+    agent.process_task(task)
+    results.put((_peak_rss_kb() - baseline, time.perf_counter() - start))
+
+
+def measure(root: str, mode: str) -> Tuple[int, float]:
+    """
+    Analyze a checkout in a fresh process.
+
+    Args:
+        root: The checkout directory
+        mode: "memory" or "streaming"
+
+    Returns:
+        Tuple of (peak RSS growth in kilobytes, elapsed seconds)
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_analyze, args=(root, mode, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--file-kb", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'files':>8} {'mode':>10} {'peak RSS +MB':>13} {'seconds':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as root:
+            build_checkout(root, size, args.file_kb)
+            for mode in ("memory", "streaming"):
+                rss_kb, elapsed = measure(root, mode)
+                print(f"{size:>8} {mode:>10} {rss_kb / 1024:>13.1f} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
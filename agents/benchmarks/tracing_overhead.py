@@ -0,0 +1,107 @@
+"""
+Tracing Overhead Benchmark
+
+Measures what task tracing costs: a span and a task trace on their own with
+tracing off and on, and the end-to-end time per trivial task marking three
+phases through a running orchestrator with tracing off and on.
+
+Usage:
+    python -m agents.benchmarks.tracing_overhead --tasks 50000
+"""
+
+import argparse
+import logging
+import time
+from typing import Any, Dict
+
+from agents.core.base_agent import BaseAgent
+from agents.core.orchestrator import Orchestrator
+from agents.core.profiling import Tracer
+
+PHASES = ("load_state", "scan", "dependencies")
+
+
+class PhasedAgent(BaseAgent):
+    """Agent that only marks its phases, so dispatch and tracing dominate."""
+
+    handled_task_types = ("phased",)
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        for phase in PHASES:
+            with self.span(phase):
+                pass
+        return {}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return True
+
+
+def time_spans(num_tasks: int, tracer: Tracer) -> float:
+    """
+    Time task traces of three spans each, outside an orchestrator.
+
+    Args:
+        num_tasks: Number of task traces
+        tracer: The tracer, enabled or not
+
+    Returns:
+        Seconds per task
+    """
+    agent = PhasedAgent("phased", "phased")
+    task = {"id": 0, "type": "phased"}
+    start = time.perf_counter()
+    for i in range(num_tasks):
+        with tracer.trace_task(agent, task):
+            agent.process_task(task)
+    return (time.perf_counter() - start) / num_tasks
+
+
+def dispatch(num_tasks: int, tracer: Tracer) -> float:
+    """
+    Time trivial tasks through a running orchestrator.
+
+    Args:
+        num_tasks: Number of tasks to run
+        tracer: The tracer the orchestrator uses
+
+    Returns:
+        Seconds per task
+    """
+    orchestrator = Orchestrator(poll_timeout=0.1, tracer=tracer)
+    orchestrator.register_agent_class("phased", PhasedAgent)
+    orchestrator.create_agent("phased", "phased")
+
+    start = time.perf_counter()
+    for i in range(num_tasks):
+        orchestrator.add_task({"id": i, "type": "phased"})
+    orchestrator.start()
+    orchestrator.stop(drain=True, timeout=600)
+    elapsed = time.perf_counter() - start
+    orchestrator.close()
+    return elapsed / num_tasks
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=50000)
+    args = parser.parse_args()
+
+    logging.getLogger("teko").setLevel(logging.WARNING)
+
+    spans_off = time_spans(args.tasks, Tracer(enabled=False))
+    spans_on = time_spans(args.tasks, Tracer(enabled=True))
+    baseline = dispatch(args.tasks, Tracer(enabled=False))
+    measured = dispatch(args.tasks, Tracer(enabled=True))
+
+    print(f"task with 3 spans, tracing off: {spans_off * 1e6:7.2f} us")
+    print(f"task with 3 spans, tracing on:  {spans_on * 1e6:7.2f} us")
+    print(f"dispatch, tracing off:          {baseline * 1e6:7.2f} us/task")
+    print(
+        f"dispatch, tracing on:           {measured * 1e6:7.2f} us/task "
+        f"({(measured - baseline) / baseline * 100:+.1f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,17 @@ error handling, and task processing.
 """
 
 import abc
+import asyncio
+import contextvars
 import datetime
-import json
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+from agents.core.client_registry import get_client_registry
+from agents.core.error_sink import ErrorSink
+from agents.core.knowledge_store import KnowledgeStore
+from agents.core.memory import MemoryBackend, create_memory_backend
+from agents.core.profiling import span
 
 
 class BaseAgent(abc.ABC):
@@ -26,6 +28,19 @@ class BaseAgent(abc.ABC):
     the required abstract methods.
     """
 
+    # How the orchestrator should execute this agent's tasks: "thread" for
+    # I/O-bound agents (LLM calls, network), "process" for CPU-bound agents.
+    # Agents run in "process" mode must be picklable.
+    execution_mode = "thread"
+
+    # Task types (the task's "type" field) this agent handles. The orchestrator
+    # indexes agents by these types; agents that leave it empty are offered
+    # every task and filtered with can_handle_task().
+    handled_task_types: Tuple[str, ...] = ()
+
+    # Statuses in which the agent is not working on a task
+    IDLE_STATUSES = frozenset({"initialized", "idle", "completed"})
+
     def __init__(self, name: str, agent_type: str, config: Optional[Dict[str, Any]] = None):
         """
         Initialize a new agent.
@@ -40,8 +55,19 @@ class BaseAgent(abc.ABC):
         self.config = config or {}
         self.logger = logging.getLogger(f"teko.agent.{self.name}")
         self.last_active = datetime.datetime.now()
-        self.memory: Dict[str, Any] = {}
+        # Bounded by default; see create_memory_backend() for the config keys
+        self.memory: MemoryBackend = create_memory_backend(self.name, self.config)
         self.status = "initialized"
+        self.execution_mode = self.config.get("execution_mode", self.execution_mode)
+
+        # Clients shared with other agents through the client registry
+        self._shared_clients: List[Any] = []
+
+        # Results shared with the other agents of the orchestrator, which sets it
+        self.knowledge: Optional[KnowledgeStore] = None
+
+        # Created on the first error, see the error_sink property
+        self._error_sink: Optional[ErrorSink] = None
 
     def update_status(self, status: str) -> None:
         """
@@ -50,40 +76,152 @@ class BaseAgent(abc.ABC):
         Args:
             status: The new status
         """
-        self.logger.info(f"Agent {self.name} status changed: {self.status} -> {status}")
+        self.logger.info(
+            "Agent %s status changed: %s -> %s",
+            self.name,
+            self.status,
+            status,
+            extra={"agent": self.name, "status": status},
+        )
         self.status = status
         self.last_active = datetime.datetime.now()
 
+    @property
+    def is_idle(self) -> bool:
+        """Whether the agent is currently free to take a new task."""
+        return self.status in self.IDLE_STATUSES
+
     def log_error(self, error: Exception, context: Optional[Dict[str, Any]] = None) -> None:
         """
         Log an error that occurred during agent execution.
 
+        The error is recorded in the agent's error sink with a size-capped
+        copy of the context, so the cost does not grow with the task; the
+        record is serialized only if it is stored or logged at debug level.
+
         Args:
             error: The exception that occurred
             context: Additional context about what the agent was doing
         """
-        self.logger.error(f"Error in agent {self.name}: {str(error)}", exc_info=True)
-        error_data = {
-            "agent": self.name,
-            "agent_type": self.agent_type,
-            "timestamp": datetime.datetime.now().isoformat(),
-            "error": str(error),
-            "error_type": type(error).__name__,
-            "context": context or {},
-        }
+        self.logger.error(
+            "Error in agent %s: %s", self.name, error, exc_info=True, extra={"agent": self.name}
+        )
+        record = self.error_sink.record(self.name, self.agent_type, error, context)
+        self.logger.debug("Error data: %s", record)
 
-        # In a real implementation, this would store the error in a database
-        self.logger.debug(f"Error data: {json.dumps(error_data)}")
+    @property
+    def error_sink(self) -> ErrorSink:
+        """
+        The sink recording this agent's errors, shared by agents with the same
+        error_store_path setting (None keeps recent errors in memory only).
+        """
+        if self._error_sink is None:
+            path = self.config.get("error_store_path")
+            self._error_sink = self.acquire_client(
+                "error_sink", {"path": path}, lambda: ErrorSink(path)
+            )
+        return self._error_sink
 
-    def store_in_memory(self, key: str, value: Any) -> None:
+    def acquire_client(self, kind: str, config: Dict[str, Any], factory: Callable[[], Any]) -> Any:
+        """
+        Get a client shared by all agents with the same configuration.
+
+        The client is released again by close().
+
+        Args:
+            kind: The kind of client, e.g. "response_cache"
+            config: The settings the client is built from
+            factory: Builds the client if no agent shares one yet
+
+        Returns:
+            The shared client
+        """
+        client = get_client_registry().acquire(kind, config, factory)
+        self._shared_clients.append(client)
+        return client
+
+    def warm_up(self) -> None:
+        """
+        Build the agent's expensive resources ahead of its first task.
+
+        Long-lived hosts such as the agent daemon call this after creating an
+        agent. The default does nothing; agents that create clients lazily
+        override it.
+        """
+
+    def close(self) -> None:
+        """
+        Release the resources held by the agent.
+
+        Subclasses holding other resources should override this and call
+        super().close().
+        """
+        registry = get_client_registry()
+        for client in self._shared_clients:
+            registry.release(client)
+        self._shared_clients = []
+        self._error_sink = None
+        self.memory.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Get the agent's state for pickling, e.g. when it runs in process mode.
+
+        Returns:
+            The instance dictionary without the shared knowledge store, error
+            sink and other shared clients, which belong to the orchestrator's
+            process; the copy acquires its own clients on first use
+        """
+        state = self.__dict__.copy()
+        state["knowledge"] = None
+        state["_error_sink"] = None
+        state["_shared_clients"] = []
+        return state
+
+    def recall_or_compute(self, namespace: str, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Get a result from the shared knowledge store, computing it on a miss.
+
+        Without a knowledge store the result is always computed.
+
+        Args:
+            namespace: The entry's namespace, see KnowledgeStore.namespace()
+            key: The entry's key within the namespace
+            compute: Computes the result on a miss
+
+        Returns:
+            The shared or computed result
+        """
+        if self.knowledge is None:
+            return compute()
+        return self.knowledge.get_or_compute(namespace, key, compute)
+
+    def span(self, name: str) -> Any:
+        """
+        Mark a phase of the current task for the task tracer.
+
+        Use as "with self.span('phase'):"; the phase shows up as a span nested
+        in the enclosing one. This is a no-op unless the task is being traced.
+
+        Args:
+            name: The phase name
+
+        Returns:
+            A context manager delimiting the phase
+        """
+        return span(name)
+
+    def store_in_memory(self, key: str, value: Any, size: Optional[int] = None) -> None:
         """
         Store data in the agent's memory.
 
         Args:
             key: The key to store the data under
             value: The data to store
+            size: The data's size in bytes if known, counted against the
+                memory budget instead of an estimate
         """
-        self.memory[key] = value
+        self.memory.set(key, value, size)
 
     def retrieve_from_memory(self, key: str) -> Optional[Any]:
         """
@@ -110,6 +248,68 @@ class BaseAgent(abc.ABC):
         """
         pass
 
+    async def aprocess_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a task assigned to the agent from an asyncio event loop.
+
+        The default implementation runs process_task() in the loop's default
+        executor so synchronous agents work unchanged. Agents doing network
+        I/O (LLM calls, embeddings) should override this with native async code.
+
+        Args:
+            task: The task data as a dictionary
+
+        Returns:
+            Dictionary containing the results of the task
+        """
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the current context so the task's trace follows it
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(None, context.run, self.process_task, task)
+
+    def process_batch(self, tasks: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Process several tasks of the same type at once.
+
+        The orchestrator calls this when it is configured to coalesce queued
+        tasks into batches. The default processes the tasks one at a time;
+        agents override it to share setup, LLM calls or embedding requests
+        across the batch.
+
+        Args:
+            tasks: The tasks, all routed to this agent
+
+        Returns:
+            One entry per task, in order: the task's result dictionary, or the
+            exception that made the task fail
+        """
+        results: List[Any] = []
+        for task in tasks:
+            try:
+                results.append(self.process_task(task))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def aprocess_batch(self, tasks: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Process several tasks of the same type at once from an asyncio event loop.
+
+        The default awaits aprocess_task() for all tasks concurrently.
+
+        Args:
+            tasks: The tasks, all routed to this agent
+
+        Returns:
+            One entry per task, in order: the task's result dictionary, or the
+            exception that made the task fail
+        """
+        return list(
+            await asyncio.gather(
+                *(self.aprocess_task(task) for task in tasks), return_exceptions=True
+            )
+        )
+
     @abc.abstractmethod
     def can_handle_task(self, task: Dict[str, Any]) -> bool:
         """
@@ -0,0 +1,169 @@
+"""
+Client Registry
+
+This module provides a process-wide registry of expensive clients (LLM and
+embedding API clients, vector database clients, caches) so agents with the
+same configuration share one instance and its connection pool instead of
+each building their own. Clients are reference counted and closed when the
+last agent using them releases them, or when the process exits.
+"""
+
+import atexit
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Identifies a client: its kind and its configuration serialized as JSON
+ClientKey = Tuple[str, str]
+
+
+class ClientRegistry:
+    """
+    Reference-counted registry of shared clients keyed by kind and configuration.
+    """
+
+    def __init__(self, shared: bool = True):
+        """
+        Initialize the registry.
+
+        Args:
+            shared: Share clients between acquirers; if False every acquire()
+                builds a new client, as if each agent owned its clients
+        """
+        self.shared = shared
+        self.logger = logging.getLogger("teko.clients")
+
+        self._lock = threading.Lock()
+        self._clients: Dict[ClientKey, Any] = {}
+        self._refcounts: Dict[ClientKey, int] = {}
+        self._closers: Dict[ClientKey, Optional[Callable[[Any], None]]] = {}
+        self._keys_by_client: Dict[int, ClientKey] = {}
+        self._sequence = 0
+
+    def acquire(
+        self,
+        kind: str,
+        config: Dict[str, Any],
+        factory: Callable[[], Any],
+        close: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """
+        Get the shared client for a configuration, creating it if needed.
+
+        Every acquire() must be paired with a release() of the returned client.
+
+        Args:
+            kind: The kind of client, e.g. "chat_openai"
+            config: The settings the client is built from
+            factory: Builds the client if none exists for the configuration
+            close: Optional function closing the client; by default its
+                close() method is called if it has one
+
+        Returns:
+            The shared client
+        """
+        key: ClientKey = (kind, json.dumps(config, sort_keys=True, default=str))
+        with self._lock:
+            if not self.shared:
+                # Unshared clients get a unique key so they are never reused
+                self._sequence += 1
+                key = (kind, f"{key[1]}#{self._sequence}")
+
+            if key not in self._clients:
+                client = factory()
+                self._clients[key] = client
+                self._refcounts[key] = 0
+                self._closers[key] = close
+                self._keys_by_client[id(client)] = key
+                self.logger.debug("Created shared %s client", kind)
+
+            self._refcounts[key] += 1
+            return self._clients[key]
+
+    def release(self, client: Any) -> None:
+        """
+        Release a client returned by acquire(), closing it when unused.
+
+        Args:
+            client: The client to release
+        """
+        with self._lock:
+            key = self._keys_by_client.get(id(client))
+            if key is None:
+                return
+
+            self._refcounts[key] -= 1
+            if self._refcounts[key] > 0:
+                return
+
+            closer = self._forget(key)
+        self._close(client, closer)
+
+    def close_all(self) -> None:
+        """Close every client regardless of outstanding references."""
+        with self._lock:
+            entries = [(self._clients[key], self._forget(key)) for key in list(self._clients)]
+        for client, closer in entries:
+            self._close(client, closer)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of live clients of each kind.
+
+        Returns:
+            Dictionary mapping client kind to live client count
+        """
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for kind, _ in self._clients:
+                counts[kind] = counts.get(kind, 0) + 1
+            return counts
+
+    def _forget(self, key: ClientKey) -> Optional[Callable[[Any], None]]:
+        """Remove a client from the registry. Caller must hold the lock."""
+        client = self._clients.pop(key)
+        del self._refcounts[key]
+        del self._keys_by_client[id(client)]
+        return self._closers.pop(key)
+
+    def _close(self, client: Any, closer: Optional[Callable[[Any], None]]) -> None:
+        """Close a client, logging instead of raising on failure."""
+        try:
+            if closer is not None:
+                closer(client)
+            elif callable(getattr(client, "close", None)):
+                client.close()
+        except Exception as e:
+            self.logger.warning("Failed to close %s: %s", type(client).__name__, e)
+
+
+_default_registry: Optional[ClientRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Get the process-wide client registry.
+
+    Returns:
+        The registry, created on first use and closed at interpreter exit
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry()
+            atexit.register(_default_registry.close_all)
+        return _default_registry
+
+
+def set_client_registry(registry: ClientRegistry) -> None:
+    """
+    Replace the process-wide client registry, e.g. in tests or benchmarks.
+
+    Args:
+        registry: The registry to use from now on
+    """
+    global _default_registry
+    with _default_registry_lock:
+        _default_registry = registry
@@ -0,0 +1,398 @@
+"""
+Embedding Cache
+
+This module provides a persistent cache for text embeddings. Vectors are
+stored as float32 rows of a memory-mapped array file; a SQLite index maps
+the hash of each embedded text to its row and keeps the rows in least
+recently used order. Processes sharing the files serialize writes through a
+lock file and reread the index when another process changed it.
+CachedEmbeddings wraps any LangChain embeddings model
+with the cache so documents and queries that were embedded before are
+served without an embedding request.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no locking between processes
+    fcntl = None  # type: ignore[assignment]
+
+
+class EmbeddingCache:
+    """
+    LRU cache of embedding vectors, optionally persisted as a memory-mapped array.
+
+    The cache holds up to max_entries vectors of one embedding model. With a
+    path, vectors live in "<namespace>.f32" (a float32 array with one row
+    per entry) and the index in "<namespace>.sqlite3" next to it; without a
+    path everything is kept in memory. All vectors must have the dimension
+    of the first one stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 50_000,
+        path: Optional[str] = None,
+        namespace: str = "default",
+    ):
+        """
+        Initialize the cache. Files are opened when the first vector is stored
+        or looked up, once the vector dimension is known.
+
+        Args:
+            max_entries: Maximum number of cached vectors
+            path: Directory for the on-disk files, or None for a memory-only cache
+            namespace: Name of the cache files, normally the embedding model
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.namespace = re.sub(r"[^A-Za-z0-9_.-]", "_", namespace)
+
+        self._lock = threading.Lock()
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._free_slots: List[int] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock_file: Optional[IO[bytes]] = None
+        # Index generation the slots were read at; writers increment it
+        self._generation: Optional[int] = None
+        self._loaded = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text: str, kind: str = "document") -> str:
+        """
+        Build the cache key of a text.
+
+        Args:
+            text: The embedded text
+            kind: "document" or "query"; models may embed them differently
+
+        Returns:
+            Hex digest identifying the text
+        """
+        return hashlib.sha256(f"{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up several vectors.
+
+        Args:
+            keys: Cache keys from make_key()
+
+        Returns:
+            The cached vector for each key, or None on a miss
+        """
+        results: List[Optional[List[float]]] = []
+        now = time.time()
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync_index()
+            touched = []
+            for key in keys:
+                slot = self._slots.get(key)
+                if slot is None or self._vectors is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+
+                self._slots.move_to_end(key)
+                touched.append((now, key))
+                self.hits += 1
+                results.append(self._vectors[slot].tolist())
+
+            if self._connection is not None and touched:
+                self._connection.executemany(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", touched
+                )
+        return results
+
+    def set_many(self, items: Sequence[Tuple[str, Sequence[float]]]) -> None:
+        """
+        Store several vectors, evicting the least recently used ones if full.
+
+        Args:
+            items: List of (cache key, vector) tuples
+
+        Raises:
+            ValueError: If a vector's dimension differs from the cached vectors'
+        """
+        if not items or self.max_entries <= 0:
+            return
+
+        now = time.time()
+        with self._lock, self._file_lock(exclusive=True):
+            self._sync_index()
+            dimension = len(items[0][1]) if self._vectors is None else self._vectors.shape[1]
+            for key, vector in items:
+                if len(vector) != dimension:
+                    raise ValueError(
+                        f"Vector of dimension {len(vector)} for a cache of dimension {dimension}"
+                    )
+
+            rows = []
+            evicted = []
+            for key, vector in items:
+                vectors = self._vectors
+                if vectors is None:
+                    vectors = self._open_vectors(len(vector))
+
+                slot = self._slots.get(key)
+                if slot is None:
+                    if self._free_slots:
+                        slot = self._free_slots.pop()
+                    else:
+                        evicted_key, slot = self._slots.popitem(last=False)
+                        evicted.append((evicted_key,))
+                        self.evictions += 1
+
+                vectors[slot] = vector
+                self._slots[key] = slot
+                self._slots.move_to_end(key)
+                rows.append((key, slot, now))
+
+            if self._connection is not None:
+                # Keys stored and evicted again within this call are not indexed
+                rows = [row for row in rows if self._slots.get(row[0]) == row[1]]
+                self._connection.execute("BEGIN")
+                self._connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO entries (key, slot, accessed_at) VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._connection.execute(
+                    "UPDATE meta SET value = value + 1 WHERE name = 'generation'"
+                )
+                self._generation = self._read_meta("generation")
+                self._connection.execute("COMMIT")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary of entry count, hit, miss and eviction counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._slots),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        """Flush the vectors to disk and close the index."""
+        with self._lock:
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            self._vectors = None
+            self._slots.clear()
+            self._free_slots = []
+            self._generation = None
+            self._loaded = False
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """
+        Lock the cache files against other processes, opening them on first use.
+        Caller must hold the lock.
+
+        Args:
+            exclusive: Lock for writing rather than reading
+        """
+        self._open_index()
+        if self._lock_file is None or fcntl is None:
+            yield
+            return
+
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _open_index(self) -> None:
+        """Open the index and lock file on first use. Caller must hold the lock."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if self.path is None:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        self._lock_file = open(os.path.join(self.path, f"{self.namespace}.lock"), "ab")
+        self._connection = sqlite3.connect(
+            os.path.join(self.path, f"{self.namespace}.sqlite3"),
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                slot INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        self._connection.execute(
+            "INSERT OR IGNORE INTO meta (name, value) VALUES ('generation', 0)"
+        )
+
+    def _sync_index(self) -> None:
+        """
+        Read the index if it is new or another process changed it.
+        Caller must hold the lock and the file lock.
+        """
+        if self._connection is None:
+            return
+        generation = self._read_meta("generation")
+        if generation == self._generation:
+            return
+        self._generation = generation
+
+        self._slots.clear()
+        self._free_slots = []
+        dimension = self._read_meta("dimension")
+        if dimension is None or not os.path.exists(self._vectors_path()):
+            self._connection.execute("DELETE FROM entries")
+            return
+
+        # Entries beyond a reduced max_entries are dropped, oldest first
+        if self._vectors is None:
+            self._open_vectors(dimension)
+        rows = self._connection.execute(
+            "SELECT key, slot FROM entries ORDER BY accessed_at, rowid"
+        ).fetchall()
+        kept = [(key, slot) for key, slot in rows if slot < self.max_entries]
+        for key, slot in kept[max(0, len(kept) - self.max_entries) :]:
+            self._slots[key] = slot
+        stale = [(key,) for key, _ in rows if key not in self._slots]
+        self._connection.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+        used = set(self._slots.values())
+        self._free_slots = [slot for slot in range(self.max_entries) if slot not in used]
+        self._free_slots.reverse()
+
+    def _read_meta(self, name: str) -> Optional[int]:
+        """Read a value of the meta table. Caller must hold the lock."""
+        assert self._connection is not None
+        row = self._connection.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return None if row is None else int(row[0])
+
+    def _open_vectors(self, dimension: int) -> np.ndarray:
+        """Create or map the vector array. Caller must hold the lock."""
+        shape = (self.max_entries, dimension)
+        if self._connection is None:
+            self._vectors = np.zeros(shape, dtype=np.float32)
+        else:
+            vectors_path = self._vectors_path()
+            with open(vectors_path, "ab") as handle:
+                # Sparse on most filesystems; resizing keeps existing rows
+                handle.truncate(self.max_entries * dimension * 4)
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=shape)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('dimension', ?)", (dimension,)
+            )
+
+        if not self._slots:
+            self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        return self._vectors
+
+    def _vectors_path(self) -> str:
+        """Path of the memory-mapped vector file."""
+        return os.path.join(self.path or ".", f"{self.namespace}.f32")
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings model that serves repeated texts from an EmbeddingCache.
+
+    Only texts missing from the cache are sent to the wrapped model, in one
+    request per call; duplicate texts within a call are embedded once.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        """
+        Initialize the wrapper.
+
+        Args:
+            embeddings: The embeddings model to wrap
+            cache: Cache for the model's vectors
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, using cached vectors where available.
+
+        Args:
+            texts: The texts to embed
+
+        Returns:
+            One vector per text
+        """
+        keys = [EmbeddingCache.make_key(text) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+
+        if not missing:
+            return [vector for vector in vectors if vector is not None]
+
+        # Return the float32 values the cache will serve later, not the originals
+        embedded = self.embeddings.embed_documents(list(missing.values()))
+        computed = {
+            key: np.asarray(vector, dtype=np.float32).tolist()
+            for key, vector in zip(missing, embedded)
+        }
+        self.cache.set_many(list(computed.items()))
+        return [computed[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, using the cached vector if available.
+
+        Args:
+            text: The query text
+
+        Returns:
+            The query vector
+        """
+        key = EmbeddingCache.make_key(text, kind="query")
+        vector = self.cache.get_many([key])[0]
+        if vector is None:
+            vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32).tolist()
+            self.cache.set_many([(key, vector)])
+        return vector
@@ -0,0 +1,353 @@
+"""
+Error Sink
+
+This module records agent errors without letting their cost grow with the
+failed task. The worker thread only takes a size-capped snapshot of the
+error's context: long strings (such as file contents) are replaced by a
+short preview, their length and their hash, so records never keep the
+original values alive; containers are cut to their first items and the
+walk stops after a fixed number of values. Formatting the traceback, JSON
+encoding and writing to the optional SQLite error store happen later on a
+background writer thread, and records are dropped rather than blocking when
+the writer falls behind.
+"""
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+import queue
+import reprlib
+import sqlite3
+import threading
+import traceback
+from collections import deque
+from collections.abc import Mapping
+from typing import Any, Deque, Dict, List, Optional
+
+# Strings longer than this are replaced by a preview, their length and hash
+DEFAULT_MAX_STRING = 256
+
+# Containers are cut to this many items
+DEFAULT_MAX_ITEMS = 20
+
+# Containers nested deeper than this are summarized by type and size
+DEFAULT_MAX_DEPTH = 4
+
+# The snapshot of one context stops after this many values
+DEFAULT_MAX_VALUES = 500
+
+_repr = reprlib.Repr()
+_repr.maxstring = DEFAULT_MAX_STRING
+_repr.maxother = DEFAULT_MAX_STRING
+
+
+def _summarize(value: Any, max_string: int) -> Dict[str, Any]:
+    """Summarize a long string or bytes value by preview, length and content hash."""
+    if isinstance(value, str):
+        data = value.encode("utf-8", "surrogatepass")
+        summary: Dict[str, Any] = {"preview": value[:max_string]}
+    else:
+        data = bytes(value)
+        summary = {}
+    summary["length"] = len(value)
+    summary["blake2b"] = hashlib.blake2b(data, digest_size=16).hexdigest()
+    return summary
+
+
+class _Snapshot:
+    """Takes a size-capped copy of a value."""
+
+    def __init__(self, max_string: int, max_items: int, max_depth: int, max_values: int):
+        self.max_string = max_string
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.remaining = max_values
+
+    def take(self, value: Any, depth: int = 0) -> Any:
+        """Copy a value, replacing what exceeds the limits by summaries."""
+        if self.remaining <= 0:
+            return "<omitted>"
+        self.remaining -= 1
+
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        if isinstance(value, str):
+            return value if len(value) <= self.max_string else _summarize(value, self.max_string)
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return _summarize(value, self.max_string)
+
+        if isinstance(value, Mapping):
+            if depth >= self.max_depth:
+                return f"<{type(value).__name__} of {len(value)} items>"
+            copy: Dict[str, Any] = {}
+            for i, (key, item) in enumerate(value.items()):
+                if i == self.max_items:
+                    copy["..."] = f"{len(value) - i} more items"
+                    break
+                key = key if isinstance(key, str) else _repr.repr(key)
+                copy[key[: self.max_string]] = self.take(item, depth + 1)
+            return copy
+
+        if isinstance(value, (list, tuple, set, frozenset, deque)):
+            if depth >= self.max_depth:
+                return f"<{type(value).__name__} of {len(value)} items>"
+            items: List[Any] = []
+            for i, item in enumerate(value):
+                if i == self.max_items:
+                    items.append(f"... {len(value) - i} more items")
+                    break
+                items.append(self.take(item, depth + 1))
+            return items
+
+        return _repr.repr(value)
+
+
+def snapshot(
+    value: Any,
+    max_string: int = DEFAULT_MAX_STRING,
+    max_items: int = DEFAULT_MAX_ITEMS,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    max_values: int = DEFAULT_MAX_VALUES,
+) -> Any:
+    """
+    Take a size-capped, JSON-serializable copy of a value.
+
+    Args:
+        value: The value to copy
+        max_string: Strings longer than this are replaced by a preview, their
+            length and their content hash
+        max_items: Containers are cut to this many items
+        max_depth: Containers nested deeper are summarized by type and size
+        max_values: The copy stops after this many values
+
+    Returns:
+        The capped copy
+    """
+    return _Snapshot(max_string, max_items, max_depth, max_values).take(value)
+
+
+class ErrorRecord:
+    """
+    One recorded error. It is rendered to a dictionary or JSON only on demand.
+    """
+
+    def __init__(
+        self, agent: str, agent_type: str, error: BaseException, context: Optional[Any] = None
+    ):
+        """
+        Record an error, capping the size of its context.
+
+        Args:
+            agent: Name of the agent the error occurred in
+            agent_type: Type of the agent
+            error: The exception
+            context: What the agent was doing, e.g. {"task": task}
+        """
+        self.agent = agent
+        self.agent_type = agent_type
+        self.timestamp = datetime.datetime.now()
+        self.error = str(error)[: DEFAULT_MAX_STRING * 4]
+        self.error_type = type(error).__name__
+        # Source lines are looked up when the traceback is formatted
+        self._traceback = traceback.TracebackException.from_exception(error, lookup_lines=False)
+        self._context = _Snapshot(
+            DEFAULT_MAX_STRING, DEFAULT_MAX_ITEMS, DEFAULT_MAX_DEPTH, DEFAULT_MAX_VALUES
+        ).take(context or {})
+        self._rendered: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Render the record.
+
+        Returns:
+            Dictionary of the agent, timestamp, error, traceback and capped context
+        """
+        if self._rendered is None:
+            self._rendered = {
+                "agent": self.agent,
+                "agent_type": self.agent_type,
+                "timestamp": self.timestamp.isoformat(),
+                "error": self.error,
+                "error_type": self.error_type,
+                "traceback": "".join(self._traceback.format()),
+                "context": self._context,
+            }
+        return self._rendered
+
+    def __str__(self) -> str:
+        return json.dumps(self.to_dict(), default=str)
+
+
+class ErrorSink:
+    """
+    Keeps recent error records in memory and persists them from a writer thread.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_pending: int = 1000,
+        max_recent: int = 100,
+        max_records: int = 10_000,
+    ):
+        """
+        Initialize the sink. The writer thread starts with the first record.
+
+        Args:
+            path: Path of the SQLite error store, or None to keep records in
+                memory only
+            max_pending: Maximum number of records waiting for the writer;
+                further records are dropped from the store until it catches up
+            max_recent: Number of recent records kept in memory
+            max_records: Maximum number of records kept in the store; the
+                oldest records are deleted beyond this
+        """
+        self.path = path
+        self.max_records = max_records
+        self.logger = logging.getLogger("teko.error_sink")
+
+        self._recent: Deque[ErrorRecord] = deque(maxlen=max_recent)
+        self._pending: "queue.Queue[Optional[ErrorRecord]]" = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+
+    def record(
+        self, agent: str, agent_type: str, error: BaseException, context: Optional[Any] = None
+    ) -> ErrorRecord:
+        """
+        Record an error without blocking on serialization or I/O.
+
+        Args:
+            agent: Name of the agent the error occurred in
+            agent_type: Type of the agent
+            error: The exception
+            context: What the agent was doing, e.g. {"task": task}
+
+        Returns:
+            The record
+        """
+        record = ErrorRecord(agent, agent_type, error, context)
+        with self._lock:
+            self._recent.append(record)
+            self.recorded += 1
+            if self.path is None:
+                return record
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_records, name="teko-error-sink", daemon=True
+                )
+                self._writer.start()
+
+        try:
+            self._pending.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+        return record
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """
+        Get the recent records.
+
+        Returns:
+            The rendered records, oldest first
+        """
+        with self._lock:
+            records = list(self._recent)
+        return [record.to_dict() for record in records]
+
+    def flush(self) -> None:
+        """Wait until the writer has stored every pending record."""
+        self._pending.join()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get sink statistics.
+
+        Returns:
+            Dictionary of recorded, written, dropped and pending record counts
+        """
+        with self._lock:
+            return {
+                "recorded": self.recorded,
+                "written": self.written,
+                "dropped": self.dropped,
+                "pending": self._pending.qsize(),
+            }
+
+    def close(self) -> None:
+        """Store the pending records and stop the writer."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._pending.put(None)
+            writer.join()
+
+    def _write_records(self) -> None:
+        """Store records from the pending queue until close() sends None."""
+        connection = None
+        while True:
+            record = self._pending.get()
+            try:
+                if record is None:
+                    break
+                if connection is None:
+                    connection = self._connect()
+                self._store(connection, record)
+            except Exception as e:
+                self.logger.warning("Failed to store error record: %s", e)
+            finally:
+                self._pending.task_done()
+
+        if connection is not None:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the error store, creating its table if needed."""
+        assert self.path is not None
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS errors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                agent TEXT NOT NULL,
+                agent_type TEXT NOT NULL,
+                error_type TEXT NOT NULL,
+                error TEXT NOT NULL,
+                record TEXT NOT NULL
+            )
+            """)
+        return connection
+
+    def _store(self, connection: sqlite3.Connection, record: ErrorRecord) -> None:
+        """Write one record and trim the store periodically."""
+        data = record.to_dict()
+        connection.execute(
+            "INSERT INTO errors (timestamp, agent, agent_type, error_type, error, record) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                data["timestamp"],
+                record.agent,
+                record.agent_type,
+                record.error_type,
+                record.error,
+                json.dumps(data, default=str),
+            ),
+        )
+
+        with self._lock:
+            self.written += 1
+            written = self.written
+        if written % 100 == 0:
+            connection.execute(
+                "DELETE FROM errors WHERE id <= (SELECT MAX(id) FROM errors) - ?",
+                (self.max_records,),
+            )
@@ -0,0 +1,255 @@
+"""
+Shared Knowledge Store
+
+This module provides the store through which the agents of one orchestrator
+share analysis results. Entries are grouped in namespaces, normally one per
+repository and commit, so an agent analyzing a repository another agent has
+already analyzed finds the results instead of computing them again. The
+first tier is an in-memory LRU bounded in bytes; the optional second tier is
+a SQLite database shared across processes and restarts.
+
+Values are stored pickled in both tiers, so every reader gets its own copy
+and may modify it freely.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Identifies an entry: its namespace and its key within the namespace
+EntryKey = Tuple[str, str]
+
+
+class KnowledgeStore:
+    """
+    Two-tier (memory LRU + SQLite) store of pickled values keyed by namespace and key.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        path: Optional[str] = None,
+        max_disk_entries: int = 100_000,
+    ):
+        """
+        Initialize the store. The database is opened on first use.
+
+        Args:
+            max_bytes: Maximum total size of the pickled values kept in memory
+            path: Path of the SQLite database for the on-disk tier, or None for
+                a memory-only store
+            max_disk_entries: Maximum number of entries kept on disk; the least
+                recently used entries are evicted beyond this
+        """
+        self.max_bytes = max_bytes
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[EntryKey, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def namespace(repository_id: Any, commit: Optional[str] = None) -> str:
+        """
+        Build the namespace of a repository's entries.
+
+        Args:
+            repository_id: The repository identifier
+            commit: The analyzed commit, or None for the working tree
+
+        Returns:
+            Namespace of the form "<repository>@<commit>"
+        """
+        return f"{repository_id}@{commit or 'worktree'}"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Look up a value.
+
+        Args:
+            namespace: The entry's namespace
+            key: The entry's key within the namespace
+
+        Returns:
+            A copy of the stored value, or None on a miss
+        """
+        entry_key = (namespace, key)
+        with self._lock:
+            blob = self._memory.get(entry_key)
+            if blob is not None:
+                self._memory.move_to_end(entry_key)
+                self.memory_hits += 1
+            else:
+                connection = self._get_connection()
+                if connection is not None:
+                    row = connection.execute(
+                        "SELECT value FROM entries WHERE namespace = ? AND key = ?", entry_key
+                    ).fetchone()
+                    if row is not None:
+                        blob = bytes(row[0])
+                        connection.execute(
+                            "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                            (time.time(), *entry_key),
+                        )
+                        self._remember(entry_key, blob)
+                        self.disk_hits += 1
+
+            if blob is None:
+                self.misses += 1
+                return None
+
+        return pickle.loads(blob)
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers.
+
+        Args:
+            namespace: The entry's namespace
+            key: The entry's key within the namespace
+            value: The value to store; must be picklable
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        entry_key = (namespace, key)
+        now = time.time()
+        with self._lock:
+            self._remember(entry_key, blob)
+
+            connection = self._get_connection()
+            if connection is None:
+                return
+
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (*entry_key, blob, now),
+            )
+
+            # Trim the disk tier periodically rather than on every write
+            self._disk_writes += 1
+            if self._disk_writes % 100 == 0:
+                cursor = connection.execute(
+                    "DELETE FROM entries WHERE rowid IN ("
+                    "SELECT rowid FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+                self.evictions += max(0, cursor.rowcount)
+
+    def get_or_compute(self, namespace: str, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Look up a value, computing and storing it on a miss.
+
+        Agents missing the same entry at the same time may both compute it.
+        None cannot be told apart from a miss, so it is never stored.
+
+        Args:
+            namespace: The entry's namespace
+            key: The entry's key within the namespace
+            compute: Computes the value on a miss
+
+        Returns:
+            The stored or computed value
+        """
+        value = self.get(namespace, key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(namespace, key, value)
+        return value
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """
+        Remove entries from both tiers.
+
+        Args:
+            namespace: Only remove this namespace's entries, or None for all
+        """
+        with self._lock:
+            for entry_key in list(self._memory):
+                if namespace is None or entry_key[0] == namespace:
+                    self._memory_bytes -= len(self._memory.pop(entry_key))
+
+            connection = self._get_connection()
+            if connection is None:
+                return
+            if namespace is None:
+                connection.execute("DELETE FROM entries")
+            else:
+                connection.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary of memory usage and of hit, miss and eviction counters
+        """
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        """Close the disk tier; it is reopened if the store is used again."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _remember(self, entry_key: EntryKey, blob: bytes) -> None:
+        """Store a pickled value in the memory tier. Caller must hold the lock."""
+        previous = self._memory.pop(entry_key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        if len(blob) > self.max_bytes:
+            return
+
+        self._memory[entry_key] = blob
+        self._memory_bytes += len(blob)
+        while self._memory_bytes > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier on first use. Caller must hold the lock."""
+        if self.path is None:
+            return None
+
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, timeout=30.0, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """)
+
+        return self._connection
@@ -5,23 +5,68 @@ This module provides a wrapper around LangChain functionality for Teko agents.
 It handles model initialization, prompt management, and templating.
 """
 
+import hashlib
+import importlib
+import json
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set
+
+from agents.core.client_registry import ClientRegistry, get_client_registry
+from agents.core.llm_cache import ResponseCache
+
+if TYPE_CHECKING:
+    from langchain.chains import LLMChain
+    from langchain.memory import ConversationBufferMemory
+    from langchain.schema import Document
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.language_models import BaseLanguageModel
+    from langchain_core.vectorstores import VectorStore
+
+    from agents.core.embedding_cache import EmbeddingCache
+
+# LangChain, OpenAI and Chroma are imported on first use, so importing this
+# module (and the agents and orchestrator that depend on it) stays cheap.
+# The names are still module attributes, resolved by __getattr__ below.
+_LAZY_IMPORTS = {
+    "LLMChain": ("langchain.chains", "LLMChain"),
+    "ConversationBufferMemory": ("langchain.memory", "ConversationBufferMemory"),
+    "PromptTemplate": ("langchain.prompts", "PromptTemplate"),
+    "Document": ("langchain.schema", "Document"),
+    "OpenAIEmbeddings": ("langchain_community.embeddings", "OpenAIEmbeddings"),
+    "Chroma": ("langchain_community.vectorstores", "Chroma"),
+    "ChatOpenAI": ("langchain_openai", "ChatOpenAI"),
+    "CachedEmbeddings": ("agents.core.embedding_cache", "CachedEmbeddings"),
+}
+
+
+def _lazy(name: str) -> Any:
+    """
+    Get a lazily imported name, importing it on first use.
+
+    Values already set on the module (e.g. by unittest.mock.patch) win.
+
+    Args:
+        name: A key of _LAZY_IMPORTS
 
-from langchain.chains import LLMChain
-from langchain.memory import ConversationBufferMemory
+    Returns:
+        The imported object
+    """
+    value = globals().get(name)
+    if value is None:
+        module_name, attribute = _LAZY_IMPORTS[name]
+        value = getattr(importlib.import_module(module_name), attribute)
+        globals()[name] = value
+    return value
 
-# LangChain imports
-from langchain.prompts import PromptTemplate
-from langchain.schema import Document
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain_openai import ChatOpenAI
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+def __getattr__(name: str) -> Any:
+    """Resolve the lazily imported names as module attributes (PEP 562)."""
+    if name in _LAZY_IMPORTS:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class TekoChatModel:
@@ -29,24 +74,52 @@ class TekoChatModel:
     Wrapper around LangChain's ChatOpenAI model with additional functionality.
     """
 
-    def __init__(self, model_name: str = "gpt-4o", temperature: float = 0.1):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o",
+        temperature: float = 0.1,
+        llm: Optional["BaseLanguageModel"] = None,
+        cache: Optional[ResponseCache] = None,
+        registry: Optional[ClientRegistry] = None,
+    ):
         """
         Initialize the chat model.
 
         Args:
             model_name: The name of the OpenAI model to use
             temperature: Temperature setting for output generation
+            llm: Optional pre-built language model to use instead of ChatOpenAI
+            cache: Optional response cache consulted before calling the LLM
+            registry: Registry the ChatOpenAI client is shared through
+                (defaults to the process-wide registry)
         """
         self.logger = logging.getLogger("teko.langchain.chat")
-
-        # Initialize the LLM
-        self.llm = ChatOpenAI(model=model_name, temperature=temperature)
-
-        self.logger.info(f"Initialized ChatOpenAI with model: {model_name}")
+        self.model_name = model_name
+        self.temperature = temperature
+        self.cache = cache
+        self._registry: Optional[ClientRegistry] = None
+
+        # Initialize the LLM, sharing one client per model configuration
+        if llm is None:
+            self._registry = registry or get_client_registry()
+            llm = self._registry.acquire(
+                "chat_openai",
+                {"model": model_name, "temperature": temperature},
+                lambda: _lazy("ChatOpenAI")(model=model_name, temperature=temperature),
+            )
+        self.llm = llm
+
+        self.logger.info("Initialized %s with model: %s", type(self.llm).__name__, model_name)
+
+    def close(self) -> None:
+        """Release the shared LLM client."""
+        if self._registry is not None:
+            self._registry.release(self.llm)
+            self._registry = None
 
     def create_chain(
-        self, prompt_template: str, memory: Optional[ConversationBufferMemory] = None
-    ) -> LLMChain:
+        self, prompt_template: str, memory: Optional["ConversationBufferMemory"] = None
+    ) -> "LLMChain":
         """
         Create a LangChain LLMChain with the specified prompt template.
 
@@ -57,19 +130,22 @@ class TekoChatModel:
         Returns:
             An initialized LLMChain
         """
-        prompt = PromptTemplate.from_template(prompt_template)
+        prompt = _lazy("PromptTemplate").from_template(prompt_template)
 
         if memory:
-            chain = LLMChain(llm=self.llm, prompt=prompt, memory=memory)
+            chain = _lazy("LLMChain")(llm=self.llm, prompt=prompt, memory=memory)
         else:
-            chain = LLMChain(llm=self.llm, prompt=prompt)
+            chain = _lazy("LLMChain")(llm=self.llm, prompt=prompt)
 
         return chain
 
-    def generate_response(self, chain: LLMChain, **kwargs) -> str:
+    def generate_response(self, chain: "LLMChain", **kwargs) -> str:
         """
         Generate a response using the provided chain and input variables.
 
+        When a response cache is configured, identical rendered prompts for the
+        same model and temperature are answered from the cache.
+
         Args:
             chain: The LLMChain to use for generation
             **kwargs: Input variables for the chain
@@ -77,60 +153,274 @@ class TekoChatModel:
         Returns:
             The generated response as a string
         """
+        cache_key = self._cache_key(chain, kwargs)
+        if cache_key is not None and self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             response: str = chain.run(**kwargs)
-            return response
         except Exception as e:
-            self.logger.error(f"Error generating response: {str(e)}", exc_info=True)
+            self.logger.error("Error generating response: %s", e, exc_info=True)
             return f"Error: {str(e)}"
 
+        if cache_key is not None and self.cache is not None:
+            self.cache.set(cache_key, response)
+        return response
+
+    async def agenerate_response(self, chain: "LLMChain", **kwargs) -> str:
+        """
+        Generate a response asynchronously using the provided chain.
+
+        Uses the chain's async entry point so the event loop is free while the
+        LLM request is in flight.
+
+        Args:
+            chain: The LLMChain to use for generation
+            **kwargs: Input variables for the chain
+
+        Returns:
+            The generated response as a string
+        """
+        cache_key = self._cache_key(chain, kwargs)
+        if cache_key is not None and self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            outputs = await chain.ainvoke(kwargs)
+            response: str = outputs[chain.output_key]
+        except Exception as e:
+            self.logger.error("Error generating response: %s", e, exc_info=True)
+            return f"Error: {str(e)}"
+
+        if cache_key is not None and self.cache is not None:
+            self.cache.set(cache_key, response)
+        return response
+
+    def generate_responses(
+        self, chain: "LLMChain", inputs: List[Dict[str, Any]], max_concurrency: int = 8
+    ) -> List[str]:
+        """
+        Generate responses for several sets of input variables with one chain.
+
+        Cached responses are reused, identical inputs are sent to the LLM
+        once, and the remaining requests run concurrently.
+
+        Args:
+            chain: The LLMChain to use for generation
+            inputs: Input variables for each response
+            max_concurrency: Maximum number of LLM requests in flight
+
+        Returns:
+            The generated responses, in the order of the inputs
+        """
+        responses: List[Optional[str]] = [None] * len(inputs)
+        unique_inputs: List[Dict[str, Any]] = []
+        positions: List[List[int]] = []
+        cache_keys: List[Optional[str]] = []
+        seen: Dict[str, int] = {}
+
+        for index, kwargs in enumerate(inputs):
+            cache_key = self._cache_key(chain, kwargs)
+            if cache_key is not None and self.cache is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    responses[index] = cached
+                    continue
+
+            # Chains with memory depend on more than their inputs, so never share
+            dedupe_key = None
+            if chain.memory is None:
+                dedupe_key = cache_key or json.dumps(kwargs, sort_keys=True, default=str)
+                if dedupe_key in seen:
+                    positions[seen[dedupe_key]].append(index)
+                    continue
+                seen[dedupe_key] = len(unique_inputs)
+
+            unique_inputs.append(kwargs)
+            positions.append([index])
+            cache_keys.append(cache_key)
+
+        if unique_inputs:
+            try:
+                outputs: List[Any] = chain.batch(
+                    unique_inputs,
+                    config={"max_concurrency": max_concurrency},
+                    return_exceptions=True,
+                )
+            except Exception as e:
+                outputs = [e] * len(unique_inputs)
+
+            for output, indexes, cache_key in zip(outputs, positions, cache_keys):
+                if isinstance(output, Exception):
+                    self.logger.error("Error generating response: %s", output)
+                    response = f"Error: {str(output)}"
+                else:
+                    response = output[chain.output_key]
+                    if cache_key is not None and self.cache is not None:
+                        self.cache.set(cache_key, response)
+                for index in indexes:
+                    responses[index] = response
+
+        return [response or "" for response in responses]
+
+    def _cache_key(self, chain: "LLMChain", inputs: Dict[str, Any]) -> Optional[str]:
+        """
+        Build the response cache key for a chain invocation.
+
+        Chains with conversation memory depend on more than their inputs and
+        are never cached.
+
+        Args:
+            chain: The LLMChain about to be run
+            inputs: Input variables for the chain
+
+        Returns:
+            The cache key, or None if the call should not be cached
+        """
+        if self.cache is None or chain.memory is not None:
+            return None
+
+        try:
+            prompt = chain.prompt.format(**inputs)
+        except (KeyError, ValueError):
+            return None
+
+        return ResponseCache.make_key(self.model_name, self.temperature, prompt)
+
 
 class TekoVectorStore:
     """
     Wrapper around LangChain's vector store for knowledge retrieval.
+
+    Texts are ingested in bulk: every text gets a stable ID derived from its
+    content and metadata, texts whose ID is already stored are skipped, and
+    the remaining ones are embedded and stored in batches, several batches at
+    a time. Re-indexing unchanged content therefore makes no embedding calls.
     """
 
-    def __init__(self, collection_name: str):
+    # Maximum number of IDs looked up in the vector store per query
+    LOOKUP_BATCH_SIZE = 500
+
+    # Maximum number of IDs remembered as stored; older ones are looked up again
+    MAX_KNOWN_IDS = 100_000
+
+    def __init__(
+        self,
+        collection_name: str,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        embeddings: Optional["Embeddings"] = None,
+        vectorstore: Optional["VectorStore"] = None,
+        embedding_model: str = "text-embedding-ada-002",
+        embedding_cache: Optional["EmbeddingCache"] = None,
+        persist_directory: str = "./data/vectorstore",
+        registry: Optional[ClientRegistry] = None,
+    ):
         """
         Initialize the vector store.
 
         Args:
             collection_name: Name of the collection to store vectors in
+            batch_size: Number of texts embedded and stored per request
+            max_concurrency: Maximum number of batches embedded concurrently
+            embeddings: Optional embeddings model (defaults to OpenAIEmbeddings)
+            vectorstore: Optional pre-built LangChain vector store (defaults to
+                a persistent Chroma collection using the embeddings)
+            embedding_model: OpenAI model used when no embeddings are given
+            embedding_cache: Optional cache of the model's vectors, used for both
+                stored texts and queries
+            persist_directory: Directory of the Chroma database
+            registry: Registry the embeddings and Chroma clients are shared
+                through (defaults to the process-wide registry)
         """
         self.logger = logging.getLogger("teko.langchain.vectorstore")
         self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self._registry = registry or get_client_registry()
+        self._shared_clients: List[Any] = []
+
+        # Initialize the embeddings, sharing one client per model
+        if embeddings is None:
+            embeddings = self._acquire(
+                "openai_embeddings",
+                {"model": embedding_model},
+                lambda: _lazy("OpenAIEmbeddings")(model=embedding_model),
+            )
+        self.embeddings = embeddings
+        if embedding_cache is not None:
+            self.embeddings = _lazy("CachedEmbeddings")(self.embeddings, embedding_cache)
+
+        # Initialize ChromaDB, sharing one database client per directory
+        if vectorstore is None:
+            client = self._acquire(
+                "chroma_client",
+                {"path": persist_directory},
+                lambda: _create_chroma_client(persist_directory),
+            )
+            vectorstore = _lazy("Chroma")(
+                collection_name=collection_name,
+                embedding_function=self.embeddings,
+                client=client,
+            )
+        self.vectorstore = vectorstore
+
+        # IDs known to be stored, most recently seen last, so repeated
+        # ingestion needs no lookups
+        self._known_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._known_ids_lock = threading.Lock()
+
+        self.logger.info("Initialized vectorstore with collection: %s", collection_name)
+
+    def close(self) -> None:
+        """Release the shared embeddings and Chroma clients."""
+        for client in self._shared_clients:
+            self._registry.release(client)
+        self._shared_clients = []
+
+    def _acquire(self, kind: str, config: Dict[str, Any], factory: Callable[[], Any]) -> Any:
+        """Acquire a shared client and remember to release it in close()."""
+        client = self._registry.acquire(kind, config, factory)
+        self._shared_clients.append(client)
+        return client
+
+    @staticmethod
+    def document_id(text: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Compute the stable ID of a text.
 
-        # Initialize the embeddings
-        self.embeddings = OpenAIEmbeddings()
-
-        # Initialize ChromaDB
-        self.vectorstore = Chroma(
-            collection_name=collection_name,
-            embedding_function=self.embeddings,
-            persist_directory="./data/vectorstore",
-        )
+        Args:
+            text: The text
+            metadata: The text's metadata
 
-        self.logger.info(f"Initialized vectorstore with collection: {collection_name}")
+        Returns:
+            Hex digest of the text and its metadata
+        """
+        payload = json.dumps([text, metadata or {}], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
     def add_texts(
-        self, texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None
+        self, texts: Iterable[str], metadatas: Optional[List[Dict[str, Any]]] = None
     ) -> List[str]:
         """
-        Add texts to the vector store.
+        Add texts to the vector store, skipping texts that are already stored.
 
         Args:
-            texts: List of text strings to add
+            texts: Text strings to add
             metadatas: Optional list of metadata dictionaries for each text
 
         Returns:
             List of IDs for the added texts
         """
-        ids = self.vectorstore.add_texts(texts=texts, metadatas=metadatas)
-        return ids
+        return self.ingest_texts(texts, metadatas)
 
-    def add_documents(self, documents: List[Document]) -> List[str]:
+    def add_documents(self, documents: List["Document"]) -> List[str]:
         """
-        Add documents to the vector store.
+        Add documents to the vector store, skipping documents that are already stored.
 
         Args:
             documents: List of Document objects to add
@@ -138,10 +428,126 @@ class TekoVectorStore:
         Returns:
             List of IDs for the added documents
         """
-        ids = self.vectorstore.add_documents(documents=documents)
+        return self.ingest_texts(
+            [document.page_content for document in documents],
+            [document.metadata for document in documents],
+        )
+
+    def ingest_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Embed and store texts in concurrent batches, skipping stored texts.
+
+        Args:
+            texts: Text strings to add
+            metadatas: Optional list of metadata dictionaries for each text
+            batch_size: Texts per batch (defaults to the store's batch_size)
+            max_concurrency: Concurrent batches (defaults to the store's max_concurrency)
+
+        Returns:
+            List of stable IDs, one per input text
+
+        Raises:
+            ValueError: If metadatas is given for a different number of texts
+        """
+        texts = list(texts)
+        if metadatas is not None and len(metadatas) != len(texts):
+            raise ValueError(f"Got {len(metadatas)} metadatas for {len(texts)} texts")
+        batch_size = batch_size or self.batch_size
+        max_concurrency = max_concurrency or self.max_concurrency
+
+        ids = [
+            self.document_id(text, metadatas[i] if metadatas else None)
+            for i, text in enumerate(texts)
+        ]
+
+        # Identical texts within the call are only stored once
+        positions: Dict[str, int] = {}
+        for i, text_id in enumerate(ids):
+            positions.setdefault(text_id, i)
+
+        new_ids = self._filter_stored(list(positions))
+        batches = [new_ids[i : i + batch_size] for i in range(0, len(new_ids), batch_size)]
+
+        def add_batch(batch: List[str]) -> None:
+            self.vectorstore.add_texts(
+                texts=[texts[positions[text_id]] for text_id in batch],
+                metadatas=(
+                    [metadatas[positions[text_id]] for text_id in batch] if metadatas else None
+                ),
+                ids=batch,
+            )
+            self._remember_stored(batch)
+
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as executor:
+                for future in [executor.submit(add_batch, batch) for batch in batches]:
+                    future.result()
+
+        self.logger.info(
+            "Ingested %d new texts in %d batches (%d already stored or duplicated)",
+            len(new_ids),
+            len(batches),
+            len(texts) - len(new_ids),
+        )
         return ids
 
-    def similarity_search(self, query: str, k: int = 5) -> List[Document]:
+    def _filter_stored(self, ids: List[str]) -> List[str]:
+        """
+        Drop the IDs that are already stored.
+
+        Args:
+            ids: Candidate IDs
+
+        Returns:
+            The IDs not yet in the vector store, in their original order
+        """
+        unknown = []
+        with self._known_ids_lock:
+            for text_id in ids:
+                if text_id in self._known_ids:
+                    self._known_ids.move_to_end(text_id)
+                else:
+                    unknown.append(text_id)
+
+        stored: Set[str] = set()
+        for i in range(0, len(unknown), self.LOOKUP_BATCH_SIZE):
+            stored.update(self._get_stored_ids(unknown[i : i + self.LOOKUP_BATCH_SIZE]))
+
+        self._remember_stored(stored)
+        return [text_id for text_id in unknown if text_id not in stored]
+
+    def _remember_stored(self, ids: Iterable[str]) -> None:
+        """Remember IDs as stored, forgetting the least recently seen beyond MAX_KNOWN_IDS."""
+        with self._known_ids_lock:
+            for text_id in ids:
+                self._known_ids[text_id] = None
+                self._known_ids.move_to_end(text_id)
+            while len(self._known_ids) > self.MAX_KNOWN_IDS:
+                self._known_ids.popitem(last=False)
+
+    def _get_stored_ids(self, ids: List[str]) -> Set[str]:
+        """
+        Look up which of the given IDs exist in the vector store.
+
+        Args:
+            ids: IDs to look up
+
+        Returns:
+            The subset of IDs that are stored
+        """
+        try:
+            return {document.id for document in self.vectorstore.get_by_ids(ids)}
+        except NotImplementedError:
+            # Stores without get_by_ids, such as the community Chroma store
+            return set(self.vectorstore.get(ids=ids, include=[])["ids"])
+
+    def similarity_search(self, query: str, k: int = 5) -> List["Document"]:
         """
         Perform a similarity search using the vector store.
 
@@ -155,7 +561,9 @@ class TekoVectorStore:
         docs = self.vectorstore.similarity_search(query=query, k=k)
         return docs
 
-    def similarity_search_with_score(self, query: str, k: int = 5) -> List[tuple[Document, float]]:
+    def similarity_search_with_score(
+        self, query: str, k: int = 5
+    ) -> List[tuple["Document", float]]:
         """
         Perform a similarity search with relevance scores.
 
@@ -168,3 +576,18 @@ class TekoVectorStore:
         """
         docs_and_scores = self.vectorstore.similarity_search_with_score(query=query, k=k)
         return docs_and_scores
+
+
+def _create_chroma_client(persist_directory: str) -> Any:
+    """
+    Create a persistent Chroma database client.
+
+    Args:
+        persist_directory: Directory of the Chroma database
+
+    Returns:
+        The chromadb client
+    """
+    import chromadb
+
+    return chromadb.PersistentClient(path=persist_directory)
@@ -0,0 +1,225 @@
+"""
+LLM Response Cache
+
+This module provides a two-tier cache for LLM responses. Responses are keyed
+on the model name, temperature and a hash of the fully rendered prompt, so
+re-running an identical prompt is served without an LLM round-trip. The
+first tier is an in-memory LRU; the optional second tier is a SQLite
+database shared across processes and restarts.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) cache for LLM responses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None,
+        max_disk_entries: int = 100_000,
+    ):
+        """
+        Initialize the cache. The database is opened on first use.
+
+        Args:
+            max_entries: Maximum number of responses kept in memory
+            ttl: Seconds after which a cached response expires, or None to keep
+                responses until they are evicted
+            path: Path of the SQLite database for the on-disk tier, or None for
+                a memory-only cache
+            max_disk_entries: Maximum number of responses kept on disk; the
+                least recently used responses are evicted beyond this
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model_name: str, temperature: float, prompt: str) -> str:
+        """
+        Build the cache key for a rendered prompt.
+
+        Args:
+            model_name: The model the prompt is sent to
+            temperature: The sampling temperature
+            prompt: The fully rendered prompt text
+
+        Returns:
+            Hex digest identifying the request
+        """
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            json.dumps([model_name, temperature, prompt_hash]).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            The cached response or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._memory[key]
+
+            connection = self._get_connection()
+            if connection is not None:
+                row = connection.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1], now):
+                    connection.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return str(row[0])
+                if row is not None:
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.evictions += 1
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            key: Cache key from make_key()
+            response: The LLM response to cache
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+
+            connection = self._get_connection()
+            if connection is None:
+                return
+
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+
+            # Trim the disk tier periodically rather than on every write
+            self._disk_writes += 1
+            if self._disk_writes % 100 == 0:
+                self._trim_disk(connection, now)
+
+    def clear(self) -> None:
+        """Remove every cached response from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            connection = self._get_connection()
+            if connection is not None:
+                connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the disk tier; it is reopened if the cache is used again."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary of hit, miss and eviction counters
+        """
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        """Check whether an entry created at created_at has outlived the TTL."""
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key: str, response: str, created_at: float) -> None:
+        """Store a response in the memory tier. Caller must hold the lock."""
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _trim_disk(self, connection: sqlite3.Connection, now: float) -> None:
+        """Drop expired and least recently used rows from the disk tier."""
+        if self.ttl is not None:
+            cursor = connection.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+            )
+            self.evictions += max(0, cursor.rowcount)
+
+        cursor = connection.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+        self.evictions += max(0, cursor.rowcount)
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier on first use. Caller must hold the lock."""
+        if self.path is None:
+            return None
+
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, timeout=30.0, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """)
+
+        return self._connection
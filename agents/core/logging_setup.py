@@ -0,0 +1,360 @@
+"""
+Logging Setup
+
+This module configures logging for the agents. Records are handed to a
+bounded queue and formatted and written by a listener thread, so the worker
+threads that log only build the record: messages use %-style arguments and
+are formatted on the listener. Each logger's debug and info records are
+rate limited, and the next record it emits after a burst notes how many
+records were suppressed.
+Records can be written as text or as JSON lines carrying the structured
+fields passed with extra=.
+
+The orchestrator calls configure_logging() once; like logging.basicConfig()
+it does nothing if the application has configured the root logger itself.
+The TEKO_LOG_LEVEL and TEKO_LOG_FORMAT ("text" or "json") environment
+variables override the defaults.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import IO, Any, Dict, List, Optional, Sequence
+
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__.keys()
+    | {"message", "asctime", "suppressed", "taskName"}
+)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per logger: lets a burst through, then a steady rate.
+
+    Warnings, errors and critical records always pass and use no tokens, so
+    an error storm is never hidden by the limit meant for chatty logging.
+    """
+
+    def __init__(self, rate: float = 100.0, burst: int = 1000):
+        """
+        Initialize the filter.
+
+        Args:
+            rate: Records per second each logger may emit on average
+            burst: Records a logger may emit at once after being quiet
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        # Logger name -> [available tokens, time of the last refill]
+        self._buckets: Dict[str, List[float]] = {}
+        self._suppressed: Dict[str, int] = {}
+        self.suppressed_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decide whether a record may pass.
+
+        Args:
+            record: The record
+
+        Returns:
+            False if the record is below WARNING and its logger exceeded its rate
+        """
+        if record.levelno >= logging.WARNING:
+            with self._lock:
+                suppressed = self._suppressed.pop(record.name, 0)
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [float(self.burst), now]
+            tokens = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1.0:
+                bucket[0] = tokens
+                self._suppressed[record.name] = self._suppressed.get(record.name, 0) + 1
+                self.suppressed_total += 1
+                return False
+            bucket[0] = tokens - 1.0
+            suppressed = self._suppressed.pop(record.name, 0)
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats records as text or JSON lines, including suppressed-record notes.
+    """
+
+    def __init__(self, fmt: str = DEFAULT_FORMAT, json_lines: bool = False):
+        """
+        Initialize the formatter.
+
+        Args:
+            fmt: Format of text records
+            json_lines: Write one JSON object per record instead of text
+        """
+        super().__init__(fmt)
+        self.json_lines = json_lines
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format a record.
+
+        Args:
+            record: The record
+
+        Returns:
+            The formatted record
+        """
+        suppressed = getattr(record, "suppressed", 0)
+        if not self.json_lines:
+            text = super().format(record)
+            if suppressed:
+                text += f" ({suppressed} earlier records suppressed)"
+            return text
+
+        data: Dict[str, Any] = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                data[key] = value
+        if suppressed:
+            data["suppressed"] = suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves message formatting to the listener thread.
+
+    The standard QueueHandler formats every record before queueing it. This
+    one only renders tracebacks, which would otherwise keep the failed
+    frames alive, so log arguments must not be mutated after logging.
+    """
+
+    def __init__(self, log_queue: "queue.SimpleQueue[logging.LogRecord]", max_pending: int):
+        """
+        Initialize the handler.
+
+        Args:
+            log_queue: Queue the listener reads from
+            max_pending: Maximum number of queued records; further records are
+                dropped until the listener catches up
+        """
+        super().__init__(log_queue)  # type: ignore[arg-type]
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._traceback_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Render the record's traceback, if any, and pass the record on unformatted."""
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queue a record, dropping it if the listener has fallen behind."""
+        # SimpleQueue puts are much cheaper than Queue's, but it has no maxsize
+        if self.queue.qsize() >= self.max_pending:
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """
+    Stream handler that leaves flushing to its caller.
+
+    The pipeline's listener flushes it whenever the queue runs empty, so a
+    burst of records is written with one flush instead of one per record.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write a formatted record without flushing the stream."""
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class _FlushingListener(logging.handlers.QueueListener):
+    """Queue listener flushing its handlers whenever the queue runs empty."""
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+
+class LogPipeline:
+    """
+    Rate-limited queue handler feeding a listener thread that writes records.
+    """
+
+    def __init__(
+        self,
+        handlers: Sequence[logging.Handler],
+        rate: Optional[float] = 100.0,
+        burst: int = 1000,
+        max_pending: int = 10_000,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            handlers: Handlers the listener writes records to; they are flushed
+                whenever the queue runs empty, see BufferedStreamHandler
+            rate: Records per second each logger may emit, or None for no limit
+            burst: Records a logger may emit at once after being quiet
+            max_pending: Maximum number of queued records; further records are
+                dropped until the listener catches up
+        """
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.handler = LazyQueueHandler(self.queue, max_pending)
+        self.rate_limit: Optional[RateLimitFilter] = None
+        if rate is not None:
+            self.rate_limit = RateLimitFilter(rate, burst)
+            self.handler.addFilter(self.rate_limit)
+        self.listener = _FlushingListener(
+            self.queue, *handlers, respect_handler_level=True  # type: ignore[arg-type]
+        )
+        self._running = False
+
+    def attach(self, logger: logging.Logger) -> None:
+        """
+        Send a logger's records through the pipeline.
+
+        Args:
+            logger: The logger
+        """
+        logger.addHandler(self.handler)
+
+    def detach(self, logger: logging.Logger) -> None:
+        """
+        Stop sending a logger's records through the pipeline.
+
+        Args:
+            logger: The logger
+        """
+        logger.removeHandler(self.handler)
+
+    def start(self) -> None:
+        """Start the listener thread."""
+        if not self._running:
+            self.listener.start()
+            self._running = True
+
+    def stop(self) -> None:
+        """Write the queued records and stop the listener thread."""
+        if self._running:
+            self.listener.stop()
+            self._running = False
+            for handler in self.listener.handlers:
+                handler.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get pipeline statistics.
+
+        Returns:
+            Dictionary of queued, dropped and rate-limited record counts
+        """
+        return {
+            "pending": self.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "suppressed": self.rate_limit.suppressed_total if self.rate_limit else 0,
+        }
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    json_lines: Optional[bool] = None,
+    rate: Optional[float] = 100.0,
+    burst: int = 1000,
+    stream: Optional[IO[str]] = None,
+    force: bool = False,
+) -> Optional[LogPipeline]:
+    """
+    Send the root logger's records through a queue to a stream handler.
+
+    Args:
+        level: Root logger level (default: $TEKO_LOG_LEVEL or INFO)
+        json_lines: Write JSON lines (default: $TEKO_LOG_FORMAT == "json")
+        rate: Records per second each logger may emit, or None for no limit
+        burst: Records a logger may emit at once after being quiet
+        stream: Stream to write to (default: stderr)
+        force: Replace the root logger's existing handlers
+
+    Returns:
+        The pipeline, or None if the root logger was already configured
+        elsewhere
+    """
+    global _pipeline
+    root = logging.getLogger()
+    with _pipeline_lock:
+        if not force:
+            if _pipeline is not None:
+                return _pipeline
+            if root.handlers:
+                return None
+
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        if _pipeline is not None:
+            _pipeline.stop()
+        else:
+            atexit.register(shutdown_logging)
+
+        if json_lines is None:
+            json_lines = os.environ.get("TEKO_LOG_FORMAT", "text") == "json"
+        handler = BufferedStreamHandler(stream)
+        handler.setFormatter(StructuredFormatter(json_lines=json_lines))
+
+        _pipeline = LogPipeline([handler], rate=rate, burst=burst)
+        _pipeline.attach(root)
+        root.setLevel((level or os.environ.get("TEKO_LOG_LEVEL") or "INFO").upper())
+        _pipeline.start()
+        return _pipeline
+
+
+def shutdown_logging() -> None:
+    """Write the queued records and stop the pipeline set up by configure_logging()."""
+    with _pipeline_lock:
+        if _pipeline is not None:
+            _pipeline.stop()
@@ -0,0 +1,529 @@
+"""
+Agent Memory Backends
+
+This module defines the storage behind BaseAgent.memory. The default
+LRUMemory keeps entries within a byte budget, evicting the least recently
+used ones and, optionally, entries older than a TTL. Evicted entries can be
+spilled to a SQLite file and are brought back into memory when they are
+read again. DictMemory is the unbounded dictionary agents used before.
+"""
+
+import itertools
+import os
+import pickle
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterator, List, MutableMapping, NamedTuple, Optional, Set
+
+# Default byte budget of an agent's memory
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Size estimates measure this many items per container, assuming the rest
+# are alike, follow nesting this deep and stop after this many values
+SIZE_SAMPLE_ITEMS = 32
+SIZE_MAX_DEPTH = 8
+SIZE_MAX_VALUES = 4096
+
+
+class MemoryBackend(MutableMapping[str, Any]):
+    """
+    Base class for agent memory backends.
+
+    Backends are mutable mappings from string keys to arbitrary values, so
+    existing code treating agent memory as a dictionary keeps working, and
+    add hit/miss statistics and a close() hook.
+    """
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get memory statistics.
+
+        Returns:
+            Dictionary of entry, hit, miss and eviction counters
+        """
+        return {"entries": len(self)}
+
+    def set(self, key: str, value: Any, size: Optional[int] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: The key to store the value under
+            value: The value
+            size: The value's size in bytes if known; backends that budget
+                memory estimate it otherwise
+        """
+        self[key] = value
+
+    def close(self) -> None:
+        """Release files or connections held by the backend."""
+
+
+class DictMemory(MemoryBackend):
+    """
+    Unbounded in-memory backend: a plain dictionary with hit and miss counters.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty memory."""
+        self._entries: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._entries[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get memory statistics.
+
+        Returns:
+            Dictionary of entry, hit and miss counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class _Entry(NamedTuple):
+    """A value held by LRUMemory with its measured size and expiry time."""
+
+    value: Any
+    size: int
+    expires_at: Optional[float]
+
+
+class LRUMemory(MemoryBackend):
+    """
+    Memory bounded by bytes and entries with LRU and TTL eviction.
+
+    Entry sizes are estimated when the entry is stored by walking a sample
+    of the value's nested items and attributes, or given by the caller
+    through set(); values mutated in place after storing are not
+    re-measured until they are stored again. With a spill path, evicted entries are
+    written to a SQLite database and moved back into memory when read; values
+    that cannot be pickled are dropped instead.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        spill_path: Optional[str] = None,
+        max_spill_entries: int = 100_000,
+    ):
+        """
+        Initialize the memory. The spill database is opened on first use.
+
+        Args:
+            max_bytes: Maximum total size of the entries kept in memory
+            max_entries: Maximum number of entries kept in memory, or None
+            ttl: Seconds after which an entry expires, or None to keep entries
+                until they are evicted
+            spill_path: Path of the SQLite database evicted entries are
+                spilled to, or None to drop evicted entries
+            max_spill_entries: Maximum number of spilled entries; the oldest
+                spilled entries are dropped beyond this
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.spill_path = spill_path
+        self.max_spill_entries = max_spill_entries
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._spill_writes = 0
+
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.spills = 0
+
+    def __getitem__(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+
+            spilled = self._load_spilled(key, now)
+            if spilled is None:
+                self.misses += 1
+                raise KeyError(key)
+
+            # Bring the entry back into memory, possibly spilling others
+            self._insert(key, spilled, now)
+            self.spill_hits += 1
+            return spilled.value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def set(self, key: str, value: Any, size: Optional[int] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: The key to store the value under
+            value: The value
+            size: The value's size in bytes, or None to estimate it
+        """
+        now = time.time()
+        if size is None:
+            size = _measure(value)
+        entry = _Entry(value, size, None if self.ttl is None else now + self.ttl)
+        with self._lock:
+            self._forget_spilled(key)
+            self._insert(key, entry, now)
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            found = key in self._entries
+            if found:
+                self._drop(key)
+            if not self._forget_spilled(key) and not found:
+                raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        # Membership tests do not count as lookups or refresh recency
+        with self._lock:
+            entry = self._entries.get(key)  # type: ignore[call-overload]
+            if entry is not None:
+                return not self._expired(entry, time.time())
+            connection = self._get_connection()
+            if connection is None:
+                return False
+            row = connection.execute(
+                "SELECT expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            return row is not None and (row[0] is None or row[0] > time.time())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def clear(self) -> None:
+        """Remove every entry from memory and the spill database."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            connection = self._get_connection()
+            if connection is not None:
+                connection.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get memory statistics.
+
+        Returns:
+            Dictionary of entry and byte counts and of hit, miss, eviction,
+            expiration and spill counters
+        """
+        with self._lock:
+            hits = self.hits + self.spill_hits
+            lookups = hits + self.misses
+            connection = self._get_connection()
+            spilled = 0
+            if connection is not None:
+                spilled = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "spilled_entries": spilled,
+                "hits": self.hits,
+                "spill_hits": self.spill_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "spills": self.spills,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        """Close the spill database; it is reopened if the memory is used again."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Get the memory's state for pickling, e.g. with an agent run in process mode.
+
+        Returns:
+            The instance dictionary without the lock and the database connection
+        """
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_connection"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restore the memory's state after unpickling.
+
+        Args:
+            state: The state returned by __getstate__()
+        """
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _keys(self) -> List[str]:
+        """Keys held in memory followed by spilled keys."""
+        with self._lock:
+            keys = list(self._entries)
+            connection = self._get_connection()
+            if connection is not None:
+                keys += [row[0] for row in connection.execute("SELECT key FROM entries")]
+            return keys
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        """Check whether an entry has outlived the TTL."""
+        return entry.expires_at is not None and now >= entry.expires_at
+
+    def _insert(self, key: str, entry: _Entry, now: float) -> None:
+        """Store an entry in memory and evict down to the budget. Caller must hold the lock."""
+        if key in self._entries:
+            self._drop(key)
+
+        if entry.size > self.max_bytes:
+            # Larger than the whole budget: goes straight to the spill database
+            self.evictions += 1
+            self._spill(key, entry, now)
+            return
+
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+        while self._bytes > self.max_bytes or (
+            self.max_entries is not None and len(self._entries) > self.max_entries
+        ):
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            if self._expired(evicted, now):
+                self.expirations += 1
+                continue
+            self.evictions += 1
+            self._spill(evicted_key, evicted, now)
+
+    def _drop(self, key: str) -> None:
+        """Remove an entry from memory. Caller must hold the lock."""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _spill(self, key: str, entry: _Entry, now: float) -> None:
+        """Write an evicted entry to the spill database. Caller must hold the lock."""
+        connection = self._get_connection()
+        if connection is None:
+            return
+
+        try:
+            blob = pickle.dumps(entry.value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, expires_at, spilled_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, blob, entry.size, entry.expires_at, now),
+        )
+        self.spills += 1
+
+        # Trim the spill database periodically rather than on every write
+        self._spill_writes += 1
+        if self._spill_writes % 100 == 0:
+            connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            connection.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY spilled_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_spill_entries,),
+            )
+
+    def _load_spilled(self, key: str, now: float) -> Optional[_Entry]:
+        """Take an entry out of the spill database. Caller must hold the lock."""
+        connection = self._get_connection()
+        if connection is None:
+            return None
+
+        row = connection.execute(
+            "SELECT value, size, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+        if row[2] is not None and now >= row[2]:
+            self.expirations += 1
+            return None
+        return _Entry(pickle.loads(row[0]), row[1], row[2])
+
+    def _forget_spilled(self, key: str) -> bool:
+        """Delete a spilled entry. Caller must hold the lock."""
+        connection = self._get_connection()
+        if connection is None:
+            return False
+        return connection.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount > 0
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        """Open the spill database on first use. Caller must hold the lock."""
+        if self.spill_path is None:
+            return None
+
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.spill_path, timeout=30.0, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    spilled_at REAL NOT NULL
+                )
+                """)
+
+        return self._connection
+
+
+def _measure(value: Any) -> int:
+    """
+    Estimate the size of a value in bytes without serializing it.
+
+    The estimate adds up the sizes of the value and of everything it holds:
+    the items of containers (keys and values of mappings) and the instance
+    attributes of objects, recursively. Of large containers only the first
+    SIZE_SAMPLE_ITEMS items are measured and scaled up to the container's
+    length, nesting deeper than SIZE_MAX_DEPTH counts only the container
+    itself, and the walk stops after SIZE_MAX_VALUES values, so the cost does
+    not grow with the value. Containers and objects held more than once
+    are counted once, which also ends reference cycles.
+
+    Args:
+        value: The value
+
+    Returns:
+        The estimated size
+    """
+    return _SizeEstimate().measure(value, 0)
+
+
+class _SizeEstimate:
+    """One walk of _measure(): the values seen and the remaining budget."""
+
+    def __init__(self) -> None:
+        self.seen: Set[int] = set()
+        self.remaining = SIZE_MAX_VALUES
+
+    def measure(self, value: Any, depth: int) -> int:
+        """Estimate the size of a value nested depth levels deep."""
+        self.remaining -= 1
+        size = sys.getsizeof(value)
+        if isinstance(value, (str, bytes, bytearray)):
+            return size
+        if id(value) in self.seen:
+            return 0
+        self.seen.add(id(value))
+        if depth >= SIZE_MAX_DEPTH or self.remaining <= 0:
+            return size
+
+        if not isinstance(value, (dict, list, tuple, set, frozenset, deque)):
+            attributes = getattr(value, "__dict__", None)
+            if not isinstance(attributes, dict):
+                return size
+            return size + self.measure(attributes, depth + 1)
+
+        if isinstance(value, dict):
+            sample = list(itertools.islice(value.items(), SIZE_SAMPLE_ITEMS))
+            sampled = sum(
+                self.measure(key, depth + 1) + self.measure(item, depth + 1) for key, item in sample
+            )
+        else:
+            sample = list(itertools.islice(value, SIZE_SAMPLE_ITEMS))
+            sampled = sum(self.measure(item, depth + 1) for item in sample)
+        if sample:
+            size += sampled * len(value) // len(sample)
+        return size
+
+
+def create_memory_backend(name: str, config: Dict[str, Any]) -> MemoryBackend:
+    """
+    Build an agent's memory backend from its configuration.
+
+    Config keys: memory_backend (a MemoryBackend instance, "lru" or "dict"),
+    memory_max_bytes, memory_max_entries, memory_ttl and memory_spill_dir
+    (the directory for the agent's spill database).
+
+    Args:
+        name: The agent's name, used to name its spill database
+        config: The agent's configuration
+
+    Returns:
+        The memory backend
+    """
+    backend = config.get("memory_backend", "lru")
+    if isinstance(backend, MemoryBackend):
+        return backend
+    if backend == "dict":
+        return DictMemory()
+    if backend != "lru":
+        raise ValueError(f"Unknown memory backend '{backend}'")
+
+    spill_path = None
+    spill_dir = config.get("memory_spill_dir")
+    if spill_dir:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        spill_path = os.path.join(spill_dir, f"{safe_name}.sqlite3")
+
+    return LRUMemory(
+        max_bytes=config.get("memory_max_bytes", DEFAULT_MAX_BYTES),
+        max_entries=config.get("memory_max_entries"),
+        ttl=config.get("memory_ttl"),
+        spill_path=spill_path,
+    )
@@ -0,0 +1,347 @@
+"""
+Orchestrator Metrics
+
+This module records task metrics for the orchestrator: queue-wait and
+execution-time histograms per agent type and priority, task outcome
+counters and worker busy time. Metrics are exported in the Prometheus text
+format, optionally from a local HTTP endpoint.
+
+Recording a finished task costs one lock acquisition, a dictionary lookup
+and a bisect per histogram, so it stays small next to task dispatch.
+"""
+
+import bisect
+import http.server
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Histogram bucket upper bounds in seconds, from fast dispatch to long LLM tasks
+DEFAULT_LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+    600.0,
+)
+
+# Label values of a task's histograms and counters: agent type and priority
+TaskLabels = Tuple[str, str]
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets, exported as cumulative Prometheus buckets.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets: Sorted bucket upper bounds; an implicit +Inf bucket follows
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Record a value.
+
+        Args:
+            value: The observed value
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Args:
+            q: The quantile, between 0 and 1
+
+        Returns:
+            The estimate (infinity if it falls in the +Inf bucket), or None if
+            nothing was observed
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _TaskSeries:
+    """The histograms and outcome counters of one agent type and priority."""
+
+    __slots__ = ("queue_wait", "duration", "outcomes")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.queue_wait = Histogram(buckets)
+        self.duration = Histogram(buckets)
+        self.outcomes: Dict[str, int] = {}
+
+
+class OrchestratorMetrics:
+    """
+    Task metrics of one orchestrator.
+
+    Each finished task is recorded with a single call, so the dispatch path
+    takes the metrics lock once per task.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Initialize the metrics.
+
+        Args:
+            buckets: Bucket upper bounds of the latency histograms, in seconds
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[TaskLabels, _TaskSeries] = {}
+        self._unroutable: Dict[str, int] = {}
+        self._busy_seconds = 0.0
+        self._started_at = time.time()
+
+    def mark_started(self) -> None:
+        """Start the window used for the utilization and throughput rates."""
+        with self._lock:
+            self._started_at = time.time()
+
+    def task_finished(
+        self,
+        agent_type: str,
+        priority: str,
+        queue_wait: float,
+        duration: float,
+        outcome: str,
+        busy: Optional[float] = None,
+    ) -> None:
+        """
+        Record a task an agent finished.
+
+        Args:
+            agent_type: The agent's type
+            priority: The task's priority level
+            queue_wait: Seconds the task spent in the queue
+            duration: Seconds the agent spent on the task
+            outcome: "completed" or "failed"
+            busy: Worker seconds the task used, if not its duration (tasks
+                processed as one batch share the batch's duration)
+        """
+        with self._lock:
+            series = self._series.get((agent_type, priority))
+            if series is None:
+                series = self._series[(agent_type, priority)] = _TaskSeries(self.buckets)
+            series.queue_wait.observe(queue_wait)
+            series.duration.observe(duration)
+            series.outcomes[outcome] = series.outcomes.get(outcome, 0) + 1
+            self._busy_seconds += duration if busy is None else busy
+
+    def task_unroutable(self, priority: str) -> None:
+        """
+        Record a task no agent could take.
+
+        Args:
+            priority: The task's priority level
+        """
+        with self._lock:
+            self._unroutable[priority] = self._unroutable.get(priority, 0) + 1
+
+    def snapshot(self, capacity: int) -> Dict[str, Any]:
+        """
+        Summarize the metrics.
+
+        Args:
+            capacity: Number of tasks the orchestrator can run at once
+
+        Returns:
+            Dictionary of worker utilization, throughput and per
+            "agent_type/priority" latency summaries
+        """
+        with self._lock:
+            elapsed = max(time.time() - self._started_at, 1e-9)
+            finished = sum(series.duration.count for series in self._series.values())
+            latency = {}
+            for labels, series in self._series.items():
+                queue_wait, duration = series.queue_wait, series.duration
+                latency["/".join(labels)] = {
+                    "count": duration.count,
+                    "queue_wait_mean": queue_wait.sum / queue_wait.count,
+                    "queue_wait_p95": queue_wait.quantile(0.95),
+                    "duration_mean": duration.sum / duration.count,
+                    "duration_p50": duration.quantile(0.5),
+                    "duration_p95": duration.quantile(0.95),
+                }
+            return {
+                "worker_utilization": min(1.0, self._busy_seconds / (elapsed * max(1, capacity))),
+                "throughput_per_second": finished / elapsed,
+                "latency": latency,
+            }
+
+    def render_prometheus(self, queue_depth: Dict[str, int], capacity: int, in_flight: int) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            queue_depth: Queued task count per priority level
+            capacity: Number of tasks the orchestrator can run at once
+            in_flight: Number of tasks currently being processed
+
+        Returns:
+            The exposition text
+        """
+        lines: List[str] = []
+        with self._lock:
+            series = sorted(self._series.items())
+            _histogram(
+                lines,
+                "teko_task_queue_wait_seconds",
+                "Time tasks spent queued before an agent picked them up.",
+                [(labels, entry.queue_wait) for labels, entry in series],
+            )
+            _histogram(
+                lines,
+                "teko_task_duration_seconds",
+                "Time agents spent processing tasks.",
+                [(labels, entry.duration) for labels, entry in series],
+            )
+
+            _header(lines, "teko_tasks_total", "Tasks finished, by outcome.", "counter")
+            for (agent_type, priority), entry in series:
+                for outcome, count in sorted(entry.outcomes.items()):
+                    labels = _labels(agent_type=agent_type, priority=priority, outcome=outcome)
+                    lines.append(f"teko_tasks_total{labels} {count}")
+            for priority, count in sorted(self._unroutable.items()):
+                labels = _labels(agent_type="", priority=priority, outcome="unroutable")
+                lines.append(f"teko_tasks_total{labels} {count}")
+
+            _header(
+                lines,
+                "teko_worker_busy_seconds_total",
+                "Time workers spent running tasks; divide its rate by teko_workers "
+                "for the utilization.",
+                "counter",
+            )
+            lines.append(f"teko_worker_busy_seconds_total {self._busy_seconds:.6f}")
+
+        _header(lines, "teko_tasks_in_flight", "Tasks currently being processed.", "gauge")
+        lines.append(f"teko_tasks_in_flight {in_flight}")
+
+        _header(lines, "teko_workers", "Number of tasks that can run at once.", "gauge")
+        lines.append(f"teko_workers {capacity}")
+
+        _header(lines, "teko_queue_depth", "Tasks waiting in the queue.", "gauge")
+        for priority, depth in queue_depth.items():
+            lines.append(f"teko_queue_depth{_labels(priority=priority)} {depth}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _header(lines: List[str], name: str, help_text: str, metric_type: str) -> None:
+    """Append the HELP and TYPE lines of a metric."""
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {metric_type}")
+
+
+def _histogram(
+    lines: List[str], name: str, help_text: str, histograms: List[Tuple[TaskLabels, Histogram]]
+) -> None:
+    """Append a labelled histogram family. Caller must hold the metrics lock."""
+    _header(lines, name, help_text, "histogram")
+    for (agent_type, priority), histogram in histograms:
+        cumulative = 0
+        bounds = [*(f"{bound:g}" for bound in histogram.buckets), "+Inf"]
+        for bound, count in zip(bounds, histogram.counts):
+            cumulative += count
+            labels = _labels(agent_type=agent_type, priority=priority, le=bound)
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _labels(agent_type=agent_type, priority=priority)
+        lines.append(f"{name}_sum{labels} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{labels} {histogram.count}")
+
+
+def _labels(**labels: str) -> str:
+    """Format Prometheus labels, escaping backslashes, quotes and newlines."""
+    pairs = []
+    for name, value in labels.items():
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class MetricsServer:
+    """
+    Local HTTP endpoint serving Prometheus metrics at /metrics.
+    """
+
+    def __init__(self, render: Callable[[], str], port: int = 9464, host: str = "127.0.0.1"):
+        """
+        Initialize the server.
+
+        Args:
+            render: Returns the current exposition text
+            port: Port to listen on; 0 picks a free port
+            host: Interface to listen on
+        """
+        self.render = render
+
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = server.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Serve metrics on a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="teko-metrics", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
@@ -5,32 +5,82 @@ This module provides the orchestration system for Teko agents.
 It manages agent scheduling, priority management, and resource allocation.
 """
 
+import asyncio
+import contextlib
 import logging
-import queue
 import threading
 import time
-from typing import Any, Dict, Optional, Type
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Coroutine, Dict, List, Optional, Set, Tuple, Type
 
 from agents.core.base_agent import BaseAgent
+from agents.core.knowledge_store import KnowledgeStore
+from agents.core.logging_setup import configure_logging
+from agents.core.metrics import MetricsServer, OrchestratorMetrics
+from agents.core.profiling import Tracer, get_tracer
+from agents.core.queue_backends import MemoryQueueBackend, QueueBackend
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+
+def _run_agent_batch(agent: BaseAgent, tasks: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Run a batch of tasks on an agent inside a worker process.
+
+    Args:
+        agent: A picklable copy of the agent
+        tasks: The tasks to process
+
+    Returns:
+        The agent's results and exceptions, one per task
+    """
+    return agent.process_batch(tasks)
+
+
+def _run_agent_task(agent: BaseAgent, task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run a task on an agent inside a worker process.
+
+    Defined at module level so it can be pickled by ProcessPoolExecutor.
+
+    Args:
+        agent: The agent to run the task on (a pickled copy of the original)
+        task: The task to process
+
+    Returns:
+        The agent's result for the task
+    """
+    return agent.process_task(task)
+
+
+# Priority levels in dispatch order; unknown priorities are treated as medium
+PRIORITY_LEVELS = {"high": 0, "medium": 1, "low": 2}
 
 
 class TaskQueue:
     """
     A priority queue for agent tasks with different priority levels.
+
+    Tasks are ordered by priority level and insertion order, so tasks of the
+    same priority are dispatched first in, first out. Storage is delegated to
+    a QueueBackend; the in-memory backend is used by default. Consumers block
+    in get() and are woken as soon as a task is added.
     """
 
-    def __init__(self):
-        """Initialize the task queues with different priority levels."""
-        self.high_priority: queue.Queue[Dict[str, Any]] = queue.Queue()
-        self.medium_priority: queue.Queue[Dict[str, Any]] = queue.Queue()
-        self.low_priority: queue.Queue[Dict[str, Any]] = queue.Queue()
+    def __init__(self, backend: Optional[QueueBackend] = None):
+        """
+        Initialize the task queue.
+
+        Args:
+            backend: Storage backend for queued tasks (defaults to in-memory)
+        """
+        self.backend = backend or MemoryQueueBackend()
         self.logger = logging.getLogger("teko.orchestrator.queue")
 
+        # Tasks that were added but not yet marked done, used to drain the queue.
+        # Tasks already stored in a persistent backend count as unfinished too.
+        self._unfinished_tasks = self.backend.qsize()
+        self._all_tasks_done = threading.Condition()
+
     def add_task(self, task: Dict[str, Any], priority: str = "medium") -> None:
         """
         Add a task to the queue with specified priority.
@@ -39,36 +89,152 @@ class TaskQueue:
             task: The task to add
             priority: Priority level (high, medium, low)
         """
-        if priority == "high":
-            self.high_priority.put(task)
-        elif priority == "low":
-            self.low_priority.put(task)
-        else:  # Default to medium
-            self.medium_priority.put(task)
+        if priority not in PRIORITY_LEVELS:  # Default to medium
+            priority = "medium"
+
+        # Counted before the put so a worker finishing the task cannot see it
+        # uncounted; a failed put (e.g. a task the backend cannot serialize)
+        # takes it back
+        with self._all_tasks_done:
+            self._unfinished_tasks += 1
+        try:
+            self.backend.put(task, PRIORITY_LEVELS[priority])
+        except BaseException:
+            self._uncount(1)
+            raise
+
+        self.logger.info(
+            "Added task %s with %s priority",
+            task.get("id", "unknown"),
+            priority,
+            extra={"task_id": task.get("id"), "priority": priority},
+        )
+
+    def add_tasks(self, tasks: List[Dict[str, Any]], priority: str = "medium") -> None:
+        """
+        Add several tasks with the same priority in one backend operation.
 
-        self.logger.info(f"Added task {task.get('id', 'unknown')} with {priority} priority")
+        Args:
+            tasks: The tasks to add
+            priority: Priority level (high, medium, low)
+        """
+        if not tasks:
+            return
+        if priority not in PRIORITY_LEVELS:  # Default to medium
+            priority = "medium"
+
+        with self._all_tasks_done:
+            self._unfinished_tasks += len(tasks)
+        level = PRIORITY_LEVELS[priority]
+        try:
+            self.backend.put_many([(task, level) for task in tasks])
+        except BaseException:
+            self._uncount(len(tasks))
+            raise
+
+        self.logger.info(
+            "Added %d tasks with %s priority",
+            len(tasks),
+            priority,
+            extra={"task_count": len(tasks), "priority": priority},
+        )
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Remove and return the highest priority task.
+
+        Args:
+            block: Wait for a task if the queue is empty
+            timeout: Maximum number of seconds to wait, or None to wait forever
+
+        Returns:
+            The next task, or None if no task arrived before the timeout or
+            waiting consumers were released with wake_all()
+        """
+        return self.backend.get(block=block, timeout=timeout)
+
+    def get_many(
+        self, max_items: int, block: bool = True, timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Remove and return up to max_items tasks in priority order.
+
+        Only the first task is waited for; the rest are taken if available.
+
+        Args:
+            max_items: Maximum number of tasks to return
+            block: Wait for the first task if the queue is empty
+            timeout: Maximum number of seconds to wait, or None to wait forever
+
+        Returns:
+            List of tasks, empty if no task arrived before the timeout
+        """
+        return self.backend.get_many(max_items, block=block, timeout=timeout)
 
     def get_next_task(self) -> Optional[Dict[str, Any]]:
         """
-        Get the next task from the highest priority queue that has tasks.
+        Get the next task from the highest priority level that has tasks.
 
         Returns:
-            The next task or None if all queues are empty
+            The next task or None if the queue is empty
         """
-        try:
-            # Check queues in priority order
-            if not self.high_priority.empty():
-                return self.high_priority.get_nowait()
+        return self.get(block=False)
 
-            if not self.medium_priority.empty():
-                return self.medium_priority.get_nowait()
+    def wake_all(self) -> None:
+        """Release every consumer currently blocked in get()."""
+        self.backend.wake_all()
 
-            if not self.low_priority.empty():
-                return self.low_priority.get_nowait()
+    def qsize(self) -> int:
+        """
+        Get the number of tasks waiting in the queue.
 
-            return None
-        except queue.Empty:
-            return None
+        Returns:
+            The number of queued tasks
+        """
+        return self.backend.qsize()
+
+    def depth_by_priority(self) -> Dict[str, int]:
+        """
+        Get the number of queued tasks for each priority level.
+
+        Returns:
+            Dictionary mapping priority level to queued task count
+        """
+        depth = self.backend.depth()
+        return {priority: depth.get(level, 0) for priority, level in PRIORITY_LEVELS.items()}
+
+    def task_done(self, task: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Mark a task returned by get() or get_next_task() as finished.
+
+        Args:
+            task: The finished task; acknowledged with the backend when given
+        """
+        if task is not None:
+            self.backend.ack(task)
+
+        self._uncount(1)
+
+    def _uncount(self, count: int) -> None:
+        """Remove finished or failed tasks from the unfinished count, waking join() at zero."""
+        with self._all_tasks_done:
+            # Tasks added by another process sharing the backend are not counted
+            self._unfinished_tasks = max(0, self._unfinished_tasks - count)
+            if self._unfinished_tasks == 0:
+                self._all_tasks_done.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every added task has been marked done.
+
+        Args:
+            timeout: Maximum number of seconds to wait, or None to wait forever
+
+        Returns:
+            True if all tasks finished, False if the timeout expired first
+        """
+        with self._all_tasks_done:
+            return self._all_tasks_done.wait_for(lambda: self._unfinished_tasks == 0, timeout)
 
 
 class Orchestrator:
@@ -76,30 +242,113 @@ class Orchestrator:
     Agent orchestration system that coordinates and schedules agent tasks.
     """
 
-    def __init__(self):
-        """Initialize the orchestrator with empty agent and task registries."""
+    def __init__(
+        self,
+        max_workers: int = 1,
+        process_workers: Optional[int] = None,
+        agent_concurrency: Optional[Dict[str, int]] = None,
+        poll_timeout: float = 1.0,
+        mode: str = "thread",
+        max_async_tasks: int = 100,
+        queue_backend: Optional[QueueBackend] = None,
+        knowledge_store: Optional[KnowledgeStore] = None,
+        tracer: Optional[Tracer] = None,
+        batch_size: int = 1,
+        batch_wait: float = 0.0,
+    ):
+        """
+        Initialize the orchestrator with empty agent and task registries.
+
+        Args:
+            max_workers: Number of worker threads pulling tasks from the queue
+            process_workers: Size of the process pool used for agents whose
+                execution_mode is "process" (defaults to the number of CPUs)
+            agent_concurrency: Optional mapping of agent type to the maximum
+                number of tasks of that type that may run at the same time
+            poll_timeout: Maximum number of seconds an idle worker blocks waiting
+                for a task before re-checking whether the orchestrator is running
+            mode: "thread" to run tasks on worker threads, or "async" to run them
+                concurrently on one asyncio event loop via BaseAgent.aprocess_task
+            max_async_tasks: Maximum number of tasks in flight in async mode
+            queue_backend: Storage backend for the task queue (defaults to an
+                in-memory queue; use SQLiteQueueBackend for crash-safe queues)
+            knowledge_store: Store through which agents share analysis results
+                (defaults to a memory-only store)
+            tracer: Tracer recording task traces (defaults to the process-wide
+                tracer, which is off unless enabled)
+            batch_size: Maximum number of queued tasks a worker takes at once;
+                tasks routed to the same agent are passed to its
+                process_batch() (or aprocess_batch() in async mode) together
+            batch_wait: Maximum number of seconds a worker holding fewer than
+                batch_size tasks waits for more before processing them
+        """
+        if mode not in ("thread", "async"):
+            raise ValueError(f"Unknown orchestrator mode '{mode}'")
+
+        # Queue-based logging, unless the application configured logging itself
+        configure_logging()
+
         self.agents: Dict[str, BaseAgent] = {}
         self.agent_classes: Dict[str, Type[BaseAgent]] = {}
-        self.task_queue = TaskQueue()
+        self.task_queue = TaskQueue(backend=queue_backend)
+        self.knowledge_store = knowledge_store or KnowledgeStore()
+
+        # Routing index: task type -> agents declaring it, plus agents that
+        # declare no types and must be asked with can_handle_task()
+        self._agents_by_task_type: Dict[str, List[BaseAgent]] = {}
+        self._untyped_agents: List[BaseAgent] = []
+        self._agent_load: Dict[str, int] = {}
+        self._routing_lock = threading.Lock()
+
         self.running = False
-        self.worker_thread = None
+        self.max_workers = max(1, max_workers)
+        self.poll_timeout = poll_timeout
+        self.mode = mode
+        self.max_async_tasks = max(1, max_async_tasks)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = max(0.0, batch_wait)
+        self.process_workers = process_workers
+        self.worker_threads: List[threading.Thread] = []
         self.logger = logging.getLogger("teko.orchestrator")
 
+        # Per agent type concurrency limits
+        self.agent_concurrency: Dict[str, int] = dict(agent_concurrency or {})
+        self._type_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._async_type_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
         # Stats and monitoring
+        self._stats_lock = threading.Lock()
         self.tasks_processed = 0
         self.tasks_succeeded = 0
         self.tasks_failed = 0
+        self.metrics = OrchestratorMetrics()
+        self.tracer = tracer or get_tracer()
+        self._metrics_server: Optional[MetricsServer] = None
+
+        # Futures of tasks added with submit(), keyed by task id
+        self._futures: Dict[Any, Future] = {}
+        self._futures_lock = threading.Lock()
 
-    def register_agent_class(self, agent_type: str, agent_class: Type[BaseAgent]) -> None:
+    def register_agent_class(
+        self,
+        agent_type: str,
+        agent_class: Type[BaseAgent],
+        max_concurrency: Optional[int] = None,
+    ) -> None:
         """
         Register an agent class for a specific agent type.
 
         Args:
             agent_type: The type of agent (codebase_analysis, implementation, etc.)
             agent_class: The agent class to register
+            max_concurrency: Optional limit on concurrently running tasks of this type
         """
         self.agent_classes[agent_type] = agent_class
-        self.logger.info(f"Registered {agent_class.__name__} for agent type '{agent_type}'")
+        if max_concurrency is not None:
+            self.agent_concurrency[agent_type] = max_concurrency
+        self.logger.info("Registered %s for agent type '%s'", agent_class.__name__, agent_type)
 
     def create_agent(
         self, agent_type: str, name: str, config: Optional[Dict[str, Any]] = None
@@ -116,16 +365,73 @@ class Orchestrator:
             The created agent or None if agent_type is not registered
         """
         if agent_type not in self.agent_classes:
-            self.logger.error(f"No agent class registered for type '{agent_type}'")
+            self.logger.error("No agent class registered for type '%s'", agent_type)
             return None
 
         agent_class = self.agent_classes[agent_type]
         agent = agent_class(name=name, agent_type=agent_type, config=config)
-        self.agents[name] = agent
+        self.register_agent(agent)
+
+        self.logger.info("Created agent '%s' of type '%s'", name, agent_type)
+        return agent
+
+    def register_agent(self, agent: BaseAgent) -> None:
+        """
+        Register an agent instance, add it to the routing index and give it
+        the shared knowledge store.
+
+        Args:
+            agent: The agent to register; replaces any agent with the same name
+        """
+        agent.knowledge = self.knowledge_store
+        with self._routing_lock:
+            if agent.name in self.agents:
+                self._unindex_agent(self.agents[agent.name])
+
+            self.agents[agent.name] = agent
+            self._agent_load.setdefault(agent.name, 0)
+
+            if agent.handled_task_types:
+                for task_type in agent.handled_task_types:
+                    self._agents_by_task_type.setdefault(task_type.lower(), []).append(agent)
+            else:
+                self._untyped_agents.append(agent)
+
+    def remove_agent(self, name: str, close: bool = False) -> Optional[BaseAgent]:
+        """
+        Remove an agent from the orchestrator and the routing index.
+
+        Args:
+            name: The name of the agent to remove
+            close: Also close the agent, releasing its shared clients
 
-        self.logger.info(f"Created agent '{name}' of type '{agent_type}'")
+        Returns:
+            The removed agent or None if no agent has that name
+        """
+        with self._routing_lock:
+            agent = self.agents.pop(name, None)
+            if agent is not None:
+                self._unindex_agent(agent)
+                self._agent_load.pop(name, None)
+
+        if agent is not None and close:
+            agent.close()
         return agent
 
+    def _unindex_agent(self, agent: BaseAgent) -> None:
+        """
+        Remove an agent from the routing index. Caller must hold the routing lock.
+
+        Args:
+            agent: The agent to remove
+        """
+        for task_type in agent.handled_task_types:
+            candidates = self._agents_by_task_type.get(task_type.lower(), [])
+            if agent in candidates:
+                candidates.remove(agent)
+        if agent in self._untyped_agents:
+            self._untyped_agents.remove(agent)
+
     def add_task(self, task: Dict[str, Any], priority: str = "medium") -> None:
         """
         Add a task to be processed by an appropriate agent.
@@ -137,69 +443,559 @@ class Orchestrator:
         # Add some metadata to the task
         task["added_time"] = time.time()
         task["status"] = "pending"
+        task["priority"] = priority if priority in PRIORITY_LEVELS else "medium"
 
         # Add to the queue
         self.task_queue.add_task(task, priority=priority)
 
+    def add_tasks(self, tasks: List[Dict[str, Any]], priority: str = "medium") -> None:
+        """
+        Add several tasks with the same priority at once.
+
+        Args:
+            tasks: The task data dictionaries
+            priority: The priority level for the tasks (high, medium, low)
+        """
+        added_time = time.time()
+        level = priority if priority in PRIORITY_LEVELS else "medium"
+        for task in tasks:
+            task["added_time"] = added_time
+            task["status"] = "pending"
+            task["priority"] = level
+
+        self.task_queue.add_tasks(tasks, priority=priority)
+
+    def submit(self, task: Dict[str, Any], priority: str = "medium") -> Future:
+        """
+        Add a task and get a future for its result.
+
+        The future resolves with the agent's result, or with the exception the
+        agent raised (LookupError if no agent can handle the task). Tasks
+        without an id are given one.
+
+        Args:
+            task: The task data dictionary
+            priority: The priority level for the task (high, medium, low)
+
+        Returns:
+            Future resolved when the task has been processed
+
+        Raises:
+            ValueError: If a submitted task with the same id is still pending
+            Exception: Whatever the queue raised if the task could not be added
+        """
+        if task.get("id") is None:
+            task["id"] = uuid.uuid4().hex
+
+        future: Future = Future()
+        with self._futures_lock:
+            if task["id"] in self._futures:
+                raise ValueError(f"Task {task['id']!r} is already submitted and pending")
+            self._futures[task["id"]] = future
+
+        try:
+            self.add_task(task, priority=priority)
+        except BaseException as e:
+            with self._futures_lock:
+                self._futures.pop(task["id"], None)
+            future.set_exception(e)
+            raise
+        return future
+
+    def _resolve_future(
+        self,
+        task: Dict[str, Any],
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Resolve the future of a task added with submit(), if any.
+
+        Args:
+            task: The processed task
+            result: The agent's result for the task
+            error: The exception that ended the task, if it failed
+        """
+        with self._futures_lock:
+            future = self._futures.pop(task.get("id"), None)
+        if future is None or future.cancelled():
+            return
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
     def _process_tasks(self) -> None:
         """Process tasks from the queue in a worker thread."""
         self.logger.info("Task processing started")
 
         while self.running:
-            task = self.task_queue.get_next_task()
+            if self.batch_size > 1:
+                for agent, tasks in self._route_batch(self._next_batch()):
+                    self._run_batch(agent, tasks)
+                continue
+
+            # Block until a task is added, the poll times out or stop() wakes us
+            task = self.task_queue.get(timeout=self.poll_timeout)
 
             if task is None:
-                # No tasks in queue, sleep briefly
-                time.sleep(1)
                 continue
 
-            # Find appropriate agent for the task
-            agent = self._find_agent_for_task(task)
-
+            agent = self._begin_task(task)
             if agent is None:
-                self.logger.warning(f"No suitable agent found for task {task.get('id', 'unknown')}")
-                # Re-queue with lower priority or log failure
-                task["status"] = "agent_not_found"
-                self.tasks_failed += 1
                 continue
 
-            # Update task status
-            task["status"] = "processing"
-            task["agent"] = agent.name
-            task["start_time"] = time.time()
-
             try:
-                # Process the task
-                self.logger.info(
-                    f"Agent '{agent.name}' processing task {task.get('id', 'unknown')}"
+                with self.tracer.trace_task(agent, task):
+                    result = self._run_agent_task(agent, task)
+            except Exception as e:
+                self._fail_task(agent, task, e)
+            else:
+                self._complete_task(agent, task, result)
+            finally:
+                self._release_agent(agent)
+                self.task_queue.task_done(task)
+
+    async def _aprocess_tasks(self) -> None:
+        """Process tasks from the queue concurrently on the running event loop."""
+        self.logger.info("Async task processing started")
+
+        loop = asyncio.get_running_loop()
+        # Sync agents are bridged onto the loop's default executor
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="teko-bridge")
+        )
+        # Blocking queue reads get their own thread so they never starve the bridge
+        queue_reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="teko-queue")
+        slots = asyncio.Semaphore(self.max_async_tasks)
+        in_flight: Set[asyncio.Task] = set()
+
+        try:
+            while self.running:
+                await slots.acquire()
+                jobs: List[Coroutine[Any, Any, None]] = []
+                if self.batch_size > 1:
+                    batch = await loop.run_in_executor(queue_reader, self._next_batch)
+                    for agent, tasks in self._route_batch(batch):
+                        jobs.append(self._arun_batch(agent, tasks))
+                else:
+                    task = await loop.run_in_executor(
+                        queue_reader, self.task_queue.get, True, self.poll_timeout
+                    )
+                    agent = self._begin_task(task) if task is not None else None
+                    if task is not None and agent is not None:
+                        jobs.append(self._arun_task(agent, task))
+
+                if not jobs:
+                    slots.release()
+                    continue
+
+                # Each job takes a slot; a batch counts as one job
+                for index, coroutine in enumerate(jobs):
+                    if index > 0:
+                        await slots.acquire()
+                    job = asyncio.create_task(coroutine)
+                    in_flight.add(job)
+                    job.add_done_callback(in_flight.discard)
+                    job.add_done_callback(lambda _: slots.release())
+
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+        finally:
+            queue_reader.shutdown(wait=False)
+            self._async_type_semaphores = {}
+
+    async def _arun_task(self, agent: BaseAgent, task: Dict[str, Any]) -> None:
+        """
+        Run a task on an agent from the event loop and record the outcome.
+
+        Args:
+            agent: The agent selected for the task
+            task: The task to process
+        """
+        limit = self.agent_concurrency.get(agent.agent_type)
+        semaphore: Any = contextlib.nullcontext()
+        if limit is not None:
+            if agent.agent_type not in self._async_type_semaphores:
+                self._async_type_semaphores[agent.agent_type] = asyncio.Semaphore(max(1, limit))
+            semaphore = self._async_type_semaphores[agent.agent_type]
+
+        try:
+            # Tasks interleave on the loop thread, so they are never profiled
+            async with semaphore:
+                with self.tracer.trace_task(agent, task, profile=False):
+                    if agent.execution_mode == "process":
+                        loop = asyncio.get_running_loop()
+                        result = await loop.run_in_executor(
+                            self._get_process_pool(), _run_agent_task, agent, task
+                        )
+                    else:
+                        result = await agent.aprocess_task(task)
+        except Exception as e:
+            self._fail_task(agent, task, e)
+        else:
+            self._complete_task(agent, task, result)
+        finally:
+            self._release_agent(agent)
+            self.task_queue.task_done(task)
+
+    async def _arun_batch(self, agent: BaseAgent, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Run a batch of tasks on an agent from the event loop and record the outcomes.
+
+        Args:
+            agent: The agent selected for the tasks
+            tasks: The tasks to process
+        """
+        limit = self.agent_concurrency.get(agent.agent_type)
+        semaphore: Any = contextlib.nullcontext()
+        if limit is not None:
+            if agent.agent_type not in self._async_type_semaphores:
+                self._async_type_semaphores[agent.agent_type] = asyncio.Semaphore(max(1, limit))
+            semaphore = self._async_type_semaphores[agent.agent_type]
+
+        results: List[Any]
+        try:
+            async with semaphore:
+                with self.tracer.trace_task(agent, self._batch_trace_task(tasks), profile=False):
+                    if agent.execution_mode == "process":
+                        loop = asyncio.get_running_loop()
+                        results = await loop.run_in_executor(
+                            self._get_process_pool(), _run_agent_batch, agent, tasks
+                        )
+                    else:
+                        results = await agent.aprocess_batch(tasks)
+        except Exception as e:
+            results = [e] * len(tasks)
+        self._finish_batch(agent, tasks, results)
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """
+        Take up to batch_size tasks from the queue.
+
+        Blocks up to poll_timeout for the first task, then up to batch_wait
+        for the batch to fill.
+
+        Returns:
+            The tasks, empty if none arrived
+        """
+        tasks = self.task_queue.get_many(self.batch_size, timeout=self.poll_timeout)
+        if tasks and self.batch_wait > 0:
+            deadline = time.monotonic() + self.batch_wait
+            while len(tasks) < self.batch_size and self.running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                tasks.extend(
+                    self.task_queue.get_many(self.batch_size - len(tasks), timeout=remaining)
                 )
-                result = agent.process_task(task)
+        return tasks
 
-                # Update task with result
-                task["status"] = "completed"
-                task["complete_time"] = time.time()
-                task["result"] = result
+    def _route_batch(
+        self, tasks: List[Dict[str, Any]]
+    ) -> List[Tuple[BaseAgent, List[Dict[str, Any]]]]:
+        """
+        Route dequeued tasks, keeping tasks of the same type on the same agent.
 
-                self.tasks_processed += 1
-                self.tasks_succeeded += 1
+        The first task of each type is routed normally; the following tasks of
+        that type go to the same agent if it accepts them, so they can be
+        processed as one batch.
 
-                self.logger.info(f"Task {task.get('id', 'unknown')} completed successfully")
-            except Exception as e:
-                # Handle task failure
-                self.logger.error(f"Error processing task {task.get('id', 'unknown')}: {str(e)}")
-                task["status"] = "failed"
-                task["error"] = str(e)
-                task["complete_time"] = time.time()
+        Args:
+            tasks: The tasks taken from the queue
+
+        Returns:
+            The reserved agents with their tasks; unroutable tasks are marked
+            as failed and done
+        """
+        batches: Dict[str, Tuple[BaseAgent, List[Dict[str, Any]]]] = {}
+        agents_by_type: Dict[str, BaseAgent] = {}
+        for task in tasks:
+            task_type = str(task.get("type", "")).lower()
+            agent = agents_by_type.get(task_type)
+            if agent is not None and "agent_name" not in task and agent.can_handle_task(task):
+                self._reserve_agent(agent)
+                self._start_task(agent, task)
+            else:
+                agent = self._begin_task(task)
+                if agent is None:
+                    continue
+                if "agent_name" not in task:
+                    agents_by_type[task_type] = agent
+            batches.setdefault(agent.name, (agent, []))[1].append(task)
+        return list(batches.values())
+
+    def _run_batch(self, agent: BaseAgent, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Run a batch of tasks on an agent in a worker thread and record the outcomes.
+
+        Args:
+            agent: The agent selected for the tasks
+            tasks: The tasks to process
+        """
+        results: List[Any]
+        try:
+            with self.tracer.trace_task(agent, self._batch_trace_task(tasks)):
+                results = self._run_agent_batch(agent, tasks)
+        except Exception as e:
+            results = [e] * len(tasks)
+        self._finish_batch(agent, tasks, results)
+
+    def _run_agent_batch(self, agent: BaseAgent, tasks: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Run a batch on an agent, honouring its execution mode and type limit.
+
+        A batch counts once against the agent type's concurrency limit.
+
+        Args:
+            agent: The agent selected for the tasks
+            tasks: The tasks to process
+
+        Returns:
+            The agent's results and exceptions, one per task
+        """
+        semaphore = self._get_type_semaphore(agent.agent_type)
+        if semaphore is not None:
+            semaphore.acquire()
+
+        try:
+            if agent.execution_mode == "process":
+                future = self._get_process_pool().submit(_run_agent_batch, agent, tasks)
+                return future.result()
+
+            return agent.process_batch(tasks)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    def _finish_batch(
+        self, agent: BaseAgent, tasks: List[Dict[str, Any]], results: List[Any]
+    ) -> None:
+        """
+        Record the outcome of every task of a batch and release the agent for each.
 
-                self.tasks_processed += 1
+        Args:
+            agent: The agent that processed the tasks
+            tasks: The processed tasks
+            results: The agent's results and exceptions, one per task
+        """
+        if len(results) != len(tasks):
+            error = ValueError(
+                f"Agent '{agent.name}' returned {len(results)} results for {len(tasks)} tasks"
+            )
+            results = [error] * len(tasks)
+
+        for task, result in zip(tasks, results):
+            task["batch_size"] = len(tasks)
+            try:
+                if isinstance(result, BaseException):
+                    self._fail_task(agent, task, result)
+                else:
+                    self._complete_task(agent, task, result)
+            finally:
+                self._release_agent(agent)
+                self.task_queue.task_done(task)
+
+    @staticmethod
+    def _batch_trace_task(tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Describe a batch as a task for the tracer, by its first task id and size."""
+        first = tasks[0].get("id")
+        return {"id": first if len(tasks) == 1 else f"{first}+{len(tasks) - 1}"}
+
+    def _begin_task(self, task: Dict[str, Any]) -> Optional[BaseAgent]:
+        """
+        Route a dequeued task to an agent and mark it as processing.
+
+        Args:
+            task: The task taken from the queue
+
+        Returns:
+            The reserved agent, or None if no agent could take the task (the
+            task is then marked as failed and done)
+        """
+        # Find appropriate agent for the task
+        agent = self._find_agent_for_task(task)
+
+        if agent is None:
+            self.logger.warning(
+                "No suitable agent found for task %s",
+                task.get("id", "unknown"),
+                extra={"task_id": task.get("id")},
+            )
+            # Re-queue with lower priority or log failure
+            task["status"] = "agent_not_found"
+            with self._stats_lock:
                 self.tasks_failed += 1
+            self.metrics.task_unroutable(task.get("priority", "medium"))
+            self._resolve_future(
+                task, error=LookupError(f"No agent can handle task {task.get('id', 'unknown')}")
+            )
+            self.task_queue.task_done(task)
+            return None
+
+        self._start_task(agent, task)
+        return agent
+
+    def _start_task(self, agent: BaseAgent, task: Dict[str, Any]) -> None:
+        """
+        Mark a task as being processed by its reserved agent.
+
+        Args:
+            agent: The agent reserved for the task
+            task: The task
+        """
+        task["status"] = "processing"
+        task["agent"] = agent.name
+        task["start_time"] = time.time()
+
+        self.logger.info(
+            "Agent '%s' processing task %s",
+            agent.name,
+            task.get("id", "unknown"),
+            extra={"task_id": task.get("id"), "agent": agent.name},
+        )
+
+    def _complete_task(
+        self, agent: BaseAgent, task: Dict[str, Any], result: Dict[str, Any]
+    ) -> None:
+        """
+        Record a successfully processed task.
+
+        Args:
+            agent: The agent that processed the task
+            task: The processed task
+            result: The agent's result for the task
+        """
+        # Update task with result
+        task["status"] = "completed"
+        task["complete_time"] = time.time()
+        task["result"] = result
+
+        with self._stats_lock:
+            self.tasks_processed += 1
+            self.tasks_succeeded += 1
+        self._record_finished(agent, task, "completed")
+
+        self.logger.info(
+            "Task %s completed successfully",
+            task.get("id", "unknown"),
+            extra={"task_id": task.get("id"), "agent": agent.name},
+        )
+        self._resolve_future(task, result=result)
+
+    def _fail_task(self, agent: BaseAgent, task: Dict[str, Any], error: Exception) -> None:
+        """
+        Record a task whose processing raised an exception.
+
+        Args:
+            agent: The agent that processed the task
+            task: The failed task
+            error: The exception raised by the agent
+        """
+        # Handle task failure
+        self.logger.error(
+            "Error processing task %s: %s",
+            task.get("id", "unknown"),
+            error,
+            extra={"task_id": task.get("id"), "agent": agent.name},
+        )
+        task["status"] = "failed"
+        task["error"] = str(error)
+        task["complete_time"] = time.time()
+
+        with self._stats_lock:
+            self.tasks_processed += 1
+            self.tasks_failed += 1
+        self._record_finished(agent, task, "failed")
+
+        # Log error in the agent
+        agent.log_error(error, context={"task": task})
+        self._resolve_future(task, error=error)
+
+    def _record_finished(self, agent: BaseAgent, task: Dict[str, Any], outcome: str) -> None:
+        """
+        Record a finished task's queue wait and execution time in the metrics.
+
+        Args:
+            agent: The agent that processed the task
+            task: The finished task
+            outcome: "completed" or "failed"
+        """
+        start_time = task.get("start_time", task["complete_time"])
+        self.metrics.task_finished(
+            agent.agent_type,
+            task.get("priority", "medium"),
+            start_time - task.get("added_time", start_time),
+            task["complete_time"] - start_time,
+            outcome,
+            busy=(task["complete_time"] - start_time) / task.get("batch_size", 1),
+        )
+
+    def _run_agent_task(self, agent: BaseAgent, task: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a task on an agent, honouring its execution mode and type limit.
+
+        Args:
+            agent: The agent selected for the task
+            task: The task to process
+
+        Returns:
+            The agent's result for the task
+        """
+        semaphore = self._get_type_semaphore(agent.agent_type)
+        if semaphore is not None:
+            semaphore.acquire()
+
+        try:
+            if agent.execution_mode == "process":
+                # Agent state changes made in the worker process are not copied back
+                future = self._get_process_pool().submit(_run_agent_task, agent, task)
+                return future.result()
+
+            return agent.process_task(task)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    def _get_type_semaphore(self, agent_type: str) -> Optional[threading.BoundedSemaphore]:
+        """
+        Get the semaphore enforcing the concurrency limit for an agent type.
+
+        Args:
+            agent_type: The agent type to look up
+
+        Returns:
+            The semaphore or None if the agent type is not limited
+        """
+        limit = self.agent_concurrency.get(agent_type)
+        if limit is None:
+            return None
+
+        with self._pool_lock:
+            if agent_type not in self._type_semaphores:
+                self._type_semaphores[agent_type] = threading.BoundedSemaphore(max(1, limit))
+            return self._type_semaphores[agent_type]
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """
+        Get the process pool for CPU-bound agents, creating it on first use.
 
-                # Log error in the agent
-                agent.log_error(e, context={"task": task})
+        Returns:
+            The shared process pool
+        """
+        with self._pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._process_pool
 
     def _find_agent_for_task(self, task: Dict[str, Any]) -> Optional[BaseAgent]:
         """
-        Find an appropriate agent to handle the given task.
+        Find an appropriate agent to handle the given task and reserve it.
+
+        Candidates come from the task type index; among those that accept the
+        task, the least loaded one is chosen (fewest in-flight tasks, then idle
+        status). The caller must release the agent with _release_agent().
 
         Args:
             task: The task to find an agent for
@@ -207,42 +1003,141 @@ class Orchestrator:
         Returns:
             An agent that can handle the task or None if no suitable agent found
         """
-        # If task specifies a specific agent, use that
-        if "agent_name" in task and task["agent_name"] in self.agents:
-            return self.agents[task["agent_name"]]
-
-        # Otherwise, find any agent that can handle this task
-        for agent in self.agents.values():
-            if agent.can_handle_task(task):
+        with self._routing_lock:
+            # If task specifies a specific agent, use that
+            if "agent_name" in task and task["agent_name"] in self.agents:
+                agent = self.agents[task["agent_name"]]
+                self._agent_load[agent.name] = self._agent_load.get(agent.name, 0) + 1
                 return agent
 
-        return None
+            task_type = str(task.get("type", "")).lower()
+            typed_agents = self._agents_by_task_type.get(task_type, [])
+
+            best: Optional[BaseAgent] = None
+            best_load = (0, False)
+            for candidates in (typed_agents, self._untyped_agents):
+                for agent in candidates:
+                    load = (self._agent_load.get(agent.name, 0), not agent.is_idle)
+                    if best is not None and load >= best_load:
+                        continue
+                    if not agent.can_handle_task(task):
+                        continue
+
+                    best, best_load = agent, load
+                    if load == (0, False):
+                        # An idle agent with nothing in flight cannot be beaten
+                        break
+                if best is not None and best_load == (0, False):
+                    break
+
+            if best is not None:
+                self._agent_load[best.name] = best_load[0] + 1
+            return best
+
+    def _reserve_agent(self, agent: BaseAgent) -> None:
+        """
+        Reserve an already chosen agent for one more task.
+
+        Args:
+            agent: The agent taking the task
+        """
+        with self._routing_lock:
+            self._agent_load[agent.name] = self._agent_load.get(agent.name, 0) + 1
+
+    def _release_agent(self, agent: BaseAgent) -> None:
+        """
+        Release an agent reserved by _find_agent_for_task().
+
+        Args:
+            agent: The agent that finished its task
+        """
+        with self._routing_lock:
+            if agent.name in self._agent_load:
+                self._agent_load[agent.name] -= 1
 
     def start(self) -> None:
-        """Start the orchestrator's task processing thread."""
+        """Start the orchestrator's task processing worker threads or event loop."""
         if self.running:
             self.logger.warning("Orchestrator is already running")
             return
 
         self.running = True
-        self.worker_thread = threading.Thread(target=self._process_tasks)
-        self.worker_thread.daemon = True
-        self.worker_thread.start()
+        self.worker_threads = []
+        self.metrics.mark_started()
+
+        if self.mode == "async":
+            worker = threading.Thread(
+                target=asyncio.run,
+                args=(self._aprocess_tasks(),),
+                name="teko-orchestrator-event-loop",
+            )
+            worker.daemon = True
+            worker.start()
+            self.worker_threads.append(worker)
 
-        self.logger.info("Orchestrator started")
+            self.logger.info(
+                "Orchestrator started in async mode with up to %d tasks", self.max_async_tasks
+            )
+            return
+
+        for index in range(self.max_workers):
+            worker = threading.Thread(
+                target=self._process_tasks, name=f"teko-orchestrator-worker-{index}"
+            )
+            worker.daemon = True
+            worker.start()
+            self.worker_threads.append(worker)
+
+        self.logger.info("Orchestrator started with %d worker(s)", self.max_workers)
+
+    def stop(self, drain: bool = True, timeout: float = 30.0) -> None:
+        """
+        Stop the orchestrator's task processing worker threads.
 
-    def stop(self) -> None:
-        """Stop the orchestrator's task processing thread."""
+        Args:
+            drain: Wait for queued and in-flight tasks to finish before stopping
+            timeout: Maximum number of seconds to wait for the drain and shutdown
+        """
         if not self.running:
             self.logger.warning("Orchestrator is not running")
             return
 
+        deadline = time.monotonic() + timeout
+        if drain and not self.task_queue.join(timeout=timeout):
+            self.logger.warning("Timed out waiting for queued tasks to drain")
+
         self.running = False
-        if self.worker_thread:
-            self.worker_thread.join(timeout=5.0)
+        self.task_queue.wake_all()
+        for worker in self.worker_threads:
+            worker.join(timeout=max(0.0, deadline - time.monotonic()))
+        self.worker_threads = []
+
+        with self._pool_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=drain)
+                self._process_pool = None
 
         self.logger.info("Orchestrator stopped")
 
+    def close(self, timeout: float = 30.0) -> None:
+        """
+        Stop task processing and close every agent, the knowledge store and
+        the metrics endpoint.
+
+        Args:
+            timeout: Maximum number of seconds to wait for queued tasks
+        """
+        if self.running:
+            self.stop(drain=True, timeout=timeout)
+
+        for name in list(self.agents):
+            self.remove_agent(name, close=True)
+        self.knowledge_store.close()
+
+        if self._metrics_server is not None:
+            self._metrics_server.close()
+            self._metrics_server = None
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get orchestrator statistics.
@@ -254,7 +1149,55 @@ class Orchestrator:
             "tasks_processed": self.tasks_processed,
             "tasks_succeeded": self.tasks_succeeded,
             "tasks_failed": self.tasks_failed,
+            "queued_tasks": self.task_queue.qsize(),
+            "mode": self.mode,
+            "max_workers": self.max_workers,
             "registered_agents": len(self.agents),
             "agent_types": list(self.agent_classes.keys()),
             "running": self.running,
+            "queue_depth": self.task_queue.depth_by_priority(),
+            "tasks_in_flight": self._tasks_in_flight(),
+            **self.metrics.snapshot(self.capacity),
         }
+
+    @property
+    def capacity(self) -> int:
+        """Number of tasks the orchestrator can run at the same time."""
+        return self.max_async_tasks if self.mode == "async" else self.max_workers
+
+    def metrics_text(self) -> str:
+        """
+        Render the orchestrator's metrics in the Prometheus text format.
+
+        Returns:
+            The exposition text
+        """
+        return self.metrics.render_prometheus(
+            self.task_queue.depth_by_priority(), self.capacity, self._tasks_in_flight()
+        )
+
+    def _tasks_in_flight(self) -> int:
+        """Number of tasks reserved by agents and not yet finished."""
+        with self._routing_lock:
+            return sum(self._agent_load.values())
+
+    def start_metrics_server(self, port: int = 9464, host: str = "127.0.0.1") -> MetricsServer:
+        """
+        Serve the metrics in the Prometheus text format over HTTP.
+
+        The endpoint is closed by close().
+
+        Args:
+            port: Port to listen on; 0 picks a free port
+            host: Interface to listen on
+
+        Returns:
+            The running metrics server
+        """
+        if self._metrics_server is None:
+            self._metrics_server = MetricsServer(self.metrics_text, port=port, host=host)
+            self._metrics_server.start()
+            self.logger.info(
+                "Serving metrics on http://%s:%d/metrics", host, self._metrics_server.port
+            )
+        return self._metrics_server
@@ -0,0 +1,390 @@
+"""
+Task Profiling
+
+This module provides the tracer the orchestrator and agents use to find out
+where task time goes. A task trace records nested spans for the phases of a
+task (agents mark them with BaseAgent.span()); a sample of tasks can also be
+run under cProfile, and the profile is kept when the task turns out to be
+slow. Traces can be dumped as collapsed stacks ("frame;frame;frame count"),
+the input format of flamegraph.pl, speedscope and similar tools, with
+counts in microseconds of self time.
+
+Tracing is off by default and can be switched on and off at runtime. While
+it is off, Tracer.trace_task() returns a shared no-op context manager after
+a single attribute check, and span() returns it after a context variable
+lookup.
+"""
+
+import contextlib
+import contextvars
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Shared context manager returned while tracing is off or outside a task
+_NULL_SPAN = contextlib.nullcontext()
+
+# Trace of the task running in the current thread or asyncio task
+_current_trace: "contextvars.ContextVar[Optional[TaskTrace]]" = contextvars.ContextVar(
+    "teko_current_trace", default=None
+)
+
+
+def span(name: str) -> Any:
+    """
+    Get a context manager recording a span of the task being traced.
+
+    Args:
+        name: The span name
+
+    Returns:
+        The span, or a no-op context manager if no task is being traced
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return trace.span(name)
+
+
+@functools.lru_cache(maxsize=1024)
+def _frame_name(name: str) -> str:
+    """Make a span name safe to use as a collapsed-stack frame."""
+    return re.sub(r"[;\s]+", "_", name) or "_"
+
+
+class TaskTrace:
+    """
+    The spans, and optionally the cProfile statistics, of one task.
+    """
+
+    def __init__(self, task_id: Any, agent_name: str, root: str):
+        """
+        Start a trace.
+
+        Args:
+            task_id: The traced task's id
+            agent_name: The agent processing the task
+            root: Name of the root span, normally the agent type
+        """
+        self.task_id = task_id
+        self.agent_name = agent_name
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.profile: Optional[pstats.Stats] = None
+
+        # Completed spans as (stack path, start offset, duration)
+        self.spans: List[Tuple[str, float, float]] = []
+        self._stack: List[str] = [_frame_name(root)]
+        self._start = time.perf_counter()
+
+    def span(self, name: str) -> "_Span":
+        """
+        Record a span nested in the currently open span.
+
+        Args:
+            name: The span name
+
+        Returns:
+            Context manager delimiting the span
+        """
+        return _Span(self, _frame_name(name))
+
+    def finish(self) -> None:
+        """Close the root span."""
+        self.duration = time.perf_counter() - self._start
+        self.spans.append((self._stack[0], 0.0, self.duration))
+
+    def collapsed(self) -> str:
+        """
+        Render the spans as collapsed stacks weighted by self time.
+
+        Returns:
+            One "frame;frame count" line per span path, counts in microseconds
+        """
+        totals: Dict[str, float] = {}
+        for path, _, duration in self.spans:
+            totals[path] = totals.get(path, 0.0) + duration
+
+        self_times = dict(totals)
+        for path, total in totals.items():
+            parent = path.rpartition(";")[0]
+            if parent in self_times:
+                self_times[parent] -= total
+
+        return "".join(
+            f"{path} {max(0, round(seconds * 1e6))}\n" for path, seconds in self_times.items()
+        )
+
+    def profile_text(self, limit: int = 30) -> str:
+        """
+        Render the cProfile statistics, if the task was profiled.
+
+        Args:
+            limit: Maximum number of functions to list
+
+        Returns:
+            The functions with the most cumulative time, or "" if not profiled
+        """
+        if self.profile is None:
+            return ""
+        stream = io.StringIO()
+        self.profile.stream = stream  # type: ignore[attr-defined]
+        self.profile.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get a JSON-serializable summary of the trace.
+
+        Returns:
+            Dictionary of the task, timings, spans and collapsed stacks
+        """
+        return {
+            "task_id": self.task_id,
+            "agent": self.agent_name,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "spans": [
+                {"path": path, "start": start, "duration": duration}
+                for path, start, duration in self.spans
+            ],
+            "collapsed": self.collapsed(),
+            "profiled": self.profile is not None,
+        }
+
+
+class _Span:
+    """An open span of a task trace."""
+
+    __slots__ = ("trace", "name", "path", "start")
+
+    def __init__(self, trace: TaskTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self) -> None:
+        stack = self.trace._stack
+        stack.append(self.name)
+        self.path = ";".join(stack)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        end = time.perf_counter()
+        trace = self.trace
+        trace.spans.append((self.path, self.start - trace._start, end - self.start))
+        trace._stack.pop()
+
+
+class Tracer:
+    """
+    Records task traces while enabled; configurable at runtime.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        profile_sample_rate: float = 0.0,
+        slow_task_seconds: float = 1.0,
+        output_dir: Optional[str] = None,
+        max_traces: int = 100,
+    ):
+        """
+        Initialize the tracer.
+
+        Args:
+            enabled: Record traces
+            profile_sample_rate: Fraction of traced tasks run under cProfile
+            slow_task_seconds: Profiles are kept only for tasks taking at
+                least this long
+            output_dir: Directory to write "<task id>.folded" collapsed stacks
+                (and "<task id>.pstats" profiles) to, or None
+            max_traces: Number of recent traces kept in memory
+        """
+        self.logger = logging.getLogger("teko.profiling")
+        self._lock = threading.Lock()
+        self._traces: Deque[TaskTrace] = deque(maxlen=max_traces)
+        self.enabled = False
+        self.profile_sample_rate = 0.0
+        self.slow_task_seconds = slow_task_seconds
+        self.output_dir = output_dir
+        self.configure(enabled=enabled, profile_sample_rate=profile_sample_rate)
+
+    def configure(self, **settings: Any) -> Dict[str, Any]:
+        """
+        Change the tracer settings; takes effect for the next task.
+
+        Args:
+            settings: Any of enabled, profile_sample_rate, slow_task_seconds
+                and output_dir
+
+        Returns:
+            The current settings
+        """
+        for name, value in settings.items():
+            if name not in ("enabled", "profile_sample_rate", "slow_task_seconds", "output_dir"):
+                raise ValueError(f"Unknown tracer setting '{name}'")
+            setattr(self, name, value)
+        return self.settings()
+
+    def settings(self) -> Dict[str, Any]:
+        """
+        Get the tracer settings.
+
+        Returns:
+            Dictionary of the settings accepted by configure()
+        """
+        return {
+            "enabled": self.enabled,
+            "profile_sample_rate": self.profile_sample_rate,
+            "slow_task_seconds": self.slow_task_seconds,
+            "output_dir": self.output_dir,
+        }
+
+    def trace_task(self, agent: Any, task: Dict[str, Any], profile: bool = True) -> Any:
+        """
+        Get a context manager tracing an agent's processing of a task.
+
+        Args:
+            agent: The agent processing the task
+            task: The task
+            profile: Whether the task may be sampled for cProfile; profiles
+                cover the whole thread, so tasks sharing a thread must not be
+
+        Returns:
+            The trace context, or a no-op context manager if tracing is off
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._trace(task.get("id"), agent.name, agent.agent_type, profile)
+
+    @contextlib.contextmanager
+    def trace(
+        self, task_id: Any, agent_name: str, root: str, profile: bool = True
+    ) -> Iterator[TaskTrace]:
+        """
+        Trace a block of work as a task, regardless of whether tracing is on.
+
+        Args:
+            task_id: Identifier of the traced work
+            agent_name: The agent doing the work
+            root: Name of the root span
+            profile: Whether the work may be sampled for cProfile
+
+        Yields:
+            The trace being recorded
+        """
+        with self._trace(task_id, agent_name, root, profile) as trace:
+            yield trace
+
+    def traces(self) -> List[TaskTrace]:
+        """
+        Get the recent traces.
+
+        Returns:
+            The traces, oldest first
+        """
+        with self._lock:
+            return list(self._traces)
+
+    def collapsed(self) -> str:
+        """
+        Render every recent trace as collapsed stacks, for one combined flamegraph.
+
+        Returns:
+            Collapsed stack lines of all recent traces
+        """
+        return "".join(trace.collapsed() for trace in self.traces())
+
+    @contextlib.contextmanager
+    def _trace(
+        self, task_id: Any, agent_name: str, root: str, profile: bool
+    ) -> Iterator[TaskTrace]:
+        """Record a task trace and profile it if sampled."""
+        trace = TaskTrace(task_id, agent_name, root)
+        token = _current_trace.set(trace)
+
+        profiler = None
+        sample_rate = self.profile_sample_rate
+        if profile and sample_rate > 0 and random.random() < sample_rate:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already active in this thread
+                profiler = None
+
+        try:
+            yield trace
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            _current_trace.reset(token)
+            trace.finish()
+            if profiler is not None and trace.duration >= self.slow_task_seconds:
+                trace.profile = pstats.Stats(profiler)
+            self._record(trace)
+
+    def _record(self, trace: TaskTrace) -> None:
+        """Keep a finished trace and write it to the output directory if configured."""
+        with self._lock:
+            self._traces.append(trace)
+
+        output_dir = self.output_dir
+        if output_dir is None:
+            return
+
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{trace.agent_name}-{trace.task_id}")
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            with open(os.path.join(output_dir, f"{name}.folded"), "w", encoding="utf-8") as handle:
+                handle.write(trace.collapsed())
+            if trace.profile is not None:
+                trace.profile.dump_stats(os.path.join(output_dir, f"{name}.pstats"))
+        except OSError as e:
+            self.logger.warning("Failed to write trace of task %s: %s", trace.task_id, e)
+
+
+_default_tracer: Optional[Tracer] = None
+_default_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Get the process-wide tracer.
+
+    Returns:
+        The tracer, created disabled on first use; TEKO_TRACE=1 enables it
+    """
+    global _default_tracer
+    tracer = _default_tracer
+    if tracer is not None:
+        return tracer
+
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            _default_tracer = Tracer(
+                enabled=os.environ.get("TEKO_TRACE", "") not in ("", "0"),
+                output_dir=os.environ.get("TEKO_TRACE_DIR") or None,
+            )
+        return _default_tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """
+    Replace the process-wide tracer, e.g. in tests or benchmarks.
+
+    Args:
+        tracer: The tracer to use from now on
+    """
+    global _default_tracer
+    with _default_tracer_lock:
+        _default_tracer = tracer
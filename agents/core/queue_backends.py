@@ -0,0 +1,388 @@
+"""
+Task Queue Backends
+
+This module defines the storage backends used by the orchestrator's TaskQueue.
+The in-memory backend is the default; the SQLite backend persists tasks on
+disk so pending work survives restarts and can be shared by several
+orchestrator processes with at-least-once delivery.
+"""
+
+import abc
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Keys under which the SQLite backend stores a delivered task's row id and
+# the number of times it has been delivered
+QUEUE_ID_KEY = "queue_id"
+QUEUE_ATTEMPTS_KEY = "queue_attempts"
+
+
+class QueueBackend(abc.ABC):
+    """
+    Base class for task queue storage backends.
+
+    Backends order tasks by priority level (lower levels first) and then by
+    insertion order. Tasks returned by get() must be acknowledged with ack()
+    once processing has finished; backends with delivery guarantees may hand
+    unacknowledged tasks out again.
+    """
+
+    @abc.abstractmethod
+    def put(self, task: Dict[str, Any], level: int) -> None:
+        """
+        Store a task.
+
+        Args:
+            task: The task to store
+            level: The task's priority level (0 is the highest priority)
+        """
+        pass
+
+    def put_many(self, items: List[Tuple[Dict[str, Any], int]]) -> None:
+        """
+        Store several tasks at once.
+
+        Args:
+            items: List of (task, priority level) tuples
+        """
+        for task, level in items:
+            self.put(task, level)
+
+    @abc.abstractmethod
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Remove and return the highest priority task.
+
+        Args:
+            block: Wait for a task if none is available
+            timeout: Maximum number of seconds to wait, or None to wait forever
+
+        Returns:
+            The next task, or None if no task became available
+        """
+        pass
+
+    def get_many(
+        self, max_items: int, block: bool = True, timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Remove and return up to max_items tasks in priority order.
+
+        Only the first task is waited for; the rest are taken if available.
+
+        Args:
+            max_items: Maximum number of tasks to return
+            block: Wait for the first task if none is available
+            timeout: Maximum number of seconds to wait, or None to wait forever
+
+        Returns:
+            List of tasks, empty if no task became available
+        """
+        first = self.get(block=block, timeout=timeout)
+        if first is None:
+            return []
+
+        tasks = [first]
+        while len(tasks) < max_items:
+            task = self.get(block=False)
+            if task is None:
+                break
+            tasks.append(task)
+        return tasks
+
+    def ack(self, task: Dict[str, Any]) -> None:
+        """
+        Acknowledge that a task returned by get() has been processed.
+
+        Args:
+            task: The processed task
+        """
+
+    @abc.abstractmethod
+    def wake_all(self) -> None:
+        """Release every consumer currently blocked in get()."""
+        pass
+
+    @abc.abstractmethod
+    def depth(self) -> Dict[int, int]:
+        """
+        Get the number of tasks waiting at each priority level.
+
+        Returns:
+            Dictionary mapping priority level to waiting task count
+        """
+        pass
+
+    def qsize(self) -> int:
+        """
+        Get the number of tasks waiting to be delivered.
+
+        Returns:
+            The number of waiting tasks
+        """
+        return sum(self.depth().values())
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class MemoryQueueBackend(QueueBackend):
+    """
+    In-memory backend keeping every task in a single heap.
+
+    Consumers block on a condition variable and are woken as soon as a task
+    is added. Tasks are lost when the process exits.
+    """
+
+    def __init__(self):
+        """Initialize the task heap and the condition guarding it."""
+        self._heap: List[Tuple[int, int, Dict[str, Any]]] = []
+        self._sequence = itertools.count()
+        self._depth: Dict[int, int] = {}
+        self._not_empty = threading.Condition()
+        self._wakeups = 0
+
+    def put(self, task: Dict[str, Any], level: int) -> None:
+        self.put_many([(task, level)])
+
+    def put_many(self, items: List[Tuple[Dict[str, Any], int]]) -> None:
+        with self._not_empty:
+            for task, level in items:
+                heapq.heappush(self._heap, (level, next(self._sequence), task))
+                self._depth[level] = self._depth.get(level, 0) + 1
+            self._not_empty.notify(len(items))
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        with self._not_empty:
+            if block and not self._heap:
+                wakeups = self._wakeups
+                self._not_empty.wait_for(
+                    lambda: bool(self._heap) or self._wakeups != wakeups, timeout
+                )
+
+            if not self._heap:
+                return None
+
+            level, _, task = heapq.heappop(self._heap)
+            self._depth[level] -= 1
+            return task
+
+    def wake_all(self) -> None:
+        with self._not_empty:
+            self._wakeups += 1
+            self._not_empty.notify_all()
+
+    def depth(self) -> Dict[int, int]:
+        with self._not_empty:
+            return dict(self._depth)
+
+    def qsize(self) -> int:
+        with self._not_empty:
+            return len(self._heap)
+
+
+class SQLiteQueueBackend(QueueBackend):
+    """
+    Crash-safe backend storing tasks in a SQLite database in WAL mode.
+
+    Delivering a task leases it for visibility_timeout seconds instead of
+    deleting it; the row is only removed when the task is acknowledged. If the
+    consumer crashes, the lease expires and the task is delivered again, which
+    gives at-least-once delivery. Several processes may share one database.
+    Tasks must be JSON serializable.
+    """
+
+    def __init__(
+        self,
+        path: str = "./data/task_queue.sqlite3",
+        visibility_timeout: float = 600.0,
+        poll_interval: float = 0.05,
+    ):
+        """
+        Initialize the backend and create the database schema if needed.
+
+        Args:
+            path: Path of the SQLite database file
+            visibility_timeout: Seconds a delivered task stays hidden from other
+                consumers before it is delivered again if not acknowledged
+            poll_interval: Seconds between database checks while blocked in
+                get(), to notice tasks added by other processes
+        """
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition()
+        self._wakeups = 0
+        self._connection = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                priority INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                visible_at REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+            """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_order ON tasks (priority, id)"
+        )
+
+    def put(self, task: Dict[str, Any], level: int) -> None:
+        self.put_many([(task, level)])
+
+    def put_many(self, items: List[Tuple[Dict[str, Any], int]]) -> None:
+        rows = [(level, json.dumps(task)) for task, level in items]
+        with self._lock:
+            with self._transaction():
+                self._connection.executemany(
+                    "INSERT INTO tasks (priority, payload) VALUES (?, ?)", rows
+                )
+
+        with self._not_empty:
+            self._not_empty.notify(len(rows))
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        tasks = self.get_many(1, block=block, timeout=timeout)
+        return tasks[0] if tasks else None
+
+    def get_many(
+        self, max_items: int, block: bool = True, timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        wakeups = self._wakeups
+
+        while True:
+            tasks = self._claim(max_items)
+            if tasks or not block:
+                return tasks
+
+            wait = self.poll_interval
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                wait = min(wait, remaining)
+
+            with self._not_empty:
+                if self._wakeups != wakeups:
+                    return []
+                self._not_empty.wait(wait)
+
+    def _claim(self, max_items: int) -> List[Dict[str, Any]]:
+        """
+        Lease up to max_items visible tasks in priority order.
+
+        Args:
+            max_items: Maximum number of tasks to lease
+
+        Returns:
+            The leased tasks, each carrying its row id under QUEUE_ID_KEY
+        """
+        now = time.time()
+        with self._lock:
+            with self._transaction():
+                rows = self._connection.execute(
+                    "SELECT id, payload, attempts FROM tasks WHERE visible_at <= ? "
+                    "ORDER BY priority, id LIMIT ?",
+                    (now, max_items),
+                ).fetchall()
+                if rows:
+                    self._connection.executemany(
+                        "UPDATE tasks SET visible_at = ?, attempts = attempts + 1 WHERE id = ?",
+                        [(now + self.visibility_timeout, row[0]) for row in rows],
+                    )
+
+        tasks = []
+        for row_id, payload, attempts in rows:
+            task = json.loads(payload)
+            task[QUEUE_ID_KEY] = row_id
+            task[QUEUE_ATTEMPTS_KEY] = attempts + 1
+            tasks.append(task)
+        return tasks
+
+    def ack(self, task: Dict[str, Any]) -> None:
+        self.ack_many([task])
+
+    def ack_many(self, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Acknowledge several processed tasks in one transaction.
+
+        Args:
+            tasks: The processed tasks
+        """
+        row_ids = [(task[QUEUE_ID_KEY],) for task in tasks if QUEUE_ID_KEY in task]
+        if not row_ids:
+            return
+
+        with self._lock:
+            with self._transaction():
+                self._connection.executemany("DELETE FROM tasks WHERE id = ?", row_ids)
+
+    def wake_all(self) -> None:
+        with self._not_empty:
+            self._wakeups += 1
+            self._not_empty.notify_all()
+
+    def depth(self) -> Dict[int, int]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT priority, COUNT(*) FROM tasks WHERE visible_at <= ? GROUP BY priority",
+                (time.time(),),
+            ).fetchall()
+        return {priority: count for priority, count in rows}
+
+    def unacknowledged(self) -> int:
+        """
+        Get the number of stored tasks, including leased ones not yet acknowledged.
+
+        Returns:
+            The number of tasks in the database
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT COUNT(*) FROM tasks").fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _transaction(self) -> "_Transaction":
+        """
+        Open an immediate write transaction. Caller must hold self._lock.
+
+        Returns:
+            Context manager committing on success and rolling back on error
+        """
+        return _Transaction(self._connection)
+
+
+class _Transaction:
+    """Context manager for a BEGIN IMMEDIATE transaction on an autocommit connection."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.connection.execute("COMMIT")
+        else:
+            self.connection.execute("ROLLBACK")
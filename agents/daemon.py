@@ -0,0 +1,568 @@
+"""
+Agent Daemon
+
+This module runs a long-lived agent server: one Orchestrator with warm agents
+that accepts tasks over a Unix socket (or a localhost TCP port). Callers such
+as scripts/run-agent.sh or the Laravel application submit work to it instead
+of starting a fresh Python process, so the interpreter start, LangChain and
+Chroma imports and client setup are paid once rather than for every task.
+
+The protocol is JSON lines: every request is one JSON object on its own line
+and is answered with one JSON object line. A connection may carry any number
+of requests.
+
+    {"op": "submit", "task": {...}, "priority": "high", "wait": true, "timeout": 600}
+    {"op": "stats"}
+    {"op": "trace", "settings": {"enabled": true, "profile_sample_rate": 0.1}, "limit": 20}
+    {"op": "ping"}
+
+The directory trace files are written to is not a request setting: any
+local user can reach the socket, so it is only set with serve --trace-dir.
+
+Responses have "ok" set to true with the payload ("id", "result", "stats",
+"tracing" and "traces"), or to false with an "error" message and its
+"error_type".
+
+Usage:
+    python -m agents.daemon serve --agent codebase_analysis=2 --config agents.json
+    python -m agents.daemon submit '{"type": "codebase_analysis", "repository_id": 1, ...}'
+    python -m agents.daemon stats
+    python -m agents.daemon trace --enable --collapsed | flamegraph.pl > tasks.svg
+"""
+
+import argparse
+import concurrent.futures
+import importlib
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+# Agent classes the daemon can host, by agent type ("module:ClassName"),
+# imported only when an agent of the type is created
+AGENT_CLASSES = {
+    "codebase_analysis": "agents.implementations.codebase_analysis_agent:CodebaseAnalysisAgent",
+}
+
+# Socket used when neither --socket nor TEKO_AGENT_SOCKET is given
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "teko-agents.sock")
+
+
+def default_socket_path() -> str:
+    """
+    Get the daemon socket path from the environment.
+
+    Returns:
+        TEKO_AGENT_SOCKET if set, otherwise DEFAULT_SOCKET_PATH
+    """
+    return os.environ.get("TEKO_AGENT_SOCKET", DEFAULT_SOCKET_PATH)
+
+
+def load_agent_class(agent_type: str) -> Any:
+    """
+    Import the agent class registered for an agent type.
+
+    Args:
+        agent_type: The agent type, a key of AGENT_CLASSES
+
+    Returns:
+        The agent class
+    """
+    if agent_type not in AGENT_CLASSES:
+        raise ValueError(f"Unknown agent type '{agent_type}'")
+
+    module_name, _, class_name = AGENT_CLASSES[agent_type].partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def build_orchestrator(
+    agent_counts: Dict[str, int],
+    config: Optional[Dict[str, Any]] = None,
+    max_workers: int = 1,
+    mode: str = "thread",
+    knowledge_path: Optional[str] = None,
+    batch_size: int = 1,
+    batch_wait: float = 0.0,
+) -> Any:
+    """
+    Create an orchestrator with warmed-up agents.
+
+    Args:
+        agent_counts: Mapping of agent type to the number of agents to create
+        config: Agent configuration, either shared by all agent types or
+            keyed by agent type
+        max_workers: Number of orchestrator worker threads
+        mode: Orchestrator mode, "thread" or "async"
+        knowledge_path: SQLite database backing the agents' shared knowledge
+            store, or None for a memory-only store
+        batch_size: Maximum number of queued tasks dispatched to an agent at once
+        batch_wait: Seconds a worker waits for a batch to fill
+
+    Returns:
+        The orchestrator, not yet started
+    """
+    from agents.core.knowledge_store import KnowledgeStore
+    from agents.core.orchestrator import Orchestrator
+
+    config = config or {}
+    orchestrator = Orchestrator(
+        max_workers=max_workers,
+        mode=mode,
+        knowledge_store=KnowledgeStore(path=knowledge_path),
+        batch_size=batch_size,
+        batch_wait=batch_wait,
+    )
+    for agent_type, count in agent_counts.items():
+        orchestrator.register_agent_class(agent_type, load_agent_class(agent_type))
+        agent_config = config.get(agent_type, config)
+        for index in range(count):
+            agent = orchestrator.create_agent(agent_type, f"{agent_type}-{index}", agent_config)
+            agent.warm_up()
+    return orchestrator
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers the JSON-lines requests of one connection."""
+
+    server: Any
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+            except ValueError as e:
+                response = _error_response(e)
+            else:
+                response = self.server.daemon.handle_request(request)
+
+            self.wfile.write(json.dumps(response, default=str).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def _error_response(error: BaseException, task_id: Any = None) -> Dict[str, Any]:
+    """Build the response for a failed request."""
+    response = {"ok": False, "error": str(error), "error_type": type(error).__name__}
+    if task_id is not None:
+        response["id"] = task_id
+    return response
+
+
+class AgentDaemon:
+    """
+    Server that feeds tasks received over a socket to a running orchestrator.
+    """
+
+    def __init__(
+        self,
+        orchestrator: Any,
+        socket_path: Optional[str] = None,
+        port: Optional[int] = None,
+        task_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the daemon.
+
+        Args:
+            orchestrator: The orchestrator hosting the agents
+            socket_path: Unix socket to listen on (defaults to default_socket_path())
+            port: Listen on this localhost TCP port instead of a Unix socket
+            task_timeout: Default maximum number of seconds a submit waits for
+                its result, or None to wait until the task finishes
+        """
+        self.orchestrator = orchestrator
+        self.socket_path = None if port is not None else socket_path or default_socket_path()
+        self.port = port
+        self.task_timeout = task_timeout
+        self.logger = logging.getLogger("teko.daemon")
+        self._server: Optional[socketserver.BaseServer] = None
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer one request.
+
+        Args:
+            request: The decoded request object
+
+        Returns:
+            The response object
+        """
+        op = request.get("op", "submit")
+        if op == "ping":
+            return {"ok": True}
+        if op == "stats":
+            return {"ok": True, "stats": self.stats()}
+        if op == "trace":
+            return self.trace(request.get("settings") or {}, request.get("limit", 20))
+        if op != "submit":
+            return _error_response(ValueError(f"Unknown op '{op}'"))
+
+        task = request.get("task")
+        if not isinstance(task, dict):
+            return _error_response(ValueError("Submit request is missing the task object"))
+
+        try:
+            future = self.orchestrator.submit(task, priority=request.get("priority", "medium"))
+        except Exception as e:
+            return _error_response(e, task.get("id"))
+        if not request.get("wait", True):
+            return {"ok": True, "id": task["id"]}
+
+        try:
+            result = future.result(timeout=request.get("timeout", self.task_timeout))
+        except concurrent.futures.TimeoutError:
+            return _error_response(TimeoutError("Timed out waiting for the task"), task["id"])
+        except Exception as e:
+            return _error_response(e, task["id"])
+        return {"ok": True, "id": task["id"], "result": result}
+
+    def trace(self, settings: Dict[str, Any], limit: int) -> Dict[str, Any]:
+        """
+        Change the tracer settings and get the most recent task traces.
+
+        Args:
+            settings: Tracer settings to change, see Tracer.configure();
+                output_dir cannot be changed over the socket
+            limit: Maximum number of traces to return
+
+        Returns:
+            The response object with the tracer settings and the traces
+        """
+        tracer = self.orchestrator.tracer
+        if "output_dir" in settings:
+            return _error_response(ValueError("output_dir can only be set by serve --trace-dir"))
+        try:
+            current = tracer.configure(**settings)
+        except ValueError as e:
+            return _error_response(e)
+        traces = tracer.traces()[-limit:] if limit > 0 else []
+        return {
+            "ok": True,
+            "tracing": current,
+            "traces": [trace.to_dict() for trace in traces],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the daemon's orchestrator and agent statistics.
+
+        Returns:
+            Dictionary of the orchestrator statistics, agent statuses and the
+            agent memory and knowledge store statistics
+        """
+        return {
+            **self.orchestrator.get_stats(),
+            "agents": {name: agent.status for name, agent in self.orchestrator.agents.items()},
+            "memory": {
+                name: agent.memory.stats() for name, agent in self.orchestrator.agents.items()
+            },
+            "knowledge": self.orchestrator.knowledge_store.stats(),
+        }
+
+    def bind(self) -> None:
+        """Start the orchestrator and open the listening socket."""
+        server: socketserver.BaseServer
+        if self.port is not None:
+            server = _TCPServer(("127.0.0.1", self.port), _RequestHandler)
+            self.port = server.server_address[1]
+        else:
+            self._remove_stale_socket()
+            server = _UnixServer(self.socket_path, _RequestHandler)
+        server.daemon = self  # type: ignore[attr-defined]
+        self._server = server
+
+        if not self.orchestrator.running:
+            self.orchestrator.start()
+        self.logger.info("Agent daemon listening on %s", self.address)
+
+    def serve_forever(self) -> None:
+        """Serve requests until shutdown() is called from another thread."""
+        if self._server is None:
+            self.bind()
+        assert self._server is not None
+        self._server.serve_forever()
+
+    def start(self) -> threading.Thread:
+        """
+        Serve requests on a background thread.
+
+        Returns:
+            The serving thread
+        """
+        self.bind()
+        thread = threading.Thread(target=self.serve_forever, name="teko-daemon", daemon=True)
+        thread.start()
+        return thread
+
+    def shutdown(self) -> None:
+        """Stop serving, close the socket and close the orchestrator and its agents."""
+        if self._server is not None:
+            self._server.shutdown()
+            self.close()
+
+    def close(self) -> None:
+        """Close the socket and the orchestrator without waiting for serve_forever()."""
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        self.orchestrator.close()
+        self.logger.info("Agent daemon stopped")
+
+    @property
+    def address(self) -> str:
+        """The address the daemon listens on."""
+        if self.port is not None:
+            return f"127.0.0.1:{self.port}"
+        return str(self.socket_path)
+
+    def _remove_stale_socket(self) -> None:
+        """Remove a socket file left behind by a daemon that is no longer running."""
+        if not self.socket_path or not os.path.exists(self.socket_path):
+            return
+
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+        else:
+            raise RuntimeError(f"An agent daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+
+class DaemonClient:
+    """
+    Client for the agent daemon, keeping one connection open for many requests.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        port: Optional[int] = None,
+        connect_timeout: float = 5.0,
+    ):
+        """
+        Connect to the daemon.
+
+        Args:
+            socket_path: The daemon's Unix socket (defaults to default_socket_path())
+            port: Connect to this localhost TCP port instead of a Unix socket
+            connect_timeout: Maximum number of seconds to wait for the connection
+        """
+        if port is not None:
+            self._socket = socket.create_connection(("127.0.0.1", port), timeout=connect_timeout)
+        else:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(connect_timeout)
+            self._socket.connect(socket_path or default_socket_path())
+        # Tasks may run for a long time; submit() bounds the wait instead
+        self._socket.settimeout(None)
+        self._reader = self._socket.makefile("rb")
+
+    def request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a request and wait for its response.
+
+        Args:
+            request: The request object
+
+        Returns:
+            The response object
+        """
+        self._socket.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("The agent daemon closed the connection")
+        return json.loads(line)
+
+    def submit(
+        self,
+        task: Dict[str, Any],
+        priority: str = "medium",
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run a task on the daemon and wait for its result.
+
+        Args:
+            task: The task data dictionary
+            priority: The priority level for the task (high, medium, low)
+            timeout: Maximum number of seconds the daemon waits for the task
+
+        Returns:
+            The agent's result for the task
+        """
+        request: Dict[str, Any] = {"op": "submit", "task": task, "priority": priority}
+        if timeout is not None:
+            request["timeout"] = timeout
+
+        response = self.request(request)
+        if not response.get("ok"):
+            raise RuntimeError(f"{response.get('error_type')}: {response.get('error')}")
+        return response["result"]
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _parse_agent_counts(specs: List[str]) -> Dict[str, int]:
+    """Parse --agent values of the form "type" or "type=count"."""
+    counts: Dict[str, int] = {}
+    for spec in specs:
+        agent_type, _, count = spec.partition("=")
+        counts[agent_type] = counts.get(agent_type, 0) + int(count or 1)
+    return counts
+
+
+def _read_task(argument: str) -> Dict[str, Any]:
+    """Read a task given as JSON on the command line, or from stdin for "-"."""
+    return json.loads(sys.stdin.read() if argument == "-" else argument)
+
+
+def _trace_settings(args: argparse.Namespace) -> Dict[str, Any]:
+    """Collect the tracer settings given on the trace command line."""
+    settings: Dict[str, Any] = {}
+    if args.enable or args.disable:
+        settings["enabled"] = args.enable
+    if args.profile_sample_rate is not None:
+        settings["profile_sample_rate"] = args.profile_sample_rate
+    if args.slow_seconds is not None:
+        settings["slow_task_seconds"] = args.slow_seconds
+    return settings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the daemon or a client command from the command line.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--socket", help="Unix socket path (default: $TEKO_AGENT_SOCKET)")
+    parser.add_argument("--port", type=int, help="use this localhost TCP port instead")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the daemon")
+    serve.add_argument(
+        "--agent",
+        action="append",
+        default=[],
+        help="agent type to host, optionally with a count (codebase_analysis=2)",
+    )
+    serve.add_argument("--config", help="JSON file with the agent configuration")
+    serve.add_argument("--workers", type=int, default=1, help="orchestrator worker threads")
+    serve.add_argument("--mode", choices=("thread", "async"), default="thread")
+    serve.add_argument("--task-timeout", type=float, help="default submit timeout in seconds")
+    serve.add_argument("--knowledge-path", help="SQLite file for the shared knowledge store")
+    serve.add_argument("--batch-size", type=int, default=1, help="tasks dispatched at once")
+    serve.add_argument("--batch-wait", type=float, default=0.0, help="seconds to fill a batch")
+    serve.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port")
+    serve.add_argument("--trace-dir", help="directory to write task trace files to")
+
+    submit = commands.add_parser("submit", help="run a task on the daemon")
+    submit.add_argument("task", help="task as a JSON object, or - to read it from stdin")
+    submit.add_argument("--priority", default="medium", choices=("high", "medium", "low"))
+    submit.add_argument("--timeout", type=float, help="maximum seconds to wait for the result")
+
+    commands.add_parser("stats", help="print the daemon's statistics")
+
+    trace = commands.add_parser("trace", help="configure task tracing and print recent traces")
+    toggle = trace.add_mutually_exclusive_group()
+    toggle.add_argument("--enable", action="store_true", help="start tracing tasks")
+    toggle.add_argument("--disable", action="store_true", help="stop tracing tasks")
+    trace.add_argument("--profile-sample-rate", type=float, help="fraction of tasks to cProfile")
+    trace.add_argument("--slow-seconds", type=float, help="keep profiles of tasks this slow")
+    trace.add_argument("--limit", type=int, default=20, help="number of recent traces to print")
+    trace.add_argument(
+        "--collapsed", action="store_true", help="print the traces as collapsed stacks only"
+    )
+    commands.add_parser("ping", help="check that the daemon is running")
+
+    args = parser.parse_args(argv)
+    socket_path, port = args.socket, args.port
+
+    if args.command == "serve":
+        config: Dict[str, Any] = {}
+        if args.config:
+            with open(args.config, encoding="utf-8") as handle:
+                config = json.load(handle)
+
+        orchestrator = build_orchestrator(
+            _parse_agent_counts(args.agent or ["codebase_analysis"]),
+            config,
+            max_workers=args.workers,
+            mode=args.mode,
+            knowledge_path=args.knowledge_path,
+            batch_size=args.batch_size,
+            batch_wait=args.batch_wait,
+        )
+        if args.metrics_port is not None:
+            orchestrator.start_metrics_server(args.metrics_port)
+        if args.trace_dir is not None:
+            orchestrator.tracer.configure(output_dir=args.trace_dir)
+        daemon = AgentDaemon(orchestrator, socket_path, port, task_timeout=args.task_timeout)
+
+        # Stop cleanly on SIGTERM as well as on Ctrl-C
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemon.close()
+        return 0
+
+    with DaemonClient(socket_path, port) as client:
+        if args.command == "submit":
+            request = {"op": "submit", "task": _read_task(args.task), "priority": args.priority}
+            if args.timeout is not None:
+                request["timeout"] = args.timeout
+        elif args.command == "trace":
+            request = {"op": "trace", "settings": _trace_settings(args), "limit": args.limit}
+        else:
+            request = {"op": args.command}
+        response = client.request(request)
+
+    if args.command == "trace" and args.collapsed and response.get("ok"):
+        sys.stdout.write("".join(trace["collapsed"] for trace in response["traces"]))
+        return 0
+
+    print(json.dumps(response, indent=2, default=str))
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+Repository Analysis State
+
+This module holds the per-repository state used by the CodebaseAnalysisAgent
+for incremental analysis. The state remembers a content hash and the
+analysis results of every file, together with running aggregates (language
+counts and framework pattern counts), so a new analysis only has to rescan
+files that were added, changed or removed since the previous run.
+
+AnalysisStateStore keeps the live states of recently analyzed repositories,
+shared by reference by the agents of a process, so a run does not copy or
+serialize the state of the whole repository.
+"""
+
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Path changes journaled between two paths versions; beyond this, consumers
+# of the versions have to compare the whole path set
+MAX_JOURNALED_PATHS = 10_000
+
+
+def content_hash(content: str) -> str:
+    """
+    Compute the content hash used to detect changed files.
+
+    Args:
+        content: The file contents
+
+    Returns:
+        Hex digest of the contents
+    """
+    return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+class RepositoryAnalysisState:
+    """
+    Analysis state of one repository, updated file by file.
+
+    Aggregates are adjusted in O(1) per added, changed or removed file, so
+    they always match a from-scratch analysis of the current file set.
+    """
+
+    def __init__(self, fingerprint: str = ""):
+        """
+        Initialize an empty state.
+
+        Args:
+            fingerprint: Identifies the analysis configuration (language map,
+                framework patterns) the state was computed with
+        """
+        self.fingerprint = fingerprint
+
+        # Every known path and the language it was classified as
+        self.path_languages: Dict[str, Optional[str]] = {}
+        self.language_counts: Dict[str, int] = {}
+
+        # Files with contents: hash and framework pattern hits per language
+        self.file_hashes: Dict[str, str] = {}
+        self.file_framework_hits: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self.framework_counts: Dict[str, Dict[str, int]] = {}
+
+        # Size/mtime signatures of files read from a checkout, to skip rereading
+        self.file_signatures: Dict[str, str] = {}
+
+        # Incremented by every change, so callers can tell whether to persist
+        self.revision = 0
+
+        # Identifies the current path set; None until requested after a change
+        self._paths_version: Optional[str] = None
+        # Paths changed since the previous version (None if too many), and
+        # the last completed change: (from version, to version, paths)
+        self._previous_version: Optional[str] = None
+        self._pending_paths: Optional[Dict[str, None]] = {}
+        self._last_change: Optional[Tuple[str, str, List[str]]] = None
+
+    @property
+    def paths_version(self) -> str:
+        """
+        Token identifying the current paths and languages.
+
+        It changes whenever a path is added, reclassified or removed and is
+        kept when the state is pickled, so indexes built from the paths can
+        be cached by it across copies of the state.
+
+        Returns:
+            The token
+        """
+        if self._paths_version is None:
+            self._paths_version = uuid.uuid4().hex
+            self._last_change = None
+            if self._previous_version is not None and self._pending_paths is not None:
+                self._last_change = (
+                    self._previous_version,
+                    self._paths_version,
+                    list(self._pending_paths),
+                )
+            self._pending_paths = {}
+        return self._paths_version
+
+    def paths_changed_since(self, version: str) -> Optional[List[str]]:
+        """
+        Get the paths added, reclassified or removed since a paths version.
+
+        Only the change from the version directly before the current one is
+        known.
+
+        Args:
+            version: An earlier paths_version
+
+        Returns:
+            The changed paths, or None if they are not known
+        """
+        current = self.paths_version
+        if version == current:
+            return []
+        if self._last_change is not None and self._last_change[:2] == (version, current):
+            return self._last_change[2]
+        return None
+
+    def _path_changed(self, path: str) -> None:
+        """Start a new paths version and journal a changed path."""
+        self.revision += 1
+        if self._paths_version is not None:
+            self._previous_version = self._paths_version
+            self._paths_version = None
+        if self._pending_paths is not None:
+            self._pending_paths[path] = None
+            if len(self._pending_paths) > MAX_JOURNALED_PATHS:
+                self._pending_paths = None
+
+    def set_path(self, path: str, language: Optional[str]) -> None:
+        """
+        Record a path and the language it was classified as.
+
+        Args:
+            path: The file path
+            language: The detected language or None
+        """
+        if path in self.path_languages:
+            if self.path_languages[path] == language:
+                return
+            self.remove_path(path)
+
+        self._path_changed(path)
+        self.path_languages[path] = language
+        if language is not None:
+            self.language_counts[language] = self.language_counts.get(language, 0) + 1
+
+    def remove_path(self, path: str) -> None:
+        """
+        Forget a path that no longer exists.
+
+        Args:
+            path: The file path
+        """
+        if path in self.path_languages:
+            self._path_changed(path)
+        language = self.path_languages.pop(path, None)
+        if language is not None:
+            self.language_counts[language] -= 1
+            if self.language_counts[language] == 0:
+                del self.language_counts[language]
+
+    def set_file(
+        self,
+        path: str,
+        file_hash: str,
+        framework_hits: Dict[str, Dict[str, int]],
+        signature: Optional[str] = None,
+    ) -> None:
+        """
+        Record the analysis of a file's contents.
+
+        Args:
+            path: The file path
+            file_hash: Content hash of the file
+            framework_hits: Matched pattern counts by language and framework
+            signature: Optional size/mtime signature of the file on disk
+        """
+        if path in self.file_hashes:
+            self.remove_file(path)
+
+        self.revision += 1
+        self.file_hashes[path] = file_hash
+        if signature is not None:
+            self.file_signatures[path] = signature
+        if framework_hits:
+            self.file_framework_hits[path] = framework_hits
+        self._add_hits(framework_hits, 1)
+
+    def remove_file(self, path: str) -> None:
+        """
+        Forget the contents of a file that was removed.
+
+        Args:
+            path: The file path
+        """
+        self.remove_signature(path)
+        if self.file_hashes.pop(path, None) is not None:
+            self.revision += 1
+            self._add_hits(self.file_framework_hits.pop(path, {}), -1)
+
+    def set_signature(self, path: str, signature: str) -> None:
+        """
+        Record the size/mtime signature of a file read from a checkout.
+
+        Args:
+            path: The file path
+            signature: The file's signature
+        """
+        if self.file_signatures.get(path) != signature:
+            self.revision += 1
+            self.file_signatures[path] = signature
+
+    def remove_signature(self, path: str) -> None:
+        """
+        Forget the signature of a file.
+
+        Args:
+            path: The file path
+        """
+        if self.file_signatures.pop(path, None) is not None:
+            self.revision += 1
+
+    def framework_scores(self, language: str) -> Dict[str, float]:
+        """
+        Compute framework confidence scores for a language.
+
+        Args:
+            language: The primary language
+
+        Returns:
+            Dictionary mapping framework names to confidence scores (0-1)
+        """
+        total_files = len(self.file_hashes)
+        return {
+            framework: min(1.0, count / (total_files * 0.1))  # Normalize scores
+            for framework, count in self.framework_counts.get(language, {}).items()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the state for persistence.
+
+        Returns:
+            JSON serializable dictionary; aggregates are rebuilt on load
+        """
+        return {
+            "fingerprint": self.fingerprint,
+            "path_languages": self.path_languages,
+            "file_hashes": self.file_hashes,
+            "file_framework_hits": self.file_framework_hits,
+            "file_signatures": self.file_signatures,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RepositoryAnalysisState":
+        """
+        Rebuild a state serialized with to_dict().
+
+        Args:
+            data: The serialized state
+
+        Returns:
+            The restored state
+        """
+        state = cls(fingerprint=data.get("fingerprint", ""))
+        for path, language in data.get("path_languages", {}).items():
+            state.set_path(path, language)
+
+        hits = data.get("file_framework_hits", {})
+        for path, file_hash in data.get("file_hashes", {}).items():
+            state.set_file(path, file_hash, hits.get(path, {}))
+
+        # Includes signatures of files whose contents were skipped (binary, too large)
+        state.file_signatures = dict(data.get("file_signatures", {}))
+        return state
+
+    def _add_hits(self, framework_hits: Dict[str, Dict[str, int]], sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) a file's hits from the aggregates."""
+        for language, frameworks in framework_hits.items():
+            counts = self.framework_counts.setdefault(language, {})
+            for framework, hits in frameworks.items():
+                counts[framework] = counts.get(framework, 0) + sign * hits
+                if counts[framework] == 0:
+                    del counts[framework]
+
+
+class _StateSlot:
+    """A repository's live state and the lock serializing its analyses."""
+
+    __slots__ = ("lock", "state", "users")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.state: Optional[RepositoryAnalysisState] = None
+        # Threads holding or waiting for the lock; slots in use are not evicted
+        self.users = 0
+
+
+class AnalysisStateStore:
+    """
+    Live analysis states of the most recently analyzed repositories.
+
+    States are handed out by reference under a per-repository lock, so one
+    analysis of a repository runs at a time and updates the state in place.
+    """
+
+    def __init__(self, max_repositories: int = 8):
+        """
+        Initialize an empty store.
+
+        Args:
+            max_repositories: Maximum number of repositories whose state is kept
+        """
+        self.max_repositories = max_repositories
+        self._slots: "OrderedDict[Any, _StateSlot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open(
+        self,
+        repo_id: Any,
+        fingerprint: str,
+        load: Callable[[], Optional[RepositoryAnalysisState]],
+    ) -> Iterator[RepositoryAnalysisState]:
+        """
+        Hold a repository's live state for the duration of the block.
+
+        Args:
+            repo_id: The repository identifier
+            fingerprint: The analysis configuration the state must match
+            load: Loads a persisted state when none is kept, or returns None
+
+        Returns:
+            Context manager yielding the state; other analyses of the
+            repository wait until the block is left
+        """
+        with self._lock:
+            slot = self._slots.get(repo_id)
+            if slot is None:
+                slot = self._slots[repo_id] = _StateSlot()
+            self._slots.move_to_end(repo_id)
+            slot.users += 1
+
+        try:
+            with slot.lock:
+                state = slot.state
+                if state is None or state.fingerprint != fingerprint:
+                    state = load()
+                    if state is None or state.fingerprint != fingerprint:
+                        state = RepositoryAnalysisState(fingerprint)
+                    slot.state = state
+                yield state
+        finally:
+            with self._lock:
+                slot.users -= 1
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop the least recently used unused slots beyond the limit. Caller must hold the lock."""
+        excess = len(self._slots) - self.max_repositories
+        for repo_id in list(self._slots):
+            if excess <= 0:
+                break
+            if self._slots[repo_id].users == 0:
+                del self._slots[repo_id]
+                excess -= 1
@@ -6,26 +6,80 @@ and extract codebase metadata. It helps other agents understand
 the codebase structure and characteristics.
 """
 
+import asyncio
+import contextvars
+import hashlib
 import json
-import logging
 import os
 import re
-from typing import Any, Dict, List, Optional
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
 
 from agents.core.base_agent import BaseAgent
+from agents.core.knowledge_store import KnowledgeStore
 from agents.core.langchain_wrapper import TekoChatModel, TekoVectorStore
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+from agents.core.llm_cache import ResponseCache
+from agents.implementations.analysis_state import (
+    AnalysisStateStore,
+    RepositoryAnalysisState,
+    content_hash,
+)
+from agents.implementations.context_packer import ContextPacker, get_encoding, token_budget
+from agents.implementations.file_scanner import FileRecord, FileScanner, ParallelFileScanner
+from agents.implementations.framework_matcher import FrameworkMatcher
+from agents.implementations.path_index import PathIndex
+from agents.implementations.repository_reader import (
+    DEFAULT_IGNORED_DIRS,
+    DEFAULT_MAX_FILE_BYTES,
+    LazyFileContents,
+    file_signature,
+    iter_repository_paths,
 )
 
+# Prompt used to ask the LLM for insights about representative files
+AI_INSIGHTS_PROMPT = """
+        Analyze the following code snippets from a {language} codebase and provide insights:
+        {file_snippets}
+        Please provide the following information:
+        1. Architecture: Identify architectural patterns (MVC, microservices, etc.)
+        2. Code quality: Assess code quality, organization, and naming conventions
+        3. Challenges: Identify maintenance challenges or technical debt
+        4. Patterns: Note any unique coding patterns or custom abstractions
+        5. Best practices: Identify adherence or deviation from best practices
+        Format your response as JSON with these keys.
+        """
+
+# Paths of well-known entry points and configuration files, by language, most
+# important first; representative files matching them are preferred
+PRIORITY_PATTERNS = {
+    "php": ["config", "app/Http/Controllers", "app/Models", "routes", "composer.json"],
+    "python": ["settings.py", "urls.py", "models.py", "views.py", "app.py", "main.py"],
+    "javascript": ["index.js", "app.js", "components", "src/App", "package.json"],
+}
+
+# Package files read by extract_dependencies, by language
+PACKAGE_FILES = {
+    "php": ["composer.json"],
+    "python": ["requirements.txt", "setup.py", "pyproject.toml", "Pipfile"],
+    "javascript": ["package.json"],
+}
+
 
 class CodebaseAnalysisAgent(BaseAgent):
     """
     Agent for analyzing codebases, detecting languages, and extracting metadata.
     """
 
+    handled_task_types = ("codebase_analysis",)
+
+    # Guards the lazy creation of the AI components
+    _ai_init_lock = threading.Lock()
+
+    # Guards the path index cache
+    _path_index_lock = threading.Lock()
+
     def __init__(
         self,
         name: str,
@@ -60,6 +114,17 @@ class CodebaseAnalysisAgent(BaseAgent):
             "css": [".css", ".scss", ".sass", ".less"],
         }
 
+        # Well-known files that have no (meaningful) extension
+        self.language_filenames = {
+            "dockerfile": ["Dockerfile", "Containerfile"],
+            "makefile": ["Makefile", "GNUmakefile"],
+            "ruby": ["Gemfile", "Rakefile"],
+        }
+
+        # Both maps may be extended or overridden per language from the config
+        self.language_extensions.update(self.config.get("language_extensions", {}))
+        self.language_filenames.update(self.config.get("language_filenames", {}))
+
         # Framework detection patterns
         self.framework_patterns = {
             "php": {
@@ -80,43 +145,166 @@ class CodebaseAnalysisAgent(BaseAgent):
                 "angular": ["angular", "@Component", "ngModule"],
                 "vue": ["vue", "createApp", "defineComponent"],
                 "next": ["next", "getStaticProps", "getServerSideProps"],
-                "node": ["express", "require(", "npm", "package.json"],
+                "node": ["express", r"require\(", "npm", "package.json"],
             },
         }
 
-        # Initialize AI components if enabled in config
+        # Analyzers are built on first use and rebuilt when the tables change
+        self._file_scanner: Optional[FileScanner] = None
+        self._file_scanner_key = ""
+        self._parallel_scanner: Optional[ParallelFileScanner] = None
+        self._parallel_scanner_key = ""
+        self._context_packer: Optional[ContextPacker] = None
+        # Path indexes of recently analyzed repositories and their paths versions
+        self._path_indexes: "OrderedDict[Any, Tuple[str, PathIndex]]" = OrderedDict()
+        # Live analysis states, shared with the process's other agents
+        self._analysis_states: Optional[AnalysisStateStore] = None
+
+        # AI components are created on first use, see chat_model and vector_store
         self.ai_enabled = self.config.get("ai_enabled", True)
-        if self.ai_enabled:
-            self.chat_model = TekoChatModel(
-                model_name=self.config.get("model_name", "gpt-4o"),
-                temperature=self.config.get("temperature", 0.1),
+        self._chat_model: Optional[TekoChatModel] = None
+        self._vector_store: Optional[TekoVectorStore] = None
+
+    @property
+    def chat_model(self) -> TekoChatModel:
+        """The agent's chat model, created on first use."""
+        if self._chat_model is None:
+            with self._ai_init_lock:
+                if self._chat_model is None:
+                    self._chat_model = self._create_chat_model()
+        return self._chat_model
+
+    @chat_model.setter
+    def chat_model(self, chat_model: TekoChatModel) -> None:
+        self._chat_model = chat_model
+
+    @property
+    def vector_store(self) -> TekoVectorStore:
+        """The agent's vector store, created on first use."""
+        if self._vector_store is None:
+            with self._ai_init_lock:
+                if self._vector_store is None:
+                    self._vector_store = self._create_vector_store()
+        return self._vector_store
+
+    @vector_store.setter
+    def vector_store(self, vector_store: TekoVectorStore) -> None:
+        self._vector_store = vector_store
+
+    def _create_chat_model(self) -> TekoChatModel:
+        """
+        Build the chat model from the config.
+
+        Returns:
+            The chat model, using the shared response cache if enabled
+        """
+        # Cache LLM responses so re-analysing an unchanged repository is free.
+        # Caches and clients are shared by agents with the same settings.
+        response_cache = None
+        if self.config.get("response_cache", True):
+            cache_config = {
+                "max_entries": self.config.get("response_cache_size", 1024),
+                "ttl": self.config.get("response_cache_ttl", 7 * 24 * 3600),
+                "path": self.config.get("response_cache_path", "./data/llm_cache.sqlite3"),
+            }
+            response_cache = self.acquire_client(
+                "response_cache", cache_config, lambda: ResponseCache(**cache_config)
+            )
+
+        return TekoChatModel(
+            model_name=self.config.get("model_name", "gpt-4o"),
+            temperature=self.config.get("temperature", 0.1),
+            cache=response_cache,
+        )
+
+    def _create_vector_store(self) -> TekoVectorStore:
+        """
+        Build the vector store from the config.
+
+        Returns:
+            The vector store, using the shared embedding cache if enabled
+        """
+        # Imported here because it loads numpy and LangChain
+        from agents.core.embedding_cache import EmbeddingCache
+
+        embedding_model = self.config.get("embedding_model", "text-embedding-ada-002")
+        embedding_cache = None
+        if self.config.get("embedding_cache", True):
+            embedding_cache_config = {
+                "max_entries": self.config.get("embedding_cache_size", 50_000),
+                "path": self.config.get("embedding_cache_path", "./data/embedding_cache"),
+                "namespace": embedding_model,
+            }
+            embedding_cache = self.acquire_client(
+                "embedding_cache",
+                embedding_cache_config,
+                lambda: EmbeddingCache(**embedding_cache_config),
             )
-            self.vector_store = TekoVectorStore(collection_name=f"codebase_analysis_{self.name}")
 
-    def analyze_file_extensions(self, file_paths: List[str]) -> Dict[str, int]:
+        return TekoVectorStore(
+            collection_name=f"codebase_analysis_{self.name}",
+            batch_size=self.config.get("embedding_batch_size", 64),
+            max_concurrency=self.config.get("embedding_concurrency", 4),
+            embedding_model=embedding_model,
+            embedding_cache=embedding_cache,
+        )
+
+    def warm_up(self) -> None:
+        """Create the chat model and vector store now rather than on first use."""
+        if self.ai_enabled:
+            self.chat_model
+            self.vector_store
+
+    def close(self) -> None:
+        """Release the LLM and vector store clients and stop the scanning pool."""
+        if self._chat_model is not None:
+            self._chat_model.close()
+            self._chat_model = None
+        if self._vector_store is not None:
+            self._vector_store.close()
+            self._vector_store = None
+        if self._parallel_scanner is not None:
+            self._parallel_scanner.close()
+            self._parallel_scanner = None
+        super().close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Get the agent's state for pickling, e.g. when it runs in process mode.
+
+        Returns:
+            The instance dictionary without the chat model, vector store and
+            scanning pool, which hold clients and locks that cannot be
+            pickled, and the context packer and path indexes; all of them
+            are rebuilt on first use
+        """
+        state = super().__getstate__()
+        state["_chat_model"] = None
+        state["_vector_store"] = None
+        state["_parallel_scanner"] = None
+        state["_parallel_scanner_key"] = ""
+        state["_context_packer"] = None
+        state["_path_indexes"] = OrderedDict()
+        state["_analysis_states"] = None
+        return state
+
+    def analyze_file_extensions(self, file_paths: Iterable[str]) -> Dict[str, int]:
         """
         Analyze file extensions to determine language distribution.
 
         Args:
-            file_paths: List of file paths in the repository
+            file_paths: File paths in the repository; may be a lazy iterator
 
         Returns:
             Dictionary mapping languages to file counts
         """
         language_counts: Dict[str, int] = {}
+        detect_language = self._get_file_scanner().languages.detect
 
         for path in file_paths:
-            ext = os.path.splitext(path)[1].lower()
-
-            # Skip directories and files without extensions
-            if not ext:
-                continue
-
-            # Find which language this extension belongs to
-            for language, extensions in self.language_extensions.items():
-                if ext in extensions:
-                    language_counts[language] = language_counts.get(language, 0) + 1
-                    break
+            language = detect_language(path)
+            if language is not None:
+                language_counts[language] = language_counts.get(language, 0) + 1
 
         return language_counts
 
@@ -139,15 +327,13 @@ class CodebaseAnalysisAgent(BaseAgent):
         if primary_language not in self.framework_patterns:
             return {}
 
-        frameworks = self.framework_patterns[primary_language]
+        matcher = self._get_framework_matcher()
 
         # Count framework pattern occurrences
-        for path, content in file_contents.items():
-            for framework, patterns in frameworks.items():
-                for pattern in patterns:
-                    # Count occurrences of the pattern
-                    if re.search(pattern, content, re.IGNORECASE):
-                        framework_counts[framework] = framework_counts.get(framework, 0) + 1
+        for content in file_contents.values():
+            hits = matcher.match(content, primary_language).get(primary_language, {})
+            for framework, count in hits.items():
+                framework_counts[framework] = framework_counts.get(framework, 0) + count
 
         # Convert counts to confidence scores
         total_files = len(file_contents)
@@ -158,8 +344,105 @@ class CodebaseAnalysisAgent(BaseAgent):
 
         return confidence_scores
 
+    def _get_framework_matcher(self) -> FrameworkMatcher:
+        """
+        Get the compiled framework matcher, recompiling if the patterns changed.
+
+        Returns:
+            Matcher for the current framework_patterns
+        """
+        return self._get_file_scanner().matcher
+
+    def _get_file_scanner(self) -> FileScanner:
+        """
+        Get the per-file analyzers, rebuilding them if the tables changed.
+
+        Returns:
+            Scanner for the current language_extensions and framework_patterns
+        """
+        scanner_key = self._analysis_fingerprint()
+        if self._file_scanner is None or self._file_scanner_key != scanner_key:
+            self._file_scanner = FileScanner(
+                self.language_extensions, self.framework_patterns, self.language_filenames
+            )
+            self._file_scanner_key = scanner_key
+        return self._file_scanner
+
+    def _get_parallel_scanner(self, num_files: int) -> Optional[ParallelFileScanner]:
+        """
+        Get the process pool for scanning num_files files, if parallel scanning pays off.
+
+        Parallel scanning is enabled with the scan_workers config option and
+        only used for at least parallel_scan_min_files files, below which the
+        cost of shipping work to the pool outweighs the speedup.
+
+        Args:
+            num_files: Number of files about to be scanned
+
+        Returns:
+            The pool, or None to scan in the current process
+        """
+        workers = self.config.get("scan_workers", 1)
+        if workers <= 1 or num_files < self.config.get("parallel_scan_min_files", 1000):
+            return None
+
+        pool_key = f"{workers}:{self._analysis_fingerprint()}"
+        if self._parallel_scanner is None or self._parallel_scanner_key != pool_key:
+            if self._parallel_scanner is not None:
+                self._parallel_scanner.close()
+            self._parallel_scanner = ParallelFileScanner(
+                self.language_extensions,
+                self.framework_patterns,
+                workers,
+                language_filenames=self.language_filenames,
+            )
+            self._parallel_scanner_key = pool_key
+        return self._parallel_scanner
+
+    def _scan_contents(
+        self, items: List[Tuple[str, Optional[str], Optional[str]]]
+    ) -> List[FileRecord]:
+        """
+        Analyze in-memory files, in parallel for large batches.
+
+        Args:
+            items: List of (path, contents or None, precomputed hash or None)
+
+        Returns:
+            Records in the order of items
+        """
+        pool = self._get_parallel_scanner(len(items))
+        if pool is not None:
+            return pool.scan(items)
+
+        scanner = self._get_file_scanner()
+        return [scanner.scan(path, content, file_hash) for path, content, file_hash in items]
+
+    def _scan_checkout_files(
+        self, root: str, items: List[Tuple[str, Optional[str]]], max_bytes: int
+    ) -> List[FileRecord]:
+        """
+        Read and analyze checkout files, in parallel for large batches.
+
+        Args:
+            root: The repository checkout directory
+            items: List of (path relative to root, previous hash or None)
+            max_bytes: Files larger than this are not read
+
+        Returns:
+            Records in the order of items
+        """
+        pool = self._get_parallel_scanner(len(items))
+        if pool is not None:
+            return pool.scan_files(root, items, max_bytes)
+
+        scanner = self._get_file_scanner()
+        return [
+            scanner.scan_file(root, path, previous_hash, max_bytes) for path, previous_hash in items
+        ]
+
     def extract_dependencies(
-        self, file_contents: Dict[str, str], primary_language: str
+        self, file_contents: Mapping[str, str], primary_language: str
     ) -> Dict[str, List[str]]:
         """
         Extract dependencies from package files based on language.
@@ -173,14 +456,7 @@ class CodebaseAnalysisAgent(BaseAgent):
         """
         dependencies: Dict[str, List[str]] = {}
 
-        # Language-specific package files
-        package_files = {
-            "php": ["composer.json"],
-            "python": ["requirements.txt", "setup.py", "pyproject.toml", "Pipfile"],
-            "javascript": ["package.json"],
-        }
-
-        if primary_language not in package_files:
+        if primary_language not in PACKAGE_FILES:
             return dependencies
 
         # Extract from composer.json for PHP
@@ -221,7 +497,10 @@ class CodebaseAnalysisAgent(BaseAgent):
         return dependencies
 
     def get_ai_insights(
-        self, file_contents: Dict[str, str], primary_language: str
+        self,
+        file_contents: Mapping[str, str],
+        primary_language: str,
+        path_index: Optional[PathIndex] = None,
     ) -> Dict[str, Any]:
         """
         Use AI to gain deeper insights about the codebase structure and patterns.
@@ -229,6 +508,7 @@ class CodebaseAnalysisAgent(BaseAgent):
         Args:
             file_contents: Dictionary mapping file paths to their contents
             primary_language: The primary language detected
+            path_index: Index of the repository's paths, if already built
 
         Returns:
             Dictionary of AI-generated insights
@@ -236,132 +516,274 @@ class CodebaseAnalysisAgent(BaseAgent):
         if not self.ai_enabled:
             return {"ai_enabled": False}
 
-        # Select representative files for analysis
-        representative_files = self._select_representative_files(
-            file_contents, primary_language, max_files=5
-        )
-        if not representative_files:
+        with self.span("build_prompt"):
+            prompt_inputs = self._build_ai_insights_inputs(
+                file_contents, primary_language, path_index
+            )
+        if prompt_inputs is None:
             return {"error": "No representative files found for analysis"}
 
-        # Prepare prompt for the AI
-        prompt_template = """
-        Analyze the following code snippets from a {language} codebase and provide insights:
-        {file_snippets}
-        Please provide the following information:
-        1. Architecture: Identify architectural patterns (MVC, microservices, etc.)
-        2. Code quality: Assess code quality, organization, and naming conventions
-        3. Challenges: Identify maintenance challenges or technical debt
-        4. Patterns: Note any unique coding patterns or custom abstractions
-        5. Best practices: Identify adherence or deviation from best practices
-        Format your response as JSON with these keys.
-        """
+        # Create chain and generate response
+        chain = self.chat_model.create_chain(AI_INSIGHTS_PROMPT)
 
-        # Create file snippets
-        file_snippets = []
-        for path, content in representative_files.items():
-            # Limit content length for prompt
-            if len(content) > 2000:
-                content = content[:2000] + "... [truncated]"
+        try:
+            with self.span("llm"):
+                response = self.chat_model.generate_response(chain, **prompt_inputs)
+            return self._parse_ai_insights(response)
+        except Exception as e:
+            self.logger.error("Error generating AI insights: %s", e)
+            return {"error": str(e)}
 
-            file_snippets.append(f"File: {path}\n```\n{content}\n```\n")
+    async def aget_ai_insights(
+        self,
+        file_contents: Dict[str, str],
+        primary_language: str,
+        path_index: Optional[PathIndex] = None,
+    ) -> Dict[str, Any]:
+        """
+        Asynchronous version of get_ai_insights using the async LLM entry point.
 
-        # Create chain and generate response
-        chain = self.chat_model.create_chain(prompt_template)
+        Args:
+            file_contents: Dictionary mapping file paths to their contents
+            primary_language: The primary language detected
+            path_index: Index of the repository's paths, if already built
 
-        try:
-            response = self.chat_model.generate_response(
-                chain, language=primary_language, file_snippets="\n".join(file_snippets)
+        Returns:
+            Dictionary of AI-generated insights
+        """
+        if not self.ai_enabled:
+            return {"ai_enabled": False}
+
+        with self.span("build_prompt"):
+            prompt_inputs = self._build_ai_insights_inputs(
+                file_contents, primary_language, path_index
             )
+        if prompt_inputs is None:
+            return {"error": "No representative files found for analysis"}
 
-            # Try to parse JSON response
-            try:
-                insights: Dict[str, Any] = json.loads(response)
-                return insights
-            except json.JSONDecodeError:
-                # If not valid JSON, return as text
-                return {"raw_insights": response}
+        chain = self.chat_model.create_chain(AI_INSIGHTS_PROMPT)
 
+        try:
+            with self.span("llm"):
+                response = await self.chat_model.agenerate_response(chain, **prompt_inputs)
+            return self._parse_ai_insights(response)
         except Exception as e:
-            self.logger.error(f"Error generating AI insights: {str(e)}")
+            self.logger.error("Error generating AI insights: %s", e)
             return {"error": str(e)}
 
+    def get_ai_insights_batch(
+        self, analyses: List[Tuple[Mapping[str, str], str, Optional[PathIndex]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Get AI insights for several codebases with one chain and batched LLM calls.
+
+        Args:
+            analyses: File contents, primary language and path index (or None),
+                one per codebase
+
+        Returns:
+            Dictionary of AI-generated insights for each codebase, in order
+        """
+        if not self.ai_enabled:
+            return [{"ai_enabled": False} for _ in analyses]
+
+        insights: List[Dict[str, Any]] = [
+            {"error": "No representative files found for analysis"} for _ in analyses
+        ]
+        with self.span("build_prompt"):
+            prompt_inputs = [
+                self._build_ai_insights_inputs(file_contents, primary_language, path_index)
+                for file_contents, primary_language, path_index in analyses
+            ]
+        pending = [index for index, inputs in enumerate(prompt_inputs) if inputs is not None]
+        if not pending:
+            return insights
+
+        chain = self.chat_model.create_chain(AI_INSIGHTS_PROMPT)
+
+        try:
+            with self.span("llm"):
+                responses = self.chat_model.generate_responses(
+                    chain, [prompt_inputs[index] for index in pending]
+                )
+        except Exception as e:
+            self.logger.error("Error generating AI insights: %s", e)
+            for index in pending:
+                insights[index] = {"error": str(e)}
+            return insights
+
+        for index, response in zip(pending, responses):
+            insights[index] = self._parse_ai_insights(response)
+        return insights
+
+    def _build_ai_insights_inputs(
+        self,
+        file_contents: Mapping[str, str],
+        primary_language: str,
+        path_index: Optional[PathIndex] = None,
+    ) -> Optional[Dict[str, str]]:
+        """
+        Build the prompt variables for the AI insights prompt.
+
+        Args:
+            file_contents: Dictionary mapping file paths to their contents
+            primary_language: The primary language detected
+            path_index: Index of the repository's paths, if already built
+
+        Returns:
+            Prompt variables, or None if no representative files were found
+        """
+        # Select candidate files, then pack the best of them into the token budget
+        representative_files = self._select_representative_files(
+            file_contents,
+            primary_language,
+            max_files=self.config.get("context_candidates", 20),
+            path_index=path_index,
+        )
+        if not representative_files:
+            return None
+
+        patterns = PRIORITY_PATTERNS.get(primary_language, [])
+        matches = {
+            path: next((rank for rank, pattern in enumerate(patterns) if pattern in path), None)
+            for path in representative_files
+        }
+        priority_paths = sorted(
+            (path for path, rank in matches.items() if rank is not None), key=matches.__getitem__
+        )
+
+        packed = self._get_context_packer().pack(representative_files, priority_paths)
+        self.logger.debug(
+            "Packed %d of %d files into %d of %d tokens",
+            len(packed.paths),
+            len(representative_files),
+            packed.tokens,
+            packed.budget,
+        )
+        return {"language": primary_language, "file_snippets": packed.text}
+
+    def _get_context_packer(self) -> ContextPacker:
+        """
+        Get the packer filling the AI insights prompt, sized for the configured model.
+
+        Returns:
+            Packer for the context_token_budget, or the model's default budget
+        """
+        if self._context_packer is None:
+            model_name = self.config.get("model_name", "gpt-4o")
+            self._context_packer = ContextPacker(
+                self.config.get("context_token_budget") or token_budget(model_name),
+                get_encoding(model_name),
+            )
+        return self._context_packer
+
+    def _parse_ai_insights(self, response: str) -> Dict[str, Any]:
+        """
+        Parse the LLM response for the AI insights prompt.
+
+        Args:
+            response: The raw LLM response
+
+        Returns:
+            The parsed insights, or the raw text if the response is not JSON
+        """
+        # Try to parse JSON response
+        try:
+            insights: Dict[str, Any] = json.loads(response)
+            return insights
+        except json.JSONDecodeError:
+            # If not valid JSON, return as text
+            return {"raw_insights": response}
+
     def _select_representative_files(
-        self, file_contents: Dict[str, str], language: str, max_files: int = 5
+        self,
+        file_contents: Mapping[str, str],
+        language: str,
+        max_files: int = 5,
+        path_index: Optional[PathIndex] = None,
     ) -> Dict[str, str]:
         """
         Select representative files from the codebase for analysis.
 
+        Files matching the language's priority patterns come first, in
+        pattern order, then other files of the language fill the remaining
+        slots. Only files with contents are selected.
+
         Args:
             file_contents: Dictionary mapping file paths to their contents
             language: The primary language to focus on
             max_files: Maximum number of files to select
+            path_index: Index of the repository's paths; built from the
+                paths of file_contents if not given
 
         Returns:
             Dictionary of selected files and their contents
         """
-        selected_files: Dict[str, str] = {}
-
-        # Get list of files with the target language extensions
-        language_extensions = self.language_extensions.get(language, [])
-        language_files = [
-            path
-            for path in file_contents.keys()
-            if any(path.endswith(ext) for ext in language_extensions)
-        ]
+        if path_index is None:
+            detect_language = self._get_file_scanner().detect_language
+            path_index = PathIndex((path, detect_language(path)) for path in file_contents)
 
-        if not language_files:
-            return {}
-
-        # Priority files to include based on patterns
-        priority_patterns = {
-            "php": [
-                "config",
-                "app/Http/Controllers",
-                "app/Models",
-                "routes",
-                "composer.json",
-            ],
-            "python": [
-                "settings.py",
-                "urls.py",
-                "models.py",
-                "views.py",
-                "app.py",
-                "main.py",
-            ],
-            "javascript": [
-                "index.js",
-                "app.js",
-                "components",
-                "src/App",
-                "package.json",
-            ],
-        }
+        selected_files: Dict[str, str] = {}
 
-        patterns = priority_patterns.get(language, [])
+        def available(path: str) -> bool:
+            return path not in selected_files and path in file_contents
 
         # First select priority files
-        for pattern in patterns:
+        for pattern in PRIORITY_PATTERNS.get(language, []):
             if len(selected_files) >= max_files:
                 break
 
-            for path in language_files:
-                if pattern in path and path not in selected_files:
-                    selected_files[path] = file_contents[path]
-                    break
+            path = path_index.first_match(pattern, language, available)
+            if path is not None:
+                selected_files[path] = file_contents[path]
 
         # Fill remaining slots with other files
-        remaining_slots = max_files - len(selected_files)
-        if remaining_slots > 0:
-            for path in language_files:
-                if path not in selected_files:
-                    selected_files[path] = file_contents[path]
-                    remaining_slots -= 1
-                    if remaining_slots <= 0:
-                        break
+        for path in path_index.files(language):
+            if len(selected_files) >= max_files:
+                break
+            if available(path):
+                selected_files[path] = file_contents[path]
 
         return selected_files
 
+    def _get_path_index(self, repo_id: Optional[Any], state: RepositoryAnalysisState) -> PathIndex:
+        """
+        Get the index of a repository's paths.
+
+        The index is built once per repository and kept for the most recently
+        analyzed repositories. When the repository's paths change, the kept
+        index is updated with the changed paths instead of being rebuilt.
+
+        Args:
+            repo_id: The repository identifier, or None to build an index
+                that is not kept
+            state: The repository's analysis state
+
+        Returns:
+            Index of the state's paths and languages
+        """
+        if repo_id is None:
+            return PathIndex(state.path_languages.items())
+
+        version = state.paths_version
+        with self._path_index_lock:
+            cached = self._path_indexes.get(repo_id)
+            if cached is not None:
+                self._path_indexes.move_to_end(repo_id)
+                if cached[0] == version:
+                    return cached[1]
+
+        if cached is None:
+            path_index = PathIndex(state.path_languages.items())
+        else:
+            changed_paths = state.paths_changed_since(cached[0])
+            path_index = cached[1].updated(state.path_languages, changed_paths)
+        with self._path_index_lock:
+            self._path_indexes[repo_id] = (version, path_index)
+            while len(self._path_indexes) > self.config.get("path_index_cache_size", 4):
+                self._path_indexes.popitem(last=False)
+        return path_index
+
     def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process a codebase analysis task.
@@ -374,53 +796,467 @@ class CodebaseAnalysisAgent(BaseAgent):
         """
         self.update_status("analyzing")
 
-        # Extract repository information from task
-        repo_url = task.get("repository_url")
-        repo_id = task.get("repository_id")
-        file_paths = task.get("file_paths", [])
-        file_contents = task.get("file_contents", {})
+        results, file_contents, path_index = self._analyze_codebase(task)
 
-        if not file_paths or not file_contents:
-            raise ValueError("Task missing required file_paths or file_contents")
+        # Get AI insights if enabled
+        primary_language = results["primary_language"]
+        if self.ai_enabled and primary_language:
+            with self.span("ai_insights"):
+                results["ai_insights"] = self.get_ai_insights(
+                    file_contents, primary_language, path_index
+                )
 
-        # Analyze file extensions to determine language distribution
-        language_counts = self.analyze_file_extensions(file_paths)
+        self.update_status("completed")
+        return results
 
-        # Determine primary language
-        primary_language = None
-        if language_counts:
-            primary_language = max(language_counts, key=lambda k: language_counts[k])
+    def process_batch(self, tasks: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Process several codebase analysis tasks, sharing one batched LLM round.
 
-        # Detect frameworks
-        frameworks = {}
-        if primary_language:
-            frameworks = self.detect_frameworks(file_contents, primary_language)
+        The static analysis runs task by task; the AI insights for all
+        analyzed codebases are then requested together.
 
-        # Extract dependencies
-        dependencies = {}
-        if primary_language:
-            dependencies = self.extract_dependencies(file_contents, primary_language)
+        Args:
+            tasks: The task data dictionaries
 
-        # Get AI insights if enabled
-        ai_insights = {}
+        Returns:
+            One entry per task, in order: its analysis results, or the
+            exception that made it fail
+        """
+        self.update_status("analyzing")
+
+        outcomes: List[Any] = []
+        analyses: List[Tuple[Dict[str, Any], Mapping[str, str], Optional[PathIndex]]] = []
+        for task in tasks:
+            try:
+                results, file_contents, path_index = self._analyze_codebase(task)
+            except Exception as e:
+                outcomes.append(e)
+                continue
+            outcomes.append(results)
+            if self.ai_enabled and results["primary_language"]:
+                analyses.append((results, file_contents, path_index))
+
+        if analyses:
+            with self.span("ai_insights"):
+                insights = self.get_ai_insights_batch(
+                    [
+                        (file_contents, results["primary_language"], path_index)
+                        for results, file_contents, path_index in analyses
+                    ]
+                )
+            for (results, _, _), result_insights in zip(analyses, insights):
+                results["ai_insights"] = result_insights
+
+        self.update_status("completed")
+        return outcomes
+
+    async def aprocess_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a codebase analysis task from an asyncio event loop.
+
+        The CPU-bound analysis runs in the loop's executor while the LLM call
+        for AI insights is awaited natively.
+
+        Args:
+            task: The task data dictionary containing repository information
+
+        Returns:
+            Analysis results
+        """
+        self.update_status("analyzing")
+
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the current context so the task's trace follows it
+        context = contextvars.copy_context()
+        results, file_contents, path_index = await loop.run_in_executor(
+            None, context.run, self._analyze_codebase, task
+        )
+
+        primary_language = results["primary_language"]
         if self.ai_enabled and primary_language:
-            ai_insights = self.get_ai_insights(file_contents, primary_language)
+            with self.span("ai_insights"):
+                results["ai_insights"] = await self.aget_ai_insights(
+                    file_contents, primary_language, path_index
+                )
+
+        self.update_status("completed")
+        return results
+
+    def _analyze_codebase(
+        self, task: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Mapping[str, str], Optional[PathIndex]]:
+        """
+        Run the static (non-AI) analysis steps for a task.
+
+        The task either carries file_paths and file_contents, or references a
+        local checkout with repository_path. Checkouts are streamed: files are
+        walked and read one at a time and contents are never held together.
+        An optional commit names the analyzed revision; results are shared
+        with other agents through the knowledge store per repository and commit.
+
+        Args:
+            task: The task data dictionary containing repository information
+
+        Returns:
+            Tuple of the analysis results (with empty AI insights), the file
+            contents to use for AI insights and the index of the repository's
+            paths (None if no AI insights will be requested)
+        """
+        # Extract repository information from task
+        repo_url = task.get("repository_url")
+        repo_id = task.get("repository_id")
+        file_paths = task.get("file_paths", [])
+        file_contents: Mapping[str, str] = task.get("file_contents", {})
+        repository_path = task.get("repository_path")
+
+        streaming = not file_contents and repository_path is not None
+        if streaming and not os.path.isdir(repository_path):
+            raise ValueError(f"Repository path {repository_path} is not a directory")
+        if not streaming and (not file_paths or not file_contents):
+            raise ValueError(
+                "Task missing required file_paths or file_contents, or repository_path"
+            )
+
+        # Results are shared with other agents per repository and commit
+        namespace = None
+        if repo_id is not None:
+            namespace = KnowledgeStore.namespace(repo_id, task.get("commit"))
+
+        # Bring the repository's analysis state up to date with the current files;
+        # the state is only read and updated while it is held
+        with ExitStack() as held:
+            with self.span("load_state"):
+                state = held.enter_context(self._open_analysis_state(repo_id))
+            revision = state.revision
+
+            # Language detection and framework matching run together per file
+            with self.span("scan"):
+                if streaming:
+                    changes = self._update_analysis_state_from_checkout(state, repository_path)
+                    file_count = len(state.path_languages)
+                    file_contents = LazyFileContents(
+                        repository_path,
+                        state.file_hashes,
+                        max_bytes=self.config.get("max_file_bytes", DEFAULT_MAX_FILE_BYTES),
+                    )
+                else:
+                    changes = self._update_analysis_state(
+                        state, file_paths, file_contents, task.get("file_hashes", {})
+                    )
+                    file_count = len(file_paths)
+
+            if repo_id is not None and state.revision != revision:
+                with self.span("save_state"):
+                    self._save_analysis_state(repo_id, state)
+
+            language_counts = dict(state.language_counts)
+
+            # Determine primary language
+            primary_language = None
+            if language_counts:
+                primary_language = max(language_counts, key=lambda k: language_counts[k])
+
+            # Detect frameworks
+            frameworks = {}
+            if primary_language:
+                with self.span("frameworks"):
+                    frameworks = state.framework_scores(primary_language)
+
+            # Extract dependencies
+            dependencies = {}
+            if primary_language:
+                with self.span("dependencies"):
+                    dependencies = self._get_dependencies(
+                        namespace, state, file_contents, primary_language
+                    )
+
+            # Index the paths for choosing the files shown to the LLM
+            path_index = None
+            if self.ai_enabled and primary_language:
+                with self.span("path_index"):
+                    path_index = self._get_path_index(repo_id, state)
 
         # Compile results
         results = {
             "repository_url": repo_url,
             "repository_id": repo_id,
-            "file_count": len(file_paths),
+            "file_count": file_count,
             "languages": language_counts,
             "primary_language": primary_language,
             "frameworks": frameworks,
             "dependencies": dependencies,
-            "ai_insights": ai_insights,
+            "ai_insights": {},
+            "changes": changes,
             "timestamp": self.last_active.isoformat(),
         }
 
-        self.update_status("completed")
-        return results
+        return results, file_contents, path_index
+
+    def _update_analysis_state(
+        self,
+        state: RepositoryAnalysisState,
+        file_paths: List[str],
+        file_contents: Dict[str, str],
+        file_hashes: Dict[str, str],
+    ) -> Dict[str, int]:
+        """
+        Rescan only the files that changed since the state was last updated.
+
+        Args:
+            state: The repository's analysis state, updated in place
+            file_paths: All file paths in the repository
+            file_contents: Dictionary mapping file paths to their contents
+            file_hashes: Optional precomputed content hashes (e.g. git blob ids)
+                used instead of hashing the contents
+
+        Returns:
+            Number of added, modified, removed and unchanged files
+        """
+        changes = {"added": 0, "modified": 0, "removed": 0, "unchanged": 0}
+
+        # Forget paths and contents that no longer exist
+        current_paths = dict.fromkeys(file_paths)
+        for path in [path for path in state.path_languages if path not in current_paths]:
+            state.remove_path(path)
+        for path in [path for path in state.file_hashes if path not in file_contents]:
+            state.remove_file(path)
+            changes["removed"] += 1
+
+        # Languages only depend on the path, so only new paths are classified;
+        # framework hits depend on the contents, so only changed files are rescanned
+        scan_items: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        for path in current_paths:
+            if path not in state.path_languages:
+                scan_items[path] = (None, None)
+        for path, content in file_contents.items():
+            file_hash = file_hashes.get(path) or content_hash(content)
+            previous_hash = state.file_hashes.get(path)
+            if previous_hash == file_hash:
+                changes["unchanged"] += 1
+                continue
+
+            changes["modified" if previous_hash is not None else "added"] += 1
+            scan_items[path] = (content, file_hash)
+
+        with self.span("scan_files"):
+            records = self._scan_contents(
+                [(path, content, file_hash) for path, (content, file_hash) in scan_items.items()]
+            )
+
+        # Fold the per-file records into the aggregates in input order
+        for record in records:
+            if record.path in current_paths and record.path not in state.path_languages:
+                state.set_path(record.path, record.language)
+            if record.file_hash is not None:
+                state.set_file(record.path, record.file_hash, record.framework_hits or {})
+
+        return changes
+
+    def _update_analysis_state_from_checkout(
+        self, state: RepositoryAnalysisState, root: str
+    ) -> Dict[str, int]:
+        """
+        Stream a local checkout into the analysis state.
+
+        Files are visited one at a time. Files whose size and modification
+        time are unchanged since the last run are not read at all; other files
+        are read, hashed and rescanned only if their contents changed. Binary
+        and oversized files are classified by path only.
+
+        Args:
+            state: The repository's analysis state, updated in place
+            root: The repository checkout directory
+
+        Returns:
+            Number of added, modified, removed and unchanged files
+        """
+        changes = {"added": 0, "modified": 0, "removed": 0, "unchanged": 0}
+        max_bytes = self.config.get("max_file_bytes", DEFAULT_MAX_FILE_BYTES)
+        ignored_dirs = self.config.get("ignored_dirs", DEFAULT_IGNORED_DIRS)
+
+        # Walk the checkout and collect new files and files whose signature changed
+        seen: Set[str] = set()
+        signatures: Dict[str, str] = {}
+        scan_items: List[Tuple[str, Optional[str]]] = []
+        for path, stat in iter_repository_paths(root, ignored_dirs):
+            seen.add(path)
+            signature = file_signature(stat)
+            previous_hash = state.file_hashes.get(path)
+            if path in state.path_languages and state.file_signatures.get(path) == signature:
+                if previous_hash is not None:
+                    changes["unchanged"] += 1
+                continue
+
+            signatures[path] = signature
+            scan_items.append((path, previous_hash))
+
+        # Fold the per-file records into the aggregates in walk order
+        for record in self._scan_checkout_files(root, scan_items, max_bytes):
+            path = record.path
+            if path not in state.path_languages:
+                state.set_path(path, record.language)
+
+            previous_hash = state.file_hashes.get(path)
+            if record.file_hash is None:
+                # Binary or too large: forget old contents, remember the signature
+                if previous_hash is not None:
+                    state.remove_file(path)
+                    changes["removed"] += 1
+                state.set_signature(path, signatures[path])
+            elif record.framework_hits is None:
+                # Rewritten without changing the contents
+                state.set_signature(path, signatures[path])
+                changes["unchanged"] += 1
+            else:
+                changes["modified" if previous_hash is not None else "added"] += 1
+                state.set_file(path, record.file_hash, record.framework_hits, signatures[path])
+
+        # Forget everything that no longer exists in the checkout
+        for path in [path for path in state.path_languages if path not in seen]:
+            state.remove_path(path)
+        for path in [path for path in state.file_hashes if path not in seen]:
+            state.remove_file(path)
+            changes["removed"] += 1
+        for path in [path for path in state.file_signatures if path not in seen]:
+            state.remove_signature(path)
+
+        return changes
+
+    def _analysis_fingerprint(self) -> str:
+        """
+        Fingerprint the configuration that analysis results depend on.
+
+        Returns:
+            Hex digest of the language maps and framework patterns
+        """
+        config = json.dumps(
+            [self.language_extensions, self.language_filenames, self.framework_patterns],
+            sort_keys=True,
+        )
+        return hashlib.sha1(config.encode("utf-8")).hexdigest()
+
+    def _get_dependencies(
+        self,
+        namespace: Optional[str],
+        state: RepositoryAnalysisState,
+        file_contents: Mapping[str, str],
+        primary_language: str,
+    ) -> Dict[str, List[str]]:
+        """
+        Extract dependencies, reusing another agent's result for the same package files.
+
+        Args:
+            namespace: The repository's knowledge store namespace, or None
+            state: The repository's up to date analysis state
+            file_contents: Mapping of file paths to their contents
+            primary_language: The primary language detected
+
+        Returns:
+            Dictionary of dependencies by type
+        """
+        if namespace is None or primary_language not in PACKAGE_FILES:
+            return self.extract_dependencies(file_contents, primary_language)
+
+        # Keyed on the package files' hashes, so edits to them are never masked
+        package_hashes = [
+            state.file_hashes.get(name, "") for name in PACKAGE_FILES[primary_language]
+        ]
+        return self.recall_or_compute(
+            namespace,
+            f"dependencies:{primary_language}:{','.join(package_hashes)}",
+            lambda: self.extract_dependencies(file_contents, primary_language),
+        )
+
+    @contextmanager
+    def _open_analysis_state(self, repo_id: Optional[Any]) -> Iterator[RepositoryAnalysisState]:
+        """
+        Hold the live analysis state of a repository.
+
+        States are kept by reference in an AnalysisStateStore shared with the
+        process's other agents, and loaded from the optional
+        analysis_state_dir when the store has none. Analyses of the same
+        repository wait for each other. A fresh state is used for unknown
+        repositories, when incremental analysis is disabled, or when the
+        analysis configuration changed since the state was stored.
+
+        Args:
+            repo_id: The repository identifier
+
+        Returns:
+            Context manager yielding the repository's analysis state
+        """
+        fingerprint = self._analysis_fingerprint()
+        if repo_id is None or not self.config.get("incremental_analysis", True):
+            yield RepositoryAnalysisState(fingerprint)
+            return
+
+        if self._analysis_states is None:
+            store_config = {"max_repositories": self.config.get("analysis_state_cache_size", 8)}
+            self._analysis_states = self.acquire_client(
+                "analysis_states", store_config, lambda: AnalysisStateStore(**store_config)
+            )
+
+        with self._analysis_states.open(
+            repo_id, fingerprint, lambda: self._load_analysis_state(repo_id)
+        ) as state:
+            yield state
+
+    def _load_analysis_state(self, repo_id: Any) -> Optional[RepositoryAnalysisState]:
+        """
+        Load a repository's analysis state from the optional analysis_state_dir.
+
+        Args:
+            repo_id: The repository identifier
+
+        Returns:
+            The stored state, or None if there is none
+        """
+        state_path = self._analysis_state_path(repo_id)
+        if state_path is None or not os.path.exists(state_path):
+            return None
+
+        try:
+            with open(state_path, encoding="utf-8") as state_file:
+                return RepositoryAnalysisState.from_dict(json.load(state_file))
+        except (OSError, ValueError):
+            self.logger.error("Failed to load analysis state from %s", state_path)
+            return None
+
+    def _save_analysis_state(self, repo_id: Any, state: RepositoryAnalysisState) -> None:
+        """
+        Write a changed analysis state to the analysis_state_dir, if configured.
+
+        Args:
+            repo_id: The repository identifier
+            state: The state to store
+        """
+        state_path = self._analysis_state_path(repo_id)
+        if state_path is None:
+            return
+
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+        temp_path = f"{state_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            json.dump(state.to_dict(), state_file)
+        os.replace(temp_path, state_path)
+
+    def _analysis_state_path(self, repo_id: Any) -> Optional[str]:
+        """
+        Get the file used to persist a repository's analysis state.
+
+        Args:
+            repo_id: The repository identifier
+
+        Returns:
+            The state file path, or None if analysis_state_dir is not configured
+        """
+        state_dir = self.config.get("analysis_state_dir")
+        if not state_dir:
+            return None
+
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", str(repo_id))
+        return os.path.join(state_dir, f"{safe_id}.json")
 
     def can_handle_task(self, task: Dict[str, Any]) -> bool:
         """
@@ -0,0 +1,318 @@
+"""
+Context Packer
+
+This module fills the AI insights prompt with file contents up to a token
+budget. Candidate files are cleaned of boilerplate (license headers and
+blank-line runs), near-duplicates of files already packed are skipped and
+the rest are ranked by structural importance and information density. The
+packer then takes files whole while they fit and cuts the next one at the
+token that exhausts the budget, instead of taking a fixed number of
+files cut to a fixed number of characters.
+
+Tokens are counted with tiktoken when the model's encoding is available; if
+it cannot be loaded (it is downloaded on first use), an approximate
+tokenizer with a similar token size is used so packing still works offline.
+"""
+
+import functools
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, FrozenSet, List, Mapping, Optional, Sequence
+
+# Prompt token budgets for the file snippets, by model name prefix; the
+# longest matching prefix wins
+MODEL_TOKEN_BUDGETS = {
+    "gpt-3.5-turbo": 3000,
+    "gpt-4": 6000,
+    "gpt-4-turbo": 12000,
+    "gpt-4o": 12000,
+    "gpt-4.1": 12000,
+}
+DEFAULT_TOKEN_BUDGET = 3000
+
+# Files whose snippet would be shorter than this are not cut to fit
+MIN_SNIPPET_TOKENS = 64
+
+# Files at least this similar (Jaccard index of their distinct lines) to a
+# packed file are skipped
+DUPLICATE_THRESHOLD = 0.8
+
+SNIPPET_HEADER = "File: {path}\n```\n"
+SNIPPET_FOOTER = "\n```\n"
+TRUNCATED_MARKER = "\n... [truncated]"
+
+# Leading comment lines: license headers, shebangs, encoding declarations
+_COMMENT_LINE = re.compile(r"\s*(#|//|/\*|\*|\*/|<!--|-->|--)")
+# Lines that define structure: classes, functions, routes, exports
+_DEFINITION_LINE = re.compile(
+    r"^\s*(export\s+|public\s+|private\s+|protected\s+|async\s+|static\s+|abstract\s+)*"
+    r"(class|def|function|interface|trait|struct|enum|impl|fn|func|module)\b|^\s*@\w",
+    re.MULTILINE,
+)
+_BLANK_RUN = re.compile(r"\n[ \t]*(\n[ \t]*)+\n")
+# Approximate tokens: a run of up to four word characters or one other
+# character, with the whitespace before it
+_APPROXIMATE_TOKEN = re.compile(r"\s*(?:\w{1,4}|[^\w\s])|\s+")
+
+logger = logging.getLogger("teko.context_packer")
+
+
+class _ApproximateEncoding:
+    """Lossless tokenizer splitting text into pieces about the size of BPE tokens."""
+
+    name = "approximate"
+
+    def encode(self, text: str) -> List[str]:
+        return _APPROXIMATE_TOKEN.findall(text)
+
+    def decode(self, tokens: Sequence[Any]) -> str:
+        return "".join(tokens)
+
+
+class _TiktokenEncoding:
+    """tiktoken encoding that treats special-token text in files as plain text."""
+
+    def __init__(self, encoding: Any):
+        self.name = encoding.name
+        self._encoding = encoding
+
+    def encode(self, text: str) -> List[int]:
+        tokens: List[int] = self._encoding.encode(text, disallowed_special=())
+        return tokens
+
+    def decode(self, tokens: Sequence[Any]) -> str:
+        text: str = self._encoding.decode(list(tokens))
+        return text
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(model_name: str) -> Any:
+    """
+    Get the tokenizer for a model.
+
+    Args:
+        model_name: The model name
+
+    Returns:
+        An object with encode(text) and decode(tokens) methods
+    """
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return _TiktokenEncoding(encoding)
+    except Exception as e:
+        logger.warning("Counting approximate tokens, tiktoken is unavailable: %s", e)
+        return _ApproximateEncoding()
+
+
+def token_budget(model_name: str) -> int:
+    """
+    Get the default snippet token budget for a model.
+
+    Args:
+        model_name: The model name
+
+    Returns:
+        The budget of the longest matching model name prefix, or the default
+    """
+    matches = [prefix for prefix in MODEL_TOKEN_BUDGETS if model_name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_TOKEN_BUDGET
+    return MODEL_TOKEN_BUDGETS[max(matches, key=len)]
+
+
+def strip_boilerplate(content: str) -> str:
+    """
+    Remove the leading comment block and collapse runs of blank lines.
+
+    Args:
+        content: File contents
+
+    Returns:
+        The contents without the header and with single blank lines
+    """
+    lines = content.split("\n")
+    start = 0
+    in_block = False
+    while start < len(lines):
+        line = lines[start]
+        if in_block:
+            if "*/" in line:
+                in_block = False
+        elif not line.strip():
+            pass
+        elif _COMMENT_LINE.match(line):
+            in_block = line.lstrip().startswith("/*") and "*/" not in line
+        else:
+            break
+        start += 1
+    return _BLANK_RUN.sub("\n\n", "\n".join(lines[start:])).strip("\n")
+
+
+@dataclass
+class _Candidate:
+    """A file considered for the prompt."""
+
+    path: str
+    text: str
+    # The text was cut before tokenizing
+    cut: bool
+    tokens: List[Any]
+    # Tokens of the snippet's header and footer
+    overhead: int
+    lines: FrozenSet[int]
+    score: float
+
+
+@dataclass
+class PackedContext:
+    """The snippets chosen for a prompt and what they cost."""
+
+    snippets: List[str]
+    paths: List[str]
+    tokens: int
+    budget: int
+    skipped_duplicates: int = 0
+
+    @property
+    def text(self) -> str:
+        """The snippets as prompt text."""
+        return "".join(self.snippets)
+
+
+class ContextPacker:
+    """
+    Packs ranked, deduplicated file snippets into a token budget.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        encoding: Any,
+        max_file_share: float = 0.5,
+        duplicate_threshold: float = DUPLICATE_THRESHOLD,
+    ):
+        """
+        Initialize the packer.
+
+        Args:
+            budget: Maximum number of tokens of all snippets together
+            encoding: Tokenizer with encode(text) and decode(tokens) methods
+            max_file_share: Largest fraction of the budget one file may use
+                while other candidates are waiting
+            duplicate_threshold: Files at least this similar to a packed file
+                are skipped
+        """
+        self.budget = budget
+        self.encoding = encoding
+        self.max_file_tokens = max(MIN_SNIPPET_TOKENS, int(budget * max_file_share))
+        self.duplicate_threshold = duplicate_threshold
+
+    def pack(
+        self, file_contents: Mapping[str, str], priority_paths: Sequence[str] = ()
+    ) -> PackedContext:
+        """
+        Choose and cut file snippets to fill the budget.
+
+        Args:
+            file_contents: Candidate files, mapping path to contents, in the
+                order they were selected
+            priority_paths: Candidates matching the language's well-known
+                entry points and configuration files, most important first
+
+        Returns:
+            The packed context
+        """
+        ranks = {path: rank for rank, path in enumerate(priority_paths)}
+        candidates: List[_Candidate] = []
+        for path, content in file_contents.items():
+            candidate = self._candidate(path, content, ranks.get(path))
+            if candidate is not None:
+                candidates.append(candidate)
+        candidates.sort(key=lambda candidate: candidate.score, reverse=True)
+
+        # Tokens each later candidate needs if it is packed within its share
+        reserved = [0] * (len(candidates) + 1)
+        for index in range(len(candidates) - 1, -1, -1):
+            candidate = candidates[index]
+            share = min(len(candidate.tokens), self.max_file_tokens) + candidate.overhead
+            reserved[index] = reserved[index + 1] + share
+
+        marker = self._count(TRUNCATED_MARKER)
+        packed = PackedContext([], [], 0, self.budget)
+        packed_lines: List[FrozenSet[int]] = []
+        for index, candidate in enumerate(candidates):
+            if any(self._similar(candidate.lines, lines) for lines in packed_lines):
+                packed.skipped_duplicates += 1
+                continue
+
+            remaining = self.budget - packed.tokens - candidate.overhead
+            if remaining < MIN_SNIPPET_TOKENS:
+                continue
+
+            # Cut the file only as far as needed to leave the later ones their share
+            limit = min(remaining, max(self.max_file_tokens, remaining - reserved[index + 1]))
+            text = candidate.text
+            snippet_tokens = len(candidate.tokens)
+            if snippet_tokens > limit or candidate.cut:
+                snippet_tokens = min(snippet_tokens + marker, limit)
+                text = self.encoding.decode(candidate.tokens[: snippet_tokens - marker])
+                text += TRUNCATED_MARKER
+
+            packed.snippets.append(
+                SNIPPET_HEADER.format(path=candidate.path) + text + SNIPPET_FOOTER
+            )
+            packed.paths.append(candidate.path)
+            packed.tokens += candidate.overhead + snippet_tokens
+            packed_lines.append(candidate.lines)
+
+        # Pieces are counted separately; tokens merging across their
+        # boundaries can only make the prompt a few tokens shorter
+        packed.tokens = self._count(packed.text)
+        return packed
+
+    def _candidate(self, path: str, content: str, rank: Optional[int]) -> Optional[_Candidate]:
+        """Clean, tokenize and score a file, or None if nothing is left of it."""
+        text = strip_boilerplate(content)
+        if not text.strip():
+            return None
+
+        # Characters per token rarely exceed eight; never tokenize more than can be used
+        cut = len(text) > self.budget * 8
+        if cut:
+            text = text[: self.budget * 8]
+        tokens = self.encoding.encode(text)
+        lines = frozenset(
+            int.from_bytes(hashlib.blake2b(line.encode(), digest_size=8).digest(), "big")
+            for line in (line.strip() for line in text.splitlines())
+            if line
+        )
+        overhead = self._count(SNIPPET_HEADER.format(path=path)) + self._count(SNIPPET_FOOTER)
+
+        # Scored on the part that can make it into the prompt: distinct tokens
+        # per token, definitions per line and the rank of priority files
+        window = tokens[: self.max_file_tokens]
+        density = len(set(window)) / len(window)
+        head = text[: self.max_file_tokens * 8]
+        definitions = len(_DEFINITION_LINE.findall(head))
+        structure = min(1.0, 5.0 * definitions / (head.count("\n") + 1))
+        importance = 0.0 if rank is None else 1.0 + 1.0 / (rank + 1)
+        score = importance + density + structure
+        return _Candidate(path, text, cut, tokens, overhead, lines, score)
+
+    def _similar(self, lines: FrozenSet[int], other: FrozenSet[int]) -> bool:
+        """Check whether two files' distinct lines overlap beyond the duplicate threshold."""
+        if not lines or not other:
+            return False
+        shared = len(lines & other)
+        return shared / (len(lines) + len(other) - shared) >= self.duplicate_threshold
+
+    def _count(self, text: str) -> int:
+        """Count the tokens of a text."""
+        return len(self.encoding.encode(text))
@@ -0,0 +1,238 @@
+"""
+File Scanner
+
+This module holds the per-file analyzers used by the CodebaseAnalysisAgent:
+language classification by file name and framework pattern matching. A
+FileScanner turns one file into a FileRecord; a ParallelFileScanner shards
+the files across a process pool, runs a FileScanner in every worker and
+returns the records in input order. Records are pure per-file results, so
+folding them into a RepositoryAnalysisState gives the same aggregates
+whether they were produced sequentially or in parallel.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from agents.implementations.analysis_state import content_hash
+from agents.implementations.framework_matcher import FrameworkMatcher
+from agents.implementations.language_index import LanguageIndex
+from agents.implementations.repository_reader import DEFAULT_MAX_FILE_BYTES, read_text_file
+
+
+class FileRecord(NamedTuple):
+    """Analysis results of a single file."""
+
+    path: str
+    language: Optional[str]
+    # None if the contents were not available (not given, binary or too large)
+    file_hash: Optional[str]
+    # None if the contents were not scanned because their hash was unchanged
+    framework_hits: Optional[Dict[str, Dict[str, int]]]
+
+
+class FileScanner:
+    """
+    Runs the language and framework analyzers on individual files.
+    """
+
+    def __init__(
+        self,
+        language_extensions: Dict[str, List[str]],
+        framework_patterns: Dict[str, Dict[str, List[str]]],
+        language_filenames: Optional[Dict[str, List[str]]] = None,
+    ):
+        """
+        Initialize the scanner.
+
+        Args:
+            language_extensions: Mapping of language to file extensions
+            framework_patterns: Mapping of language to framework to regex patterns
+            language_filenames: Mapping of language to extensionless file names
+        """
+        self.languages = LanguageIndex(language_extensions, language_filenames)
+        self.matcher = FrameworkMatcher(framework_patterns)
+
+    def detect_language(self, path: str) -> Optional[str]:
+        """
+        Classify a single path by its file name or extension.
+
+        Args:
+            path: The file path
+
+        Returns:
+            The language the path belongs to, or None if unknown
+        """
+        return self.languages.detect(path)
+
+    def scan(
+        self, path: str, content: Optional[str], file_hash: Optional[str] = None
+    ) -> FileRecord:
+        """
+        Analyze a file whose contents are already in memory.
+
+        Args:
+            path: The file path
+            content: The file contents, or None to classify the path only
+            file_hash: Optional precomputed content hash
+
+        Returns:
+            The file's record
+        """
+        language = self.detect_language(path)
+        if content is None:
+            return FileRecord(path, language, None, None)
+
+        file_hash = file_hash or content_hash(content)
+        return FileRecord(path, language, file_hash, self.matcher.match(content))
+
+    def scan_file(
+        self,
+        root: str,
+        path: str,
+        previous_hash: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    ) -> FileRecord:
+        """
+        Read and analyze a file from a repository checkout.
+
+        Args:
+            root: The repository checkout directory
+            path: The file path relative to root
+            previous_hash: Hash from the previous analysis; matching is skipped
+                if the contents still have this hash
+            max_bytes: Files larger than this are not read
+
+        Returns:
+            The file's record
+        """
+        language = self.detect_language(path)
+        content = read_text_file(os.path.join(root, path), max_bytes)
+        if content is None:
+            return FileRecord(path, language, None, None)
+
+        file_hash = content_hash(content)
+        if file_hash == previous_hash:
+            return FileRecord(path, language, file_hash, None)
+        return FileRecord(path, language, file_hash, self.matcher.match(content))
+
+
+# Scanner of the current pool worker process, built once by _init_worker()
+_worker_scanner: Optional[FileScanner] = None
+
+
+def _init_worker(
+    language_extensions: Dict[str, List[str]],
+    framework_patterns: Dict[str, Dict[str, List[str]]],
+    language_filenames: Optional[Dict[str, List[str]]],
+) -> None:
+    """Build the worker's scanner so tables are compiled once per process."""
+    global _worker_scanner
+    _worker_scanner = FileScanner(language_extensions, framework_patterns, language_filenames)
+
+
+def _get_worker_scanner() -> FileScanner:
+    """Get the scanner built by the pool initializer."""
+    if _worker_scanner is None:
+        raise RuntimeError("File scanner worker was not initialized")
+    return _worker_scanner
+
+
+def _scan_shard(items: List[Tuple[str, Optional[str], Optional[str]]]) -> List[FileRecord]:
+    """Worker body: analyze a shard of in-memory files."""
+    scanner = _get_worker_scanner()
+    return [scanner.scan(path, content, file_hash) for path, content, file_hash in items]
+
+
+def _scan_file_shard(
+    root: str, max_bytes: int, items: List[Tuple[str, Optional[str]]]
+) -> List[FileRecord]:
+    """Worker body: read and analyze a shard of checkout files."""
+    scanner = _get_worker_scanner()
+    return [
+        scanner.scan_file(root, path, previous_hash, max_bytes) for path, previous_hash in items
+    ]
+
+
+class ParallelFileScanner:
+    """
+    Process pool running FileScanners over shards of a file set.
+
+    Each shard is analyzed in a worker process and the per-shard record lists
+    are concatenated in input order, so the result equals running a
+    FileScanner over every file sequentially.
+    """
+
+    def __init__(
+        self,
+        language_extensions: Dict[str, List[str]],
+        framework_patterns: Dict[str, Dict[str, List[str]]],
+        workers: int,
+        shards_per_worker: int = 4,
+        language_filenames: Optional[Dict[str, List[str]]] = None,
+    ):
+        """
+        Start the worker pool.
+
+        Args:
+            language_extensions: Mapping of language to file extensions
+            framework_patterns: Mapping of language to framework to regex patterns
+            workers: Number of worker processes
+            shards_per_worker: Number of shards per worker, so that uneven
+                shards are balanced across the pool
+            language_filenames: Mapping of language to extensionless file names
+        """
+        self.workers = workers
+        self.shards_per_worker = shards_per_worker
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(language_extensions, framework_patterns, language_filenames),
+        )
+
+    def scan(self, items: List[Tuple[str, Optional[str], Optional[str]]]) -> List[FileRecord]:
+        """
+        Analyze in-memory files in parallel.
+
+        Args:
+            items: List of (path, contents or None, precomputed hash or None)
+
+        Returns:
+            Records in the order of items
+        """
+        return self._map(_scan_shard, items)
+
+    def scan_files(
+        self,
+        root: str,
+        items: List[Tuple[str, Optional[str]]],
+        max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    ) -> List[FileRecord]:
+        """
+        Read and analyze checkout files in parallel.
+
+        Args:
+            root: The repository checkout directory
+            items: List of (path relative to root, previous hash or None)
+            max_bytes: Files larger than this are not read
+
+        Returns:
+            Records in the order of items
+        """
+        return self._map(_scan_file_shard, items, root, max_bytes)
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=True)
+
+    def _map(self, function, items: list, *args) -> List[FileRecord]:
+        """Run function over shards of items and concatenate the results in order."""
+        shard_size = max(1, math.ceil(len(items) / (self.workers * self.shards_per_worker)))
+        shards = [items[i : i + shard_size] for i in range(0, len(items), shard_size)]
+        futures = [self._executor.submit(function, *args, shard) for shard in shards]
+
+        records: List[FileRecord] = []
+        for future in futures:
+            records.extend(future.result())
+        return records
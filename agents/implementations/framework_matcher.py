@@ -0,0 +1,154 @@
+"""
+Framework Pattern Matcher
+
+This module compiles the CodebaseAnalysisAgent's framework detection patterns
+once into a matcher that checks every pattern against a file without
+recompiling or re-looking-up regexes per file.
+
+A single alternation of all patterns is not used: CPython's re engine loses
+its literal fast-search on large alternations and scans several times slower
+than the individual searches. Instead the file is lowercased once, plain
+literal patterns are checked with substring search, and real regexes only
+run when the literal fragments they require are present in the file.
+"""
+
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# Characters with a special meaning in regular expressions
+_REGEX_METACHARACTERS = frozenset(".^$*+?{}[]|()\\")
+
+# Splits a regex into the literal runs between escapes and metacharacters
+_LITERAL_SPLIT = re.compile(r"\\.|[.^$*+?{}\[\]|()]")
+
+# Escapes of letters and digits (\x41, \u00e9, \1, \d, ...), which stand for
+# something other than the escaped character itself
+_NON_PUNCTUATION_ESCAPE = re.compile(r"\\[0-9A-Za-z]")
+
+
+def _required_literals(pattern: str) -> Optional[List[str]]:
+    """
+    Extract literal fragments that must appear in any text the pattern matches.
+
+    Args:
+        pattern: A regular expression
+
+    Returns:
+        Lowercased required fragments, or None if they cannot be determined
+        safely (alternation, optional quantifiers, character classes or
+        escapes other than of punctuation)
+    """
+    if any(char in pattern for char in "|?*{["):
+        return None
+    # Matches an escaped backslash followed by a letter too, which is safe
+    # but rare enough to not be worth telling apart
+    if _NON_PUNCTUATION_ESCAPE.search(pattern):
+        return None
+
+    fragments = [fragment.lower() for fragment in _LITERAL_SPLIT.split(pattern) if fragment]
+    return fragments or None
+
+
+class _PatternCheck:
+    """A single compiled pattern with its ASCII fast path."""
+
+    __slots__ = ("regex", "literal", "prefilter")
+
+    def __init__(self, pattern: str):
+        self.regex: Pattern[str] = re.compile(pattern, re.IGNORECASE)
+        self.literal: Optional[str] = None
+        self.prefilter: Optional[List[str]] = None
+
+        if pattern.isascii() and not _REGEX_METACHARACTERS.intersection(pattern):
+            self.literal = pattern.lower()
+        elif pattern.isascii():
+            self.prefilter = _required_literals(pattern)
+
+    def matches(self, content: str, lowered: Optional[str]) -> bool:
+        """
+        Check whether the pattern occurs in the content.
+
+        Args:
+            content: The file contents
+            lowered: The lowercased contents if the file is ASCII, else None
+
+        Returns:
+            True if the pattern matches anywhere in the content
+        """
+        if lowered is not None:
+            if self.literal is not None:
+                return self.literal in lowered
+            if self.prefilter is not None and not all(
+                fragment in lowered for fragment in self.prefilter
+            ):
+                return False
+        return self.regex.search(content) is not None
+
+
+class FrameworkMatcher:
+    """
+    Precompiled matcher for framework detection patterns.
+
+    Counts, per language and framework, how many of the framework's patterns
+    occur in a file, exactly like searching each pattern case-insensitively.
+    """
+
+    def __init__(self, framework_patterns: Dict[str, Dict[str, List[str]]]):
+        """
+        Compile the framework patterns.
+
+        Args:
+            framework_patterns: Mapping of language to framework to regex patterns
+        """
+        self._checks: List[_PatternCheck] = []
+        self._owners: List[List[Tuple[str, str]]] = []
+        self._checks_by_language: Dict[str, List[int]] = {}
+
+        # Patterns shared by several frameworks are only evaluated once
+        check_ids: Dict[str, int] = {}
+        for language, frameworks in framework_patterns.items():
+            language_checks = self._checks_by_language.setdefault(language, [])
+            for framework, patterns in frameworks.items():
+                for pattern in patterns:
+                    if pattern not in check_ids:
+                        check_ids[pattern] = len(self._checks)
+                        self._checks.append(_PatternCheck(pattern))
+                        self._owners.append([])
+
+                    check_id = check_ids[pattern]
+                    self._owners[check_id].append((language, framework))
+                    if check_id not in language_checks:
+                        language_checks.append(check_id)
+
+        self._all_checks = list(range(len(self._checks)))
+
+    def match(self, content: str, language: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Count matched framework patterns in one file.
+
+        Args:
+            content: The file contents
+            language: Only check this language's patterns, or None for all
+
+        Returns:
+            Dictionary mapping language to framework to number of matched patterns
+        """
+        if language is None:
+            check_ids = self._all_checks
+        else:
+            check_ids = self._checks_by_language.get(language, [])
+
+        lowered = content.lower() if content.isascii() else None
+
+        hits: Dict[str, Dict[str, int]] = {}
+        for check_id in check_ids:
+            if not self._checks[check_id].matches(content, lowered):
+                continue
+
+            for owner_language, framework in self._owners[check_id]:
+                if language is not None and owner_language != language:
+                    continue
+                frameworks = hits.setdefault(owner_language, {})
+                frameworks[framework] = frameworks.get(framework, 0) + 1
+
+        return hits
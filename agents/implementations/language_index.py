@@ -0,0 +1,114 @@
+"""
+Language Index
+
+This module builds the reverse lookup table used to classify file paths by
+language. Instead of scanning every language's extension list for every
+path, extensions and well-known file names are indexed once, so a path is
+classified with a dictionary probe per candidate suffix; for ordinary file
+names that is a single probe.
+"""
+
+from typing import Dict, Iterable, Mapping, Optional
+
+# Last character of the text before a final dot that means the dot does not
+# start an extension: no file name, a hidden file (".bashrc") or a dot run
+_NOT_A_STEM = ("", "/", ".")
+
+
+class LanguageIndex:
+    """
+    Reverse index from file extensions and file names to languages.
+
+    Extensions may be compound (".d.ts", ".blade.php"); the longest indexed
+    suffix of a file name wins. Names without an extension, such as
+    Dockerfile, are looked up by their full file name. Matching is case
+    insensitive. When an extension is listed for several languages, the
+    first language in the mapping wins.
+    """
+
+    def __init__(
+        self,
+        language_extensions: Mapping[str, Iterable[str]],
+        language_filenames: Optional[Mapping[str, Iterable[str]]] = None,
+    ):
+        """
+        Build the index.
+
+        Args:
+            language_extensions: Mapping of language to file extensions,
+                each starting with a dot
+            language_filenames: Mapping of language to exact file names
+        """
+        self._extensions: Dict[str, str] = {}
+        for language, extensions in language_extensions.items():
+            for extension in extensions:
+                self._extensions.setdefault(extension.lower(), language)
+
+        self._filenames: Dict[str, str] = {}
+        for language, filenames in (language_filenames or {}).items():
+            for filename in filenames:
+                self._filenames.setdefault(filename.lower(), language)
+
+        # Number of dot-separated parts in the longest indexed extension
+        self._max_parts = max((ext.count(".") for ext in self._extensions), default=1)
+
+        # Final extensions (without the dot) that decide the language on their
+        # own: not the tail of a compound extension or of a dotted file name
+        longer_names = [ext for ext in self._extensions if ext.count(".") > 1]
+        longer_names += [name for name in self._filenames if "." in name]
+        self._simple_extensions = {
+            ext[1:]: language
+            for ext, language in self._extensions.items()
+            if ext.count(".") == 1 and not any(name.endswith(ext) for name in longer_names)
+        }
+
+        # Every final extension that some extension or file name ends with
+        self._final_extensions = frozenset(
+            name.rpartition(".")[2] for name in [*self._extensions, *self._filenames] if "." in name
+        )
+
+    def detect(self, path: str) -> Optional[str]:
+        """
+        Classify a path.
+
+        Args:
+            path: The file path, using "/" separators
+
+        Returns:
+            The language of the path, or None if unknown
+        """
+        # Fast paths: a single probe for ordinary "name.ext" paths, with a known
+        # or with an unknown extension
+        head, _, ext = path.rpartition(".")
+        language = self._simple_extensions.get(ext)
+        if language is not None:
+            if head[-1:] not in _NOT_A_STEM:
+                return language
+        elif head and "/" not in ext and ext.lower() not in self._final_extensions:
+            return None
+
+        return self._detect_name(path.rpartition("/")[2].lower())
+
+    def _detect_name(self, name: str) -> Optional[str]:
+        """Classify a lowercased file name by exact name or longest extension."""
+        language = self._filenames.get(name)
+        if language is not None:
+            return language
+
+        # Leading dots mark hidden files, not extensions (".bashrc")
+        stem_start = len(name) - len(name.lstrip("."))
+        dot = name.rfind(".")
+        if dot <= stem_start:
+            return None
+
+        language = self._extensions.get(name[dot:])
+        if self._max_parts == 1:
+            return language
+
+        # Prefer longer compound extensions over the final extension
+        for _ in range(self._max_parts - 1):
+            dot = name.rfind(".", stem_start + 1, dot)
+            if dot == -1:
+                break
+            language = self._extensions.get(name[dot:], language)
+        return language
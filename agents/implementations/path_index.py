@@ -0,0 +1,255 @@
+"""
+Path Index
+
+This module indexes a repository's file paths for choosing representative
+files. Paths are bucketed by language, kept sorted so that the files under
+a directory form one contiguous run, and sorted by file name; directories
+are indexed by their last segment. Finding the files of a language or the
+first file matching a pattern such as "app/Http/Controllers" or
+"settings.py" then takes a few binary searches instead of a scan of every
+path. An index is never modified; updated() derives the index of a changed
+path set from it without rebuilding what did not change.
+"""
+
+import bisect
+import copy
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+
+class PathIndex:
+    """
+    Read-only index of file paths by language, file name and directory.
+
+    A pattern matches a path when it occurs in the path starting at a
+    segment boundary: "config" matches "config/app.php" and "config.py",
+    "src/App" matches "src/App.js", but "config" does not match
+    "app_config.py".
+    """
+
+    def __init__(self, path_languages: Iterable[Tuple[str, Optional[str]]] = ()):
+        """
+        Build the index. Paths without a language are not indexed.
+
+        Args:
+            path_languages: Pairs of "/"-separated relative path and its language
+        """
+        self._languages: Dict[str, str] = {}
+        # Ordered sets (dicts with None values) keep the order paths were added
+        self._by_language: Dict[str, Dict[str, None]] = {}
+        for path, language in path_languages:
+            if language is not None:
+                self._languages[path] = language
+                bucket = self._by_language.get(language)
+                if bucket is None:
+                    bucket = self._by_language[language] = {}
+                bucket[path] = None
+
+        # The files under a directory are a contiguous run of the sorted paths
+        self._paths = sorted(self._languages)
+
+        # File names, sorted, with the path of each; equal names in path order
+        names = [path[path.rfind("/") + 1 :] for path in self._paths]
+        order = sorted(range(len(names)), key=names.__getitem__)
+        self._names = [names[i] for i in order]
+        self._named_paths = [self._paths[i] for i in order]
+
+        # Every directory, and the directories by their last segment
+        self._directories: Dict[str, None] = {}
+        self._directories_by_segment: Dict[str, List[str]] = {}
+        self._segments: List[str] = []
+        previous = None
+        for path in self._paths:
+            directory = _parent(path)
+            if directory != previous:
+                self._add_directory(directory)
+                previous = directory
+        self._segments.sort()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def updated(
+        self,
+        path_languages: Mapping[str, Optional[str]],
+        changed_paths: Optional[Iterable[str]] = None,
+    ) -> "PathIndex":
+        """
+        Derive the index of a changed path set.
+
+        Only the added, reclassified and removed paths are indexed again;
+        this index itself is left unchanged.
+
+        Args:
+            path_languages: Mapping of every current path to its language
+            changed_paths: The paths that may have changed, if known; every
+                path is compared otherwise
+
+        Returns:
+            The index of path_languages, or this index if nothing changed
+        """
+        added: List[Tuple[str, str]] = []
+        removed: List[str] = []
+        if changed_paths is not None:
+            for path in changed_paths:
+                self._compare(path, path_languages.get(path), added, removed)
+        else:
+            kept = 0
+            for path, language in path_languages.items():
+                kept += self._compare(path, language, added, removed)
+            if kept + len(removed) < len(self._languages):
+                removed.extend(path for path in self._languages if path not in path_languages)
+        if not added and not removed:
+            return self
+
+        index = copy.copy(self)
+        index._languages = dict(self._languages)
+        index._by_language = {
+            language: dict(paths) for language, paths in self._by_language.items()
+        }
+        index._paths = list(self._paths)
+        index._names = list(self._names)
+        index._named_paths = list(self._named_paths)
+        index._directories = dict(self._directories)
+        index._directories_by_segment = {
+            segment: list(directories)
+            for segment, directories in self._directories_by_segment.items()
+        }
+        index._segments = list(self._segments)
+
+        for path in removed:
+            index._remove(path)
+        for path, language in added:
+            index._add(path, language)
+        return index
+
+    def _compare(
+        self,
+        path: str,
+        language: Optional[str],
+        added: List[Tuple[str, str]],
+        removed: List[str],
+    ) -> bool:
+        """Collect how a path changed; returns whether it is indexed and unchanged."""
+        previous = self._languages.get(path)
+        if previous == language:
+            return language is not None
+        if previous is not None:
+            removed.append(path)
+        if language is not None:
+            added.append((path, language))
+        return False
+
+    def files(self, language: str) -> Iterator[str]:
+        """
+        Iterate over the files of a language.
+
+        Args:
+            language: The language
+
+        Returns:
+            Iterator over the paths, in the order they were indexed
+        """
+        return iter(self._by_language.get(language, ()))
+
+    def first_match(
+        self, pattern: str, language: str, accept: Callable[[str], bool] = lambda path: True
+    ) -> Optional[str]:
+        """
+        Find a file of a language matching a pattern.
+
+        Args:
+            pattern: "/"-separated pattern, e.g. "app/Http/Controllers" or "urls.py"
+            language: The language the file must have
+            accept: Further condition the file must meet
+
+        Returns:
+            The first accepted match, file name matches before directory
+            matches and each in path order, or None
+        """
+        language_files = self._by_language.get(language)
+        pattern = pattern.strip("/")
+        if not language_files or not pattern:
+            return None
+        for path in self._candidates(pattern):
+            if path in language_files and accept(path):
+                return path
+        return None
+
+    def _candidates(self, pattern: str) -> Iterator[str]:
+        """Iterate over the paths matching a pattern, of any language."""
+        *whole, last = pattern.split("/")
+        if not whole:
+            # A file name or a directory segment starting with the pattern
+            index = bisect.bisect_left(self._names, last)
+            while index < len(self._names) and self._names[index].startswith(last):
+                yield self._named_paths[index]
+                index += 1
+
+            for segment in _with_prefix(self._segments, last):
+                for directory in self._directories_by_segment[segment]:
+                    yield from _with_prefix(self._paths, directory + "/")
+            return
+
+        # A directory ending in the whole segments, then a name or segment
+        # starting with the last one
+        parent = "/" + "/".join(whole)
+        for directory in self._directories_by_segment.get(whole[-1], ()):
+            if ("/" + directory).endswith(parent):
+                yield from _with_prefix(self._paths, f"{directory}/{last}")
+
+    def _add(self, path: str, language: str) -> None:
+        """Index a path. Only called on a new index, see updated()."""
+        self._languages[path] = language
+        self._by_language.setdefault(language, {})[path] = None
+        bisect.insort(self._paths, path)
+
+        position = self._name_position(path)
+        self._names.insert(position, path[path.rfind("/") + 1 :])
+        self._named_paths.insert(position, path)
+        self._add_directory(_parent(path), keep_sorted=True)
+
+    def _remove(self, path: str) -> None:
+        """Forget a path. Only called on a new index, see updated()."""
+        language = self._languages.pop(path)
+        del self._by_language[language][path]
+        del self._paths[bisect.bisect_left(self._paths, path)]
+
+        position = self._name_position(path)
+        del self._names[position]
+        del self._named_paths[position]
+        # Directories left empty match no paths and are kept
+
+    def _name_position(self, path: str) -> int:
+        """Find where a path is, or belongs, in the name-sorted lists."""
+        name = path[path.rfind("/") + 1 :]
+        start = bisect.bisect_left(self._names, name)
+        end = bisect.bisect_right(self._names, name, start)
+        return bisect.bisect_left(self._named_paths, path, start, end)
+
+    def _add_directory(self, directory: str, keep_sorted: bool = False) -> None:
+        """Index a directory and its ancestors."""
+        while directory and directory not in self._directories:
+            self._directories[directory] = None
+            segment = directory[directory.rfind("/") + 1 :]
+            directories = self._directories_by_segment.get(segment)
+            if directories is None:
+                directories = self._directories_by_segment[segment] = []
+                if keep_sorted:
+                    bisect.insort(self._segments, segment)
+                else:
+                    self._segments.append(segment)
+            directories.append(directory)
+            directory = _parent(directory)
+
+
+def _parent(path: str) -> str:
+    """Get the directory of a path, "" for top-level paths."""
+    return path[: path.rfind("/")] if "/" in path else ""
+
+
+def _with_prefix(keys: List[str], prefix: str) -> Iterator[str]:
+    """Iterate over the sorted keys starting with a prefix."""
+    index = bisect.bisect_left(keys, prefix)
+    while index < len(keys) and keys[index].startswith(prefix):
+        yield keys[index]
+        index += 1
@@ -0,0 +1,146 @@
+"""
+Repository Reader
+
+This module walks a local repository checkout lazily so analyzers can
+consume files one at a time instead of holding the whole repository's text
+in memory. Paths are yielded as they are discovered and file contents are
+only read when requested.
+"""
+
+import os
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+# Version control metadata directories skipped while walking a checkout
+DEFAULT_IGNORED_DIRS = frozenset({".git", ".hg", ".svn"})
+
+# Files larger than this are classified by path but their contents are not read
+DEFAULT_MAX_FILE_BYTES = 1024 * 1024
+
+# Number of leading bytes checked for NUL bytes to detect binary files
+_BINARY_SNIFF_BYTES = 8192
+
+
+def iter_repository_paths(
+    root: str, ignored_dirs: Iterable[str] = DEFAULT_IGNORED_DIRS
+) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Walk a checkout and yield every regular file.
+
+    Args:
+        root: The repository checkout directory
+        ignored_dirs: Directory names that are not descended into
+
+    Yields:
+        Tuples of (path relative to root using "/" separators, stat result)
+    """
+    ignored = frozenset(ignored_dirs)
+    pending = [""]
+    while pending:
+        relative_dir = pending.pop()
+        try:
+            entries = os.scandir(os.path.join(root, relative_dir))
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in ignored:
+                            pending.append(relative_path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield relative_path, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+
+def read_text_file(path: str, max_bytes: int = DEFAULT_MAX_FILE_BYTES) -> Optional[str]:
+    """
+    Read a file as text if it is small enough and not binary.
+
+    Args:
+        path: Absolute path of the file
+        max_bytes: Files larger than this are not read
+
+    Returns:
+        The decoded contents, or None for large, binary or unreadable files
+    """
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read(max_bytes + 1)
+    except OSError:
+        return None
+
+    if len(data) > max_bytes or b"\0" in data[:_BINARY_SNIFF_BYTES]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def file_signature(stat: os.stat_result) -> str:
+    """
+    Build a cheap change signature from a file's size and modification time.
+
+    Args:
+        stat: The file's stat result
+
+    Returns:
+        Signature string that changes whenever the file is rewritten
+    """
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class LazyFileContents(Mapping[str, str]):
+    """
+    Read-only mapping of repository paths to contents, read on access.
+
+    Lets code written for a file_contents dictionary select a few files from
+    a checkout without loading the others. Recently read files are kept in a
+    small cache so repeated lookups do not hit the disk again.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        paths: Iterable[str],
+        max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+        cache_size: int = 16,
+        reader: Callable[[str, int], Optional[str]] = read_text_file,
+    ):
+        """
+        Initialize the mapping.
+
+        Args:
+            root: The repository checkout directory
+            paths: Relative paths of the readable text files
+            max_bytes: Maximum size of a file to read
+            cache_size: Number of recently read files kept in memory
+            reader: Function used to read a file's text
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self._paths = list(paths)
+        self._path_set = frozenset(self._paths)
+        self._cache: Dict[str, str] = {}
+        self._cache_size = cache_size
+        self._reader = reader
+
+    def __getitem__(self, path: str) -> str:
+        if path not in self._path_set:
+            raise KeyError(path)
+
+        if path not in self._cache:
+            content = self._reader(os.path.join(self.root, path), self.max_bytes)
+            if len(self._cache) >= self._cache_size:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[path] = content if content is not None else ""
+        return self._cache[path]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._path_set
@@ -0,0 +1,64 @@
+"""Unit tests for the analysis state store."""
+
+import threading
+import time
+
+from agents.implementations.analysis_state import AnalysisStateStore, RepositoryAnalysisState
+
+
+class TestAnalysisStateStore:
+    """Test class for the AnalysisStateStore."""
+
+    def test_hands_out_live_state_by_fingerprint(self):
+        """Test that states are shared by reference and reloaded for a new fingerprint."""
+        store = AnalysisStateStore()
+        loads = []
+
+        def load():
+            loads.append(1)
+            return None
+
+        with store.open("repo", "v1", load) as state:
+            state.set_path("a.py", "python")
+        with store.open("repo", "v1", load) as again:
+            assert again is state
+        with store.open("repo", "v2", load) as other:
+            assert other is not state and other.path_languages == {}
+
+        assert len(loads) == 2
+
+    def test_serializes_analyses_of_a_repository(self):
+        """Test that a second analysis of a repository waits for the first."""
+        store = AnalysisStateStore()
+        events = []
+        entered = threading.Event()
+
+        def first():
+            with store.open("repo", "v1", lambda: None):
+                entered.set()
+                time.sleep(0.05)
+                events.append("first")
+
+        thread = threading.Thread(target=first)
+        thread.start()
+        entered.wait()
+        with store.open("repo", "v1", lambda: None):
+            events.append("second")
+        with store.open("other", "v1", lambda: None):
+            pass
+        thread.join()
+
+        assert events == ["first", "second"]
+
+    def test_evicts_least_recently_used_repositories(self):
+        """Test that only max_repositories states are kept."""
+        store = AnalysisStateStore(max_repositories=2)
+        for repo_id in ("a", "b", "a", "c"):
+            with store.open(repo_id, "v1", lambda: None) as state:
+                state.set_path(f"{repo_id}.py", "python")
+
+        with store.open("a", "v1", lambda: None) as state:
+            assert "a.py" in state.path_languages
+        loaded = RepositoryAnalysisState("v1")
+        with store.open("b", "v1", lambda: loaded) as state:
+            assert state is loaded
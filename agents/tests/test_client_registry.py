@@ -0,0 +1,42 @@
+"""Unit tests for the client registry."""
+
+from unittest.mock import MagicMock
+
+from agents.core.client_registry import ClientRegistry
+
+
+class TestClientRegistry:
+    """Test class for the ClientRegistry."""
+
+    def test_shares_clients_by_configuration(self):
+        """Test that equal configurations share one client, closed after the last release."""
+        registry = ClientRegistry()
+        factory = MagicMock(side_effect=lambda: MagicMock())
+
+        first = registry.acquire("chat", {"model": "a", "temperature": 0.1}, factory)
+        second = registry.acquire("chat", {"temperature": 0.1, "model": "a"}, factory)
+        other = registry.acquire("chat", {"model": "b", "temperature": 0.1}, factory)
+
+        assert first is second and first is not other
+        assert factory.call_count == 2
+
+        registry.release(first)
+        first.close.assert_not_called()
+        registry.release(second)
+        first.close.assert_called_once()
+        assert registry.stats() == {"chat": 1}
+
+        registry.close_all()
+        other.close.assert_called_once()
+        assert registry.stats() == {}
+
+    def test_unshared_registry_builds_a_client_per_acquire(self):
+        """Test that shared=False gives every acquirer its own client."""
+        registry = ClientRegistry(shared=False)
+        factory = MagicMock(side_effect=lambda: MagicMock())
+
+        first = registry.acquire("chat", {"model": "a"}, factory)
+        second = registry.acquire("chat", {"model": "a"}, factory)
+
+        assert first is not second
+        assert registry.stats() == {"chat": 2}
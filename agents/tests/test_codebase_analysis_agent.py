@@ -1,9 +1,13 @@
 """Unit tests for the Codebase Analysis Agent."""
 
+import asyncio
 import os  # noqa: F401 - Used in patch decorator
-from unittest.mock import MagicMock, patch
+import pickle
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from agents.core.orchestrator import Orchestrator
 from agents.implementations.codebase_analysis_agent import CodebaseAnalysisAgent
+from agents.implementations.path_index import PathIndex
 
 
 class TestCodebaseAnalysisAgent:
@@ -58,6 +62,20 @@ class TestCodebaseAnalysisAgent:
         assert self.agent.status == "initialized"  # Updated to match actual status
         assert self.agent.memory is not None
 
+    def test_ai_components_are_created_on_first_use(self):
+        """Test that the chat model and vector store are only built when used."""
+        self.mock_chat_model_class.assert_not_called()
+        self.mock_vector_store_class.assert_not_called()
+
+        assert self.agent.chat_model is self.mock_chat_model
+        assert self.agent.chat_model is self.mock_chat_model
+        self.mock_chat_model_class.assert_called_once()
+        self.mock_vector_store_class.assert_not_called()
+
+        self.agent.close()
+        self.mock_chat_model.close.assert_called_once()
+        self.mock_vector_store.close.assert_not_called()
+
     @patch("os.path.exists")
     def test_can_handle_task(self, mock_exists):
         """Test that the agent can handle valid repository tasks."""
@@ -102,3 +120,271 @@ class TestCodebaseAnalysisAgent:
         assert result["html"] == 1
         assert "css" in result
         assert result["css"] == 1
+
+    def test_aprocess_task_awaits_async_llm(self):
+        """Test that aprocess_task uses the async LLM entry point."""
+        self.mock_chat_model.agenerate_response = AsyncMock(return_value='{"architecture": "MVC"}')
+        task = {
+            "type": "codebase_analysis",
+            "repository_id": "test-repo-123",
+            "file_paths": ["app.py", "models.py"],
+            "file_contents": {"app.py": "import flask", "models.py": "class User: pass"},
+        }
+
+        result = asyncio.run(self.agent.aprocess_task(task))
+
+        assert result["primary_language"] == "python"
+        assert result["ai_insights"] == {"architecture": "MVC"}
+        self.mock_chat_model.agenerate_response.assert_awaited_once()
+        self.mock_chat_model.generate_response.assert_not_called()
+        assert self.agent.status == "completed"
+
+    def test_process_batch_shares_one_llm_round(self):
+        """Test that a batch asks for every task's AI insights in one call."""
+        self.mock_chat_model.generate_responses.return_value = [
+            '{"architecture": "MVC"}',
+            "plain text",
+        ]
+        tasks = [
+            {
+                "type": "codebase_analysis",
+                "repository_id": f"repo-{i}",
+                "file_paths": ["app.py"],
+                "file_contents": {"app.py": f"import flask  # {i}"},
+            }
+            for i in range(2)
+        ]
+        tasks.insert(1, {"type": "codebase_analysis"})
+
+        first, failed, second = self.agent.process_batch(tasks)
+
+        assert first["ai_insights"] == {"architecture": "MVC"}
+        assert second["ai_insights"] == {"raw_insights": "plain text"}
+        assert isinstance(failed, Exception)
+        self.mock_chat_model.create_chain.assert_called_once()
+        self.mock_chat_model.generate_responses.assert_called_once()
+        assert len(self.mock_chat_model.generate_responses.call_args[0][1]) == 2
+        self.mock_chat_model.generate_response.assert_not_called()
+
+    def test_path_index_is_reused_until_paths_change(self):
+        """Test that representative files come from one index per repository."""
+        self.mock_chat_model.generate_response.return_value = "{}"
+        file_contents = {
+            "lib/helpers.py": "def helper(): pass",
+            "project/settings.py": "DEBUG = True",
+            "project/test_settings.py": "DEBUG = False",
+            "project/urls.py": "urlpatterns = []",
+        }
+        task = {
+            "type": "codebase_analysis",
+            "repository_id": "indexed-repo",
+            "file_paths": list(file_contents),
+            "file_contents": file_contents,
+        }
+
+        with patch(
+            "agents.implementations.codebase_analysis_agent.PathIndex", wraps=PathIndex
+        ) as index_class:
+            self.agent.process_task(task)
+            self.agent.process_task(dict(task))
+            assert index_class.call_count == 1
+
+            # New paths update the kept index instead of rebuilding it
+            file_contents["project/views.py"] = "def index(): pass"
+            task["file_paths"] = list(file_contents)
+            self.agent.process_task(task)
+            assert index_class.call_count == 1
+            _, path_index = self.agent._path_indexes["indexed-repo"]
+            assert "project/views.py" in list(path_index.files("python"))
+
+        # Priority patterns match at segment starts, so test_settings.py is not a settings file
+        path_index = PathIndex((path, "python") for path in file_contents)
+        selected = self.agent._select_representative_files(
+            file_contents, "python", max_files=3, path_index=path_index
+        )
+        assert list(selected) == ["project/settings.py", "project/urls.py", "project/views.py"]
+
+    def test_incremental_analysis_rescans_only_changed_files(self):
+        """Test that a second run only rescans changed files and matches a full run."""
+        self.agent.ai_enabled = False
+        file_contents = {
+            "app.py": "from flask import Flask\n@app.route('/')",
+            "models.py": "import django",
+            "util.py": "def helper(): pass",
+        }
+        task = {
+            "type": "codebase_analysis",
+            "repository_id": "test-repo-123",
+            "file_paths": list(file_contents),
+            "file_contents": file_contents,
+        }
+        self.agent.process_task(task)
+
+        file_contents = {**file_contents, "models.py": "import torch", "new.py": "import flask"}
+        del file_contents["util.py"]
+        task.update(file_paths=list(file_contents), file_contents=file_contents)
+        result = self.agent.process_task(task)
+
+        assert result["changes"] == {"added": 1, "modified": 1, "removed": 1, "unchanged": 1}
+        assert result["languages"] == {"python": 3}
+        assert result["frameworks"] == self.agent.detect_frameworks(file_contents, "python")
+
+    def test_agents_share_results_through_knowledge_store(self):
+        """Test that a second agent reuses the first agent's analysis of a commit."""
+        orchestrator = Orchestrator()
+        orchestrator.register_agent_class("codebase_analysis", CodebaseAnalysisAgent)
+        first = orchestrator.create_agent("codebase_analysis", "first", {"ai_enabled": False})
+        second = orchestrator.create_agent("codebase_analysis", "second", {"ai_enabled": False})
+        task = {
+            "type": "codebase_analysis",
+            "repository_id": "test-repo-123",
+            "commit": "abc123",
+            "file_paths": ["app.py", "requirements.txt"],
+            "file_contents": {"app.py": "import flask", "requirements.txt": "flask\n"},
+        }
+        expected = first.process_task(dict(task))
+
+        with patch.object(second, "extract_dependencies") as extract_dependencies:
+            result = second.process_task(dict(task))
+
+        extract_dependencies.assert_not_called()
+        assert result["changes"] == {"added": 0, "modified": 0, "removed": 0, "unchanged": 2}
+        assert result["dependencies"] == expected["dependencies"] == {"production": ["flask"]}
+        assert result["frameworks"] == expected["frameworks"]
+
+    def test_analysis_state_persists_to_disk(self, tmp_path):
+        """Test that analysis state is reloaded from analysis_state_dir."""
+        config = {"ai_enabled": False, "analysis_state_dir": str(tmp_path)}
+        task = {
+            "type": "codebase_analysis",
+            "repository_id": "test-repo-123",
+            "file_paths": ["app.py"],
+            "file_contents": {"app.py": "import flask"},
+        }
+        CodebaseAnalysisAgent(name="first", config=config).process_task(dict(task))
+
+        result = CodebaseAnalysisAgent(name="second", config=config).process_task(dict(task))
+
+        assert result["changes"]["unchanged"] == 1
+        assert result["frameworks"] == {"flask": 1.0}
+
+    def test_analysis_state_is_live_and_saved_only_when_changed(self, tmp_path):
+        """Test that runs share one state object and unchanged runs write nothing."""
+        orchestrator = Orchestrator()
+        orchestrator.register_agent_class("codebase_analysis", CodebaseAnalysisAgent)
+        agent = orchestrator.create_agent(
+            "codebase_analysis",
+            "live",
+            {"ai_enabled": False, "analysis_state_dir": str(tmp_path)},
+        )
+        task = {
+            "type": "codebase_analysis",
+            "repository_id": "live-repo",
+            "file_paths": ["app.py"],
+            "file_contents": {"app.py": "import flask"},
+        }
+
+        with patch.object(agent, "_save_analysis_state", wraps=agent._save_analysis_state) as save:
+            agent.process_task(dict(task))
+            agent.process_task(dict(task))
+            assert save.call_count == 1
+
+            task["file_contents"] = {"app.py": "import django"}
+            result = agent.process_task(dict(task))
+            assert save.call_count == 2
+
+        assert result["changes"]["modified"] == 1
+        assert result["frameworks"] == {"django": 1.0}
+        with patch.object(agent, "_load_analysis_state") as load:
+            with agent._open_analysis_state("live-repo") as first:
+                pass
+            with agent._open_analysis_state("live-repo") as second:
+                assert second is first
+        load.assert_not_called()
+        assert not any(key.startswith("analysis_state") for _, key in agent.knowledge._memory)
+        agent.close()
+
+    def test_streams_repository_checkout(self, tmp_path):
+        """Test analysis of a local checkout without file contents in the task."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "app.py").write_text("from flask import Flask\n")
+        (tmp_path / "requirements.txt").write_text("requests==2.0\n")
+        (tmp_path / "logo.png").write_bytes(b"\x89PNG\0\0")
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "config.py").write_text("import django\n")
+
+        agent = CodebaseAnalysisAgent(name="stream", config={"ai_enabled": False})
+        task = {
+            "type": "codebase_analysis",
+            "repository_id": "test-repo-123",
+            "repository_path": str(tmp_path),
+        }
+        result = agent.process_task(dict(task))
+
+        assert result["file_count"] == 3
+        assert result["languages"] == {"python": 1}
+        assert result["frameworks"] == {"flask": 1.0}
+        assert result["dependencies"] == {"production": ["requests==2.0"]}
+
+        (tmp_path / "src" / "app.py").write_text("import django\n")
+        result = agent.process_task(dict(task))
+
+        assert result["changes"] == {"added": 0, "modified": 1, "removed": 0, "unchanged": 1}
+        assert result["frameworks"] == {"django": 1.0}
+
+    def test_parallel_scan_matches_sequential_scan(self, tmp_path):
+        """Test that sharding files across a process pool gives identical results."""
+        file_contents = {
+            f"src/module_{i}.py": ("import flask\n" if i % 3 else "import django\n") * (i % 4)
+            for i in range(40)
+        }
+        for path, content in file_contents.items():
+            (tmp_path / path).parent.mkdir(exist_ok=True)
+            (tmp_path / path).write_text(content)
+
+        tasks = [
+            {"file_paths": list(file_contents) + ["README"], "file_contents": file_contents},
+            {"repository_path": str(tmp_path)},
+        ]
+        for task in tasks:
+            task["type"] = "codebase_analysis"
+            sequential = CodebaseAnalysisAgent(name="sequential", config={"ai_enabled": False})
+            parallel = CodebaseAnalysisAgent(
+                name="parallel",
+                config={"ai_enabled": False, "scan_workers": 2, "parallel_scan_min_files": 1},
+            )
+            try:
+                expected = sequential.process_task(dict(task))
+                result = parallel.process_task(dict(task))
+                assert {**result, "timestamp": None} == {**expected, "timestamp": None}
+                assert parallel._parallel_scanner is not None
+            finally:
+                parallel._parallel_scanner.close()
+
+
+class TestCodebaseAnalysisAgentPickling:
+    """Test pickling an agent with real AI clients, as process mode does."""
+
+    def test_warmed_up_agent_pickles(self, tmp_path, monkeypatch):
+        """Test that a warmed-up agent pickles and rebuilds its clients on first use."""
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.chdir(tmp_path)
+        agent = CodebaseAnalysisAgent(
+            name="pickled",
+            config={
+                "response_cache_path": str(tmp_path / "llm_cache.sqlite3"),
+                "embedding_cache_path": str(tmp_path / "embedding_cache"),
+            },
+        )
+        agent.warm_up()
+        agent.error_sink
+
+        copy = pickle.loads(pickle.dumps(agent))
+        try:
+            assert copy._chat_model is None and copy._vector_store is None
+            assert copy._shared_clients == []
+            assert copy.chat_model is not None
+            assert copy._shared_clients
+        finally:
+            copy.close()
+            agent.close()
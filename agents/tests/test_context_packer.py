@@ -0,0 +1,74 @@
+"""Unit tests for the context packer."""
+
+from agents.implementations.context_packer import (
+    ContextPacker,
+    _ApproximateEncoding,
+    strip_boilerplate,
+    token_budget,
+)
+
+LICENSE = "# Copyright (c) Example Corp.\n# Licensed under the MIT License.\n\n"
+
+
+def module(name: str, functions: int) -> str:
+    """A Python module defining numbered functions."""
+    body = "".join(
+        f"def {name}_{i}(value):\n    return value * {i} + len('{name}')\n\n\n"
+        for i in range(functions)
+    )
+    return LICENSE + body
+
+
+class TestContextPacker:
+    """Test class for the ContextPacker."""
+
+    def setup_method(self, method):
+        """Set up an encoding that works without downloading tiktoken data."""
+        self.encoding = _ApproximateEncoding()
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text))
+
+    def test_strip_boilerplate(self):
+        """Test that license headers and blank-line runs are removed."""
+        content = "/*\n * License\n */\n\n<?php\n\n\n\nclass A {}\n"
+        assert strip_boilerplate(content) == "<?php\n\nclass A {}"
+        assert strip_boilerplate(module("x", 1)).startswith("def x_0")
+        assert strip_boilerplate("# only a comment\n") == ""
+
+    def test_fills_budget(self):
+        """Test that files are packed whole while they fit and the last is cut to the budget."""
+        packer = ContextPacker(400, self.encoding)
+        files = {"app.py": module("app", 3), "big.py": module("big", 50)}
+
+        packed = packer.pack(files, priority_paths=["app.py"])
+
+        assert packed.paths == ["app.py", "big.py"]
+        assert packed.tokens == self.count(packed.text)
+        assert 390 <= packed.tokens <= 400
+        assert "Copyright" not in packed.text
+        assert packed.snippets[0].count("def app_") == 3
+        assert packed.snippets[1].endswith("... [truncated]\n```\n")
+
+    def test_skips_near_duplicates_and_ranks_priority_files(self):
+        """Test that copies are skipped and priority files come first."""
+        packer = ContextPacker(2000, self.encoding)
+        copy = module("util", 5).replace("value * 4", "value * 40")
+        files = {
+            "util.py": module("util", 5),
+            "vendor/util.py": copy,
+            "models.py": module("model", 2),
+        }
+
+        packed = packer.pack(files, priority_paths=["models.py"])
+
+        assert packed.paths[0] == "models.py"
+        assert len(packed.paths) == 2
+        assert packed.skipped_duplicates == 1
+        assert packed.tokens == self.count(packed.text) < 2000
+
+    def test_model_budgets(self):
+        """Test that the longest matching model prefix sets the budget."""
+        assert token_budget("gpt-4o-mini") == 12000
+        assert token_budget("gpt-4-0613") == 6000
+        assert token_budget("unknown") == 3000
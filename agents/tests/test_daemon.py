@@ -0,0 +1,100 @@
+"""Unit tests for the agent daemon."""
+
+from typing import Any, Dict
+
+from agents.core.base_agent import BaseAgent
+from agents.core.orchestrator import Orchestrator
+from agents.core.queue_backends import SQLiteQueueBackend
+from agents.daemon import AgentDaemon, DaemonClient
+
+
+class EchoAgent(BaseAgent):
+    """Agent that returns its task's payload, or fails on request."""
+
+    handled_task_types = ("echo",)
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        if task.get("fail"):
+            raise ValueError("asked to fail")
+        return {"echo": task["payload"]}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return bool(task.get("type") == "echo")
+
+
+class TestAgentDaemon:
+    """Test class for the AgentDaemon."""
+
+    def _start_daemon(self, socket_path: str) -> AgentDaemon:
+        orchestrator = Orchestrator(max_workers=2)
+        orchestrator.register_agent_class("echo", EchoAgent)
+        orchestrator.create_agent("echo", "echo")
+        daemon = AgentDaemon(orchestrator, socket_path=socket_path)
+        daemon.start()
+        return daemon
+
+    def test_submits_tasks_over_unix_socket(self, tmp_path):
+        """Test that one connection can run several tasks and report failures."""
+        socket_path = str(tmp_path / "agents.sock")
+        daemon = self._start_daemon(socket_path)
+        try:
+            with DaemonClient(socket_path) as client:
+                assert client.request({"op": "ping"}) == {"ok": True}
+                assert client.submit({"type": "echo", "payload": 1}) == {"echo": 1}
+                assert client.submit({"type": "echo", "payload": [2]}) == {"echo": [2]}
+
+                failed = client.request({"task": {"type": "echo", "fail": True}})
+                assert failed["ok"] is False
+                assert failed["error_type"] == "ValueError"
+
+                unroutable = client.request({"task": {"type": "other"}})
+                assert unroutable["error_type"] == "LookupError"
+
+                stats = client.request({"op": "stats"})["stats"]
+                assert stats["tasks_succeeded"] == 2
+                assert stats["agents"] == {"echo": "initialized"}
+        finally:
+            daemon.shutdown()
+
+        assert not (tmp_path / "agents.sock").exists()
+
+    def test_rejects_malformed_requests(self, tmp_path):
+        """Test that malformed requests get an error without closing the connection."""
+        socket_path = str(tmp_path / "agents.sock")
+        daemon = self._start_daemon(socket_path)
+        try:
+            with DaemonClient(socket_path) as client:
+                client._socket.sendall(b"not json\n")
+                assert client._reader.readline().startswith(b'{"ok": false')
+                assert client.request({"op": "bogus"})["ok"] is False
+                assert client.request({"op": "submit"})["ok"] is False
+                assert client.request({"op": "ping"}) == {"ok": True}
+        finally:
+            daemon.shutdown()
+
+    def test_rejects_pending_task_id(self, tmp_path):
+        """Test that reusing the id of a pending task is an error, not a lost future."""
+        orchestrator = Orchestrator(max_workers=1)
+        orchestrator.register_agent_class("echo", EchoAgent)
+        orchestrator.create_agent("echo", "echo")
+        daemon = AgentDaemon(orchestrator, socket_path=str(tmp_path / "agents.sock"))
+        request = {"task": {"type": "echo", "id": 7}, "wait": False}
+
+        assert daemon.handle_request(request) == {"ok": True, "id": 7}
+        duplicate = daemon.handle_request({"task": {"type": "echo", "id": 7}})
+        assert duplicate["ok"] is False
+        assert duplicate["error_type"] == "ValueError"
+
+    def test_reports_enqueue_failures_and_keeps_trace_dir(self, tmp_path):
+        """Test that failed submits get an error reply and trace files cannot be redirected."""
+        orchestrator = Orchestrator(queue_backend=SQLiteQueueBackend(str(tmp_path / "q.sqlite3")))
+        orchestrator.register_agent_class("echo", EchoAgent)
+        orchestrator.create_agent("echo", "echo")
+        daemon = AgentDaemon(orchestrator, socket_path=str(tmp_path / "agents.sock"))
+
+        failed = daemon.handle_request({"task": {"type": "echo", "id": 1, "payload": b"raw"}})
+        assert (failed["ok"], failed["error_type"], failed["id"]) == (False, "TypeError", 1)
+
+        redirect = {"op": "trace", "settings": {"output_dir": str(tmp_path / "elsewhere")}}
+        assert daemon.handle_request(redirect)["ok"] is False
+        assert orchestrator.tracer.output_dir is None
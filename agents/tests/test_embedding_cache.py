@@ -0,0 +1,87 @@
+"""Unit tests for the embedding cache."""
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agents.core.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that record every embedded text."""
+
+    calls: list = []
+
+    def embed_documents(self, texts):
+        self.calls.extend(texts)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return super().embed_query(text)
+
+
+class TestEmbeddingCache:
+    """Test class for the EmbeddingCache and CachedEmbeddings."""
+
+    def test_serves_repeated_texts_from_cache(self):
+        """Test that only unseen texts reach the wrapped model."""
+        model = CountingEmbeddings(size=4, calls=[])
+        embeddings = CachedEmbeddings(model, EmbeddingCache(max_entries=10))
+
+        first = embeddings.embed_documents(["a", "b", "a"])
+        second = embeddings.embed_documents(["b", "c"])
+        query = embeddings.embed_query("a")
+
+        assert model.calls == ["a", "b", "c", "a"]
+        assert first[0] == first[2] and second[0] == first[1]
+        assert embeddings.embed_query("a") == query
+        assert embeddings.cache.stats()["hits"] == 2
+
+    def test_evicts_least_recently_used(self):
+        """Test LRU eviction once max_entries vectors are cached."""
+        cache = EmbeddingCache(max_entries=2)
+        cache.set_many([("a", [1.0]), ("b", [2.0])])
+        cache.get_many(["a"])
+        cache.set_many([("c", [3.0])])
+
+        assert cache.get_many(["a", "b", "c"]) == [[1.0], None, [3.0]]
+        assert cache.stats()["evictions"] == 1
+
+    def test_persists_vectors_to_disk(self, tmp_path):
+        """Test that vectors and LRU order survive reopening the cache."""
+        cache = EmbeddingCache(max_entries=2, path=str(tmp_path), namespace="model/v1")
+        cache.set_many([("a", [0.5, 1.5]), ("b", [2.5, 3.5])])
+        cache.get_many(["a"])
+        cache.close()
+
+        reopened = EmbeddingCache(max_entries=2, path=str(tmp_path), namespace="model/v1")
+        reopened.set_many([("c", [4.5, 5.5])])
+
+        assert (tmp_path / "model_v1.f32").stat().st_size == 2 * 2 * 4
+        assert reopened.get_many(["a", "b", "c"]) == [[0.5, 1.5], None, [4.5, 5.5]]
+
+    def test_rejects_other_dimensions(self, tmp_path):
+        """Test that vectors of another dimension are refused, also after reopening."""
+        cache = EmbeddingCache(max_entries=4, path=str(tmp_path))
+        cache.set_many([("a", [1.0, 2.0])])
+
+        with pytest.raises(ValueError):
+            cache.set_many([("b", [1.0, 2.0]), ("c", [1.0, 2.0, 3.0])])
+        assert cache.get_many(["b"]) == [None]
+        cache.close()
+
+        with pytest.raises(ValueError):
+            EmbeddingCache(max_entries=4, path=str(tmp_path)).set_many([("d", [1.0])])
+
+    def test_instances_sharing_files_see_each_others_writes(self, tmp_path):
+        """Test that two caches on the same files do not overwrite each other's rows."""
+        first = EmbeddingCache(max_entries=3, path=str(tmp_path))
+        second = EmbeddingCache(max_entries=3, path=str(tmp_path))
+        first.set_many([("a", [1.0])])
+        assert second.get_many(["a"]) == [[1.0]]
+
+        second.set_many([("b", [2.0])])
+        first.set_many([("c", [3.0])])
+
+        assert first.get_many(["a", "b", "c"]) == [[1.0], [2.0], [3.0]]
+        assert second.get_many(["a", "b", "c"]) == [[1.0], [2.0], [3.0]]
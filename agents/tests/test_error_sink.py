@@ -0,0 +1,91 @@
+"""Unit tests for the error sink."""
+
+import hashlib
+import json
+import sqlite3
+import sys
+from typing import Any, Dict
+
+from agents.core.base_agent import BaseAgent
+from agents.core.error_sink import ErrorSink, snapshot
+
+
+class FailingAgent(BaseAgent):
+    """Agent that only exists to log errors."""
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        raise RuntimeError("failed on purpose")
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return True
+
+
+def big_task() -> Dict[str, Any]:
+    """A task carrying many large files."""
+    contents = {f"src/file_{i}.py": f"print({i})\n" * 10_000 for i in range(1000)}
+    return {"id": 1, "type": "analysis", "file_paths": list(contents), "file_contents": contents}
+
+
+class TestErrorSink:
+    """Test class for the error sink."""
+
+    def test_snapshot_caps_size(self):
+        """Test that long strings become hashes and containers are cut."""
+        task = big_task()
+        capped = snapshot({"task": task})
+
+        contents = capped["task"]["file_contents"]
+        body = task["file_contents"]["src/file_0.py"]
+        assert contents["src/file_0.py"] == {
+            "preview": body[:256],
+            "length": len(body),
+            "blake2b": hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest(),
+        }
+        assert contents["..."] == "980 more items"
+        assert capped["task"]["file_paths"][-1] == "... 980 more items"
+        assert snapshot([[[[["deep"]]]]]) == [[[["<list of 1 items>"]]]]
+        assert len(json.dumps(capped)) < 20_000
+
+    def test_log_error_persists_capped_record(self, tmp_path):
+        """Test that agents store errors asynchronously in the shared error store."""
+        path = str(tmp_path / "errors.sqlite3")
+        first = FailingAgent("first", "failing", {"error_store_path": path})
+        second = FailingAgent("second", "failing", {"error_store_path": path})
+        assert first.error_sink is second.error_sink
+
+        try:
+            first.process_task({})
+        except RuntimeError as e:
+            first.log_error(e, context={"task": big_task()})
+        second.log_error(ValueError("bad input"))
+        sink = first.error_sink
+        sink.flush()
+
+        with sqlite3.connect(path) as connection:
+            rows = connection.execute(
+                "SELECT agent, error_type, record FROM errors ORDER BY id"
+            ).fetchall()
+        assert [row[:2] for row in rows] == [("first", "RuntimeError"), ("second", "ValueError")]
+        record = json.loads(rows[0][2])
+        assert "failed on purpose" in record["traceback"]
+        assert record["context"]["task"]["file_contents"]["..."] == "980 more items"
+        assert len(rows[0][2]) < 20_000
+        assert sink.stats() == {"recorded": 2, "written": 2, "dropped": 0, "pending": 0}
+
+        first.close()
+        second.close()
+        assert [record["agent"] for record in sink.recent()] == ["first", "second"]
+        assert ErrorSink().recent() == []
+
+    def test_records_do_not_keep_large_values(self):
+        """Test that a recorded context holds no reference to its long strings."""
+        sink = ErrorSink()
+        body = "x" * 1_000_000
+        references = sys.getrefcount(body)
+
+        record = sink.record("agent", "test", ValueError("bad"), {"body": body, "raw": b"y" * 1000})
+
+        assert sys.getrefcount(body) == references
+        assert record.to_dict()["context"]["body"]["length"] == 1_000_000
+        assert record.to_dict()["context"]["raw"]["length"] == 1000
+        sink.close()
@@ -0,0 +1,54 @@
+"""Unit tests for the framework pattern matcher."""
+
+import re
+
+from agents.implementations.framework_matcher import FrameworkMatcher
+
+PATTERNS = {
+    "php": {"drupal": ["drupal", r"\bDrupal::"], "wordpress": ["wp-", "wp_"]},
+    "python": {"flask": ["flask", "app.route"], "pytorch": ["torch", "nn.Module"]},
+    "javascript": {"react": ["react", "Component"], "node": [r"require\(", "[jt]sx?"]},
+}
+
+CONTENTS = [
+    "Drupal::service('x')",
+    "from flask import Flask\n@app_route('/')",
+    "class Net(nn.Module): pass  # torch",
+    "const x = require('react'); class A extends Component {}",
+    "über wp_query and FLASK",
+    "plain text with nothing to find",
+]
+
+
+def naive_match(content: str, language: str) -> dict:
+    """Reference implementation: search every pattern individually."""
+    hits: dict = {}
+    for framework, patterns in PATTERNS[language].items():
+        count = sum(1 for pattern in patterns if re.search(pattern, content, re.IGNORECASE))
+        if count:
+            hits[framework] = count
+    return hits
+
+
+class TestFrameworkMatcher:
+    """Test class for the FrameworkMatcher."""
+
+    def test_matches_naive_search(self):
+        """Test that the matcher agrees with searching each pattern separately."""
+        matcher = FrameworkMatcher(PATTERNS)
+
+        for content in CONTENTS:
+            all_hits = matcher.match(content)
+            for language in PATTERNS:
+                expected = naive_match(content, language)
+                assert all_hits.get(language, {}) == expected
+                assert matcher.match(content, language).get(language, {}) == expected
+
+    def test_escapes_do_not_prefilter(self):
+        """Test that hex escapes and backreferences do not leave bogus required literals."""
+        patterns = {"text": {"hex": [r"\x41pi::"], "backreference": [r"(ab)\1c"]}}
+        matcher = FrameworkMatcher(patterns)
+
+        assert matcher.match("call Api::get()") == {"text": {"hex": 1}}
+        assert matcher.match("ababc") == {"text": {"backreference": 1}}
+        assert matcher.match("abc") == {}
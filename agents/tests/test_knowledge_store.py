@@ -0,0 +1,40 @@
+"""Unit tests for the shared knowledge store."""
+
+from agents.core.knowledge_store import KnowledgeStore
+
+
+class TestKnowledgeStore:
+    """Test class for the KnowledgeStore."""
+
+    def test_values_are_copies_per_namespace(self):
+        """Test that readers get their own copy and namespaces are separate."""
+        store = KnowledgeStore()
+        namespace = KnowledgeStore.namespace("repo", "abc123")
+        store.set(namespace, "deps", {"production": ["flask"]})
+
+        value = store.get(namespace, "deps")
+        value["production"].append("django")
+
+        assert store.get(namespace, "deps") == {"production": ["flask"]}
+        assert store.get(KnowledgeStore.namespace("repo", "def456"), "deps") is None
+        assert store.get_or_compute(namespace, "other", lambda: [1]) == [1]
+        assert store.get_or_compute(namespace, "other", lambda: [2]) == [1]
+
+        store.clear(namespace)
+        assert store.get(namespace, "deps") is None
+
+    def test_disk_tier_is_shared_and_memory_is_bounded(self, tmp_path):
+        """Test that entries evicted from memory or stored by another store are read from disk."""
+        path = str(tmp_path / "knowledge.sqlite3")
+        writer = KnowledgeStore(max_bytes=100, path=path)
+        writer.set("repo@worktree", "a", "x" * 80)
+        writer.set("repo@worktree", "b", "y" * 80)
+
+        assert writer.stats()["memory_entries"] == 1
+        assert writer.get("repo@worktree", "a") == "x" * 80
+        assert writer.stats()["disk_hits"] == 1
+
+        reader = KnowledgeStore(path=path)
+        assert reader.get("repo@worktree", "b") == "y" * 80
+        writer.close()
+        reader.close()
@@ -0,0 +1,103 @@
+"""Unit tests for the LangChain wrapper."""
+
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from agents.core.embedding_cache import EmbeddingCache
+from agents.core.langchain_wrapper import TekoVectorStore
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that record the size of every embedding request."""
+
+    requests: list = []
+
+    def embed_documents(self, texts):
+        self.requests.append(len(texts))
+        return super().embed_documents(texts)
+
+
+class TestTekoVectorStore:
+    """Test class for the TekoVectorStore."""
+
+    def setup_method(self):
+        """Set up an in-memory vector store with counting embeddings."""
+        self.embeddings = CountingEmbeddings(size=8, requests=[])
+        self.inner = InMemoryVectorStore(self.embeddings)
+
+    def make_store(self) -> TekoVectorStore:
+        """Create a wrapper around the shared in-memory store."""
+        return TekoVectorStore(
+            "test", batch_size=2, embeddings=self.embeddings, vectorstore=self.inner
+        )
+
+    def test_ingests_in_batches_with_stable_ids(self):
+        """Test that texts are embedded in batches and IDs depend only on content."""
+        store = self.make_store()
+        texts = ["a", "b", "c", "a", "d"]
+
+        ids = store.ingest_texts(texts, [{"path": text} for text in texts])
+
+        assert self.embeddings.requests == [2, 2]
+        assert ids[0] == ids[3] == TekoVectorStore.document_id("a", {"path": "a"})
+        assert len(self.inner.store) == 4
+
+    def test_reindexing_unchanged_content_makes_no_embedding_calls(self):
+        """Test that stored texts are skipped, also by a new wrapper instance."""
+        documents = [Document(page_content=f"chunk {i}", metadata={"i": i}) for i in range(5)]
+        first_ids = self.make_store().add_documents(documents)
+        self.embeddings.requests.clear()
+
+        store = self.make_store()
+        assert store.add_documents(documents) == first_ids
+        assert store.add_documents(documents) == first_ids
+        assert self.embeddings.requests == []
+
+        store.add_texts(["new chunk"])
+        assert self.embeddings.requests == [1]
+
+    def test_known_ids_are_bounded(self):
+        """Test that forgotten IDs are looked up in the store instead of embedded again."""
+        store = self.make_store()
+        store.MAX_KNOWN_IDS = 3
+        texts = [f"chunk {i}" for i in range(5)]
+
+        store.add_texts(texts)
+        assert len(store._known_ids) == 3
+        self.embeddings.requests.clear()
+
+        store.add_texts(texts)
+        assert self.embeddings.requests == []
+        assert len(store._known_ids) == 3
+
+    def test_rejects_mismatched_metadatas(self):
+        """Test that metadatas must match the texts one to one."""
+        store = self.make_store()
+
+        with pytest.raises(ValueError):
+            store.add_texts(["a", "b"], [{"path": "a"}])
+        assert self.embeddings.requests == []
+
+    def test_embedding_cache_covers_queries(self, tmp_path):
+        """Test that repeated queries are embedded once with an embedding cache."""
+        with patch(
+            "agents.core.langchain_wrapper.Chroma",
+            lambda embedding_function, **kwargs: InMemoryVectorStore(embedding_function),
+        ):
+            store = TekoVectorStore(
+                "test",
+                embeddings=self.embeddings,
+                embedding_cache=EmbeddingCache(max_entries=10),
+                persist_directory=str(tmp_path),
+            )
+        store.add_texts(["alpha", "beta"])
+
+        store.similarity_search("alpha", k=1)
+        store.similarity_search("alpha", k=1)
+
+        assert self.embeddings.requests == [2]
+        assert store.embeddings.cache.stats()["hits"] == 1
@@ -0,0 +1,48 @@
+"""Unit tests for the language index."""
+
+import os
+
+from agents.implementations.language_index import LanguageIndex
+
+EXTENSIONS = {
+    "php": [".php"],
+    "blade": [".blade.php"],
+    "typescript": [".ts", ".d.ts"],
+    "javascript": [".js", ".ts"],
+}
+
+FILENAMES = {"dockerfile": ["Dockerfile"], "makefile": ["Makefile"]}
+
+
+def naive_detect(path: str) -> str:
+    """Reference implementation: scan every language's extension list."""
+    ext = os.path.splitext(path)[1].lower()
+    for language, extensions in EXTENSIONS.items():
+        if ext and ext in extensions:
+            return language
+    return None
+
+
+class TestLanguageIndex:
+    """Test class for the LanguageIndex."""
+
+    def test_matches_extension_scan(self):
+        """Test that simple extensions are classified like scanning the lists."""
+        index = LanguageIndex(EXTENSIONS)
+
+        paths = ["a.php", "src/A.PHP", "b.js", "c.ts", "README", ".bashrc", "dir.js/file", "x."]
+        for path in paths:
+            assert index.detect(path) == naive_detect(path)
+
+    def test_compound_extensions_and_filenames(self):
+        """Test that the longest compound extension and exact file names win."""
+        index = LanguageIndex(EXTENSIONS, FILENAMES)
+
+        assert index.detect("views/home.blade.php") == "blade"
+        assert index.detect("views/home.php") == "php"
+        assert index.detect("types/index.d.ts") == "typescript"
+        assert index.detect("d.ts") == "typescript"
+        assert index.detect(".hidden.js") == "javascript"
+        assert index.detect("docker/Dockerfile") == "dockerfile"
+        assert index.detect("makefile") == "makefile"
+        assert index.detect("Makefile.am") is None
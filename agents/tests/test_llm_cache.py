@@ -0,0 +1,65 @@
+"""Unit tests for the LLM response cache."""
+
+from langchain_core.language_models import FakeListLLM
+
+from agents.core.langchain_wrapper import TekoChatModel
+from agents.core.llm_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test class for the ResponseCache."""
+
+    def test_memory_lru_eviction(self):
+        """Test that the memory tier evicts the least recently used entry."""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        assert cache.get("a") == "1"
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.stats()["evictions"] == 1
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """Test that responses are served from disk by a fresh cache."""
+        path = str(tmp_path / "cache.sqlite3")
+        ResponseCache(path=path).set("key", "response")
+
+        cache = ResponseCache(path=path)
+
+        assert cache.get("key") == "response"
+        assert cache.get("key") == "response"
+        stats = cache.stats()
+        assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+    def test_ttl_expiry(self):
+        """Test that expired responses are treated as misses."""
+        cache = ResponseCache(ttl=-1)
+        cache.set("key", "response")
+
+        assert cache.get("key") is None
+
+    def test_chat_model_reuses_cached_response(self):
+        """Test that identical prompts only reach the LLM once."""
+        llm = FakeListLLM(responses=["first", "second", "third"])
+        chat_model = TekoChatModel(model_name="fake", llm=llm, cache=ResponseCache())
+        chain = chat_model.create_chain("Describe {language}")
+
+        assert chat_model.generate_response(chain, language="python") == "first"
+        assert chat_model.generate_response(chain, language="python") == "first"
+        assert chat_model.generate_response(chain, language="php") == "second"
+        assert llm.i == 2
+
+    def test_generate_responses_dedupes_and_caches(self):
+        """Test that a batch sends each distinct uncached prompt to the LLM once."""
+        llm = FakeListLLM(responses=["first", "second", "third"])
+        chat_model = TekoChatModel(model_name="fake", llm=llm, cache=ResponseCache())
+        chain = chat_model.create_chain("Describe {language}")
+        assert chat_model.generate_response(chain, language="python") == "first"
+
+        inputs = [{"language": "php"}, {"language": "python"}, {"language": "php"}]
+        responses = chat_model.generate_responses(chain, inputs, max_concurrency=1)
+
+        assert responses == ["second", "first", "second"]
+        assert llm.i == 2
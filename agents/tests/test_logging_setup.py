@@ -0,0 +1,94 @@
+"""Unit tests for the logging pipeline."""
+
+import io
+import json
+import logging
+import threading
+
+from agents.core.logging_setup import LogPipeline, StructuredFormatter
+
+
+class ThreadRecorder:
+    """Log argument remembering the thread that formatted it."""
+
+    def __init__(self):
+        self.thread = None
+
+    def __str__(self) -> str:
+        self.thread = threading.current_thread().name
+        return "formatted"
+
+
+def make_pipeline(name: str, json_lines: bool = False, **options):
+    """Build a pipeline writing a test logger's records to a string."""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(StructuredFormatter("%(levelname)s %(message)s", json_lines=json_lines))
+    pipeline = LogPipeline([handler], **options)
+
+    logger = logging.getLogger(f"teko.test.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    pipeline.attach(logger)
+    pipeline.start()
+    return pipeline, logger, stream
+
+
+class TestLoggingSetup:
+    """Test class for the logging pipeline."""
+
+    def test_records_are_formatted_on_the_listener(self):
+        """Test that messages, extras and tracebacks reach the stream as JSON lines."""
+        pipeline, logger, stream = make_pipeline("json", json_lines=True)
+        argument = ThreadRecorder()
+        logger.info("Task %s %s", 7, argument, extra={"task_id": 7})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.error("Failed", exc_info=True)
+        pipeline.stop()
+        pipeline.detach(logger)
+
+        first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert first["message"] == "Task 7 formatted"
+        assert first["task_id"] == 7
+        assert argument.thread not in (None, threading.current_thread().name)
+        assert second["level"] == "ERROR"
+        assert "ValueError: boom" in second["exception"]
+
+    def test_rate_limit_suppresses_and_reports(self):
+        """Test that records over a logger's rate are dropped and counted on the next record."""
+        pipeline, logger, stream = make_pipeline("rate", rate=0.0001, burst=3)
+        for i in range(10):
+            logger.info("record %d", i)
+        pipeline.rate_limit._buckets[logger.name][0] = 1.0
+        logger.info("after the burst")
+        pipeline.stop()
+        pipeline.detach(logger)
+
+        lines = stream.getvalue().splitlines()
+        assert lines == [
+            "INFO record 0",
+            "INFO record 1",
+            "INFO record 2",
+            "INFO after the burst (7 earlier records suppressed)",
+        ]
+        assert pipeline.stats() == {"pending": 0, "dropped": 0, "suppressed": 7}
+
+    def test_rate_limit_passes_warnings_and_errors(self):
+        """Test that warnings and errors pass an exhausted bucket without using tokens."""
+        pipeline, logger, stream = make_pipeline("rate-errors", rate=0.0001, burst=1)
+        logger.info("first")
+        logger.info("dropped")
+        logger.error("failure %d", 1)
+        logger.critical("failure %d", 2)
+        logger.info("dropped again")
+        pipeline.stop()
+        pipeline.detach(logger)
+
+        assert stream.getvalue().splitlines() == [
+            "INFO first",
+            "ERROR failure 1 (1 earlier records suppressed)",
+            "CRITICAL failure 2",
+        ]
+        assert pipeline.stats()["suppressed"] == 2
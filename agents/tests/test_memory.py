@@ -0,0 +1,148 @@
+"""Unit tests for the agent memory backends."""
+
+import pickle
+import sys
+import threading
+from typing import Any, Dict
+
+from agents.core.base_agent import BaseAgent
+from agents.core.memory import DictMemory, LRUMemory
+from agents.core.memory import _measure as memory_size
+
+
+class MemoryAgent(BaseAgent):
+    """Minimal agent for exercising the memory helpers."""
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return False
+
+
+class TestLRUMemory:
+    """Test class for the LRUMemory backend."""
+
+    def test_evicts_least_recently_used_within_byte_budget(self):
+        """Test that the byte budget evicts the least recently used entry."""
+        memory = LRUMemory(max_bytes=2500)
+        memory["a"] = "x" * 1000
+        memory["b"] = "y" * 1000
+        assert memory["a"] == "x" * 1000
+
+        memory["c"] = "z" * 1000
+
+        assert "b" not in memory
+        assert memory.get("b") is None
+        assert set(memory) == {"a", "c"}
+        stats = memory.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= 2500
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are not returned."""
+        memory = LRUMemory(ttl=-1)
+        memory["a"] = 1
+
+        assert memory.get("a") is None
+        assert memory.stats()["expirations"] == 1
+
+    def test_spills_evicted_entries_to_disk(self, tmp_path):
+        """Test that evicted entries are read back from the spill database."""
+        memory = LRUMemory(max_entries=1, spill_path=str(tmp_path / "memory.sqlite3"))
+        memory["a"] = {"files": ["a.py"]}
+        memory["b"] = {"files": ["b.py"]}
+
+        assert memory.stats()["spilled_entries"] == 1
+        assert memory["a"] == {"files": ["a.py"]}
+        # Reading "a" back spilled "b" in turn
+        assert memory["b"] == {"files": ["b.py"]}
+        assert len(memory) == 2
+
+        del memory["a"]
+        assert "a" not in memory
+        stats = memory.stats()
+        assert (stats["spills"], stats["spill_hits"]) == (3, 2)
+        memory.close()
+
+    def test_oversized_entry_is_not_kept_in_memory(self):
+        """Test that an entry larger than the budget does not evict the others."""
+        memory = LRUMemory(max_bytes=2000)
+        memory["small"] = "x" * 100
+        memory["large"] = "y" * 5000
+
+        assert memory.get("large") is None
+        assert memory["small"] == "x" * 100
+
+    def test_sizes_are_estimated_or_given(self):
+        """Test that sizes are estimated without pickling and explicit sizes are used as is."""
+        memory = LRUMemory(max_bytes=10_000_000)
+        files = {f"src/file_{i}.py": "x" * 100 for i in range(10_000)}
+        memory["files"] = files
+        memory["lock"] = threading.Lock()
+
+        exact = sys.getsizeof(files) + sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in files.items()
+        )
+        assert abs(memory.stats()["bytes"] - exact) < exact * 0.1
+
+        memory.set("files", files, size=10)
+        memory.set("lock", None, size=20)
+        assert memory.stats()["bytes"] == 30
+
+    def test_nested_values_count_against_the_budget(self, tmp_path):
+        """Test that large values nested in containers are measured and evicted."""
+        memory = LRUMemory(max_bytes=10_000_000, spill_path=str(tmp_path / "memory.sqlite3"))
+        for i in range(5):
+            memory[f"task_{i}"] = {"files": {f"f{j}.py": str(i) * 1_000_000 for j in range(4)}}
+
+        stats = memory.stats()
+        assert stats["bytes"] <= 10_000_000
+        assert stats["evictions"] >= 2 and stats["spills"] == stats["evictions"]
+        assert memory["task_0"]["files"]["f3.py"] == "0" * 1_000_000
+
+        nested = {"a": [[{"body": "x" * 10_000_000}]] * 10}
+        assert 10_000_000 <= memory_size(nested) < 11_000_000
+        memory.close()
+
+    def test_survives_pickling(self, tmp_path):
+        """Test that the memory can be pickled with its entries."""
+        memory = LRUMemory(spill_path=str(tmp_path / "memory.sqlite3"))
+        memory["a"] = [1, 2, 3]
+        memory.stats()
+
+        copy = pickle.loads(pickle.dumps(memory))
+
+        assert copy["a"] == [1, 2, 3]
+        copy["b"] = 4
+        assert copy.get("b") == 4
+
+
+class TestAgentMemory:
+    """Test class for the BaseAgent memory helpers."""
+
+    def test_retrieve_from_memory_returns_none_for_missing_keys(self, tmp_path):
+        """Test that agents keep their store/retrieve semantics on the bounded memory."""
+        agent = MemoryAgent(
+            "memory",
+            "test",
+            {"memory_max_entries": 1, "memory_spill_dir": str(tmp_path)},
+        )
+        agent.store_in_memory("first", {"value": 1})
+        agent.store_in_memory("second", {"value": 2})
+
+        assert agent.retrieve_from_memory("missing") is None
+        assert agent.retrieve_from_memory("first") == {"value": 1}
+        assert agent.retrieve_from_memory("second") == {"value": 2}
+        assert (tmp_path / "memory.sqlite3").exists()
+        agent.close()
+
+    def test_dict_backend(self):
+        """Test that the unbounded dictionary backend can be selected."""
+        agent = MemoryAgent("memory", "test", {"memory_backend": "dict"})
+        agent.store_in_memory("key", "value")
+
+        assert isinstance(agent.memory, DictMemory)
+        assert agent.retrieve_from_memory("key") == "value"
+        assert agent.memory.stats()["hits"] == 1
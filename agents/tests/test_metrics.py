@@ -0,0 +1,70 @@
+"""Unit tests for the orchestrator metrics."""
+
+import urllib.request
+from typing import Any, Dict
+
+from agents.core.base_agent import BaseAgent
+from agents.core.metrics import Histogram
+from agents.core.orchestrator import Orchestrator
+
+
+class FlakyAgent(BaseAgent):
+    """Agent that fails tasks asking for it."""
+
+    handled_task_types = ("flaky",)
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        if task.get("fail"):
+            raise RuntimeError("failed on purpose")
+        return {}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return bool(task.get("type") == "flaky")
+
+
+class TestMetrics:
+    """Test class for the orchestrator metrics."""
+
+    def test_histogram_quantiles(self):
+        """Test that quantiles are estimated by bucket upper bounds."""
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [1, 2, 1]
+        assert histogram.quantile(0.5) == 1.0
+        assert histogram.quantile(1.0) == float("inf")
+        assert Histogram().quantile(0.5) is None
+
+    def test_orchestrator_exports_task_metrics(self):
+        """Test that task outcomes, latencies and queue depth reach the exposition text."""
+        orchestrator = Orchestrator(max_workers=2)
+        orchestrator.register_agent_class("flaky", FlakyAgent)
+        orchestrator.create_agent("flaky", "flaky")
+        orchestrator.add_task({"id": 1, "type": "flaky"}, priority="high")
+        orchestrator.add_task({"id": 2, "type": "flaky", "fail": True})
+        orchestrator.add_task({"id": 3, "type": "unknown"}, priority="low")
+        orchestrator.start()
+        orchestrator.stop(drain=True)
+        orchestrator.add_task({"id": 4, "type": "flaky"}, priority="low")
+
+        server = orchestrator.start_metrics_server(port=0)
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            text = response.read().decode("utf-8")
+        orchestrator.close(timeout=0)
+
+        assert 'teko_tasks_total{agent_type="flaky",priority="high",outcome="completed"} 1' in text
+        assert 'teko_tasks_total{agent_type="flaky",priority="medium",outcome="failed"} 1' in text
+        assert 'teko_tasks_total{agent_type="",priority="low",outcome="unroutable"} 1' in text
+        assert 'teko_task_duration_seconds_count{agent_type="flaky",priority="high"} 1' in text
+        assert (
+            'teko_task_queue_wait_seconds_bucket{agent_type="flaky",priority="medium",le="+Inf"} 1'
+            in text
+        )
+        assert 'teko_queue_depth{priority="low"} 1' in text
+        assert "teko_workers 2" in text
+
+        stats = orchestrator.get_stats()
+        assert stats["latency"]["flaky/high"]["count"] == 1
+        assert stats["queue_depth"] == {"high": 0, "medium": 0, "low": 1}
+        assert stats["tasks_in_flight"] == 0
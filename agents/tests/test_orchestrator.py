@@ -0,0 +1,270 @@
+"""Unit tests for the Orchestrator."""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict
+
+import pytest
+
+from agents.core.base_agent import BaseAgent
+from agents.core.orchestrator import Orchestrator, TaskQueue
+from agents.core.queue_backends import SQLiteQueueBackend
+
+
+class RecordingAgent(BaseAgent):
+    """Agent that sleeps briefly and records how many tasks overlap."""
+
+    handled_task_types = ("record",)
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        with RecordingAgent.lock:
+            RecordingAgent.active += 1
+            RecordingAgent.peak = max(RecordingAgent.peak, RecordingAgent.active)
+        time.sleep(0.05)
+        with RecordingAgent.lock:
+            RecordingAgent.active -= 1
+        return {"id": task["id"]}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return bool(task.get("type") == "record")
+
+
+class AsyncAgent(BaseAgent):
+    """Agent with a native async implementation."""
+
+    handled_task_types = ("async",)
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        raise AssertionError("async mode should call aprocess_task")
+
+    async def aprocess_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        await asyncio.sleep(0.05)
+        return {"id": task["id"]}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return bool(task.get("type") == "async")
+
+
+class BatchAgent(BaseAgent):
+    """Agent recording the batches it is given."""
+
+    handled_task_types = ("batch",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        return self.process_batch([task])[0]
+
+    def process_batch(self, tasks):
+        self.batches.append([task["id"] for task in tasks])
+        return [ValueError("bad") if task.get("fail") else {"id": task["id"]} for task in tasks]
+
+    async def aprocess_batch(self, tasks):
+        return self.process_batch(tasks)
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return bool(task.get("type") == "batch")
+
+
+class TestTaskQueue:
+    """Test class for the TaskQueue."""
+
+    def test_priority_order(self):
+        """Test that tasks are returned by priority, then in insertion order."""
+        task_queue = TaskQueue()
+        task_queue.add_task({"id": "low"}, priority="low")
+        task_queue.add_task({"id": "medium-1"})
+        task_queue.add_task({"id": "high"}, priority="high")
+        task_queue.add_task({"id": "medium-2"}, priority="unknown")
+
+        assert task_queue.depth_by_priority() == {"high": 1, "medium": 2, "low": 1}
+        order = [task_queue.get_next_task()["id"] for _ in range(4)]
+        assert order == ["high", "medium-1", "medium-2", "low"]
+        assert task_queue.get_next_task() is None
+
+    def test_blocking_get_wakes_on_add(self):
+        """Test that a blocked consumer is woken when a task is added."""
+        task_queue = TaskQueue()
+        timer = threading.Timer(0.05, task_queue.add_task, args=({"id": "late"},))
+        timer.start()
+
+        start = time.monotonic()
+        task = task_queue.get(timeout=5.0)
+
+        assert task == {"id": "late"}
+        assert time.monotonic() - start < 1.0
+
+    def test_add_tasks_and_get_many(self):
+        """Test that bulk added tasks come back in batches in priority order."""
+        task_queue = TaskQueue()
+        task_queue.add_tasks([{"id": i} for i in range(5)])
+        task_queue.add_tasks([{"id": "high"}], priority="high")
+
+        assert task_queue.qsize() == 6
+        assert [task["id"] for task in task_queue.get_many(3)] == ["high", 0, 1]
+        assert [task["id"] for task in task_queue.get_many(10)] == [2, 3, 4]
+        assert task_queue.get_many(10, timeout=0.01) == []
+
+
+class TestOrchestrator:
+    """Test class for the Orchestrator."""
+
+    def setup_method(self, method):
+        """Reset the shared agent counters before each test."""
+        RecordingAgent.active = 0
+        RecordingAgent.peak = 0
+
+    def _make_orchestrator(self, **kwargs) -> Orchestrator:
+        orchestrator = Orchestrator(**kwargs)
+        orchestrator.register_agent_class("record", RecordingAgent)
+        orchestrator.create_agent("record", "recorder")
+        return orchestrator
+
+    def test_workers_process_tasks_concurrently(self):
+        """Test that several workers run tasks at the same time."""
+        orchestrator = self._make_orchestrator(max_workers=4)
+        for i in range(8):
+            orchestrator.add_task({"id": i, "type": "record"})
+
+        orchestrator.start()
+        orchestrator.stop(drain=True)
+
+        assert orchestrator.tasks_succeeded == 8
+        assert RecordingAgent.peak > 1
+
+    def test_agent_concurrency_limit(self):
+        """Test that the per agent type concurrency limit is respected."""
+        orchestrator = self._make_orchestrator(max_workers=4, agent_concurrency={"record": 1})
+        for i in range(4):
+            orchestrator.add_task({"id": i, "type": "record"})
+
+        orchestrator.start()
+        orchestrator.stop(drain=True)
+
+        assert orchestrator.tasks_succeeded == 4
+        assert RecordingAgent.peak == 1
+
+    def test_stop_drains_queue(self):
+        """Test that stopping with drain finishes every queued task."""
+        orchestrator = self._make_orchestrator(max_workers=2)
+        orchestrator.start()
+        for i in range(6):
+            orchestrator.add_task({"id": i, "type": "record"})
+
+        orchestrator.stop(drain=True)
+
+        assert orchestrator.task_queue.qsize() == 0
+        assert orchestrator.get_stats()["tasks_processed"] == 6
+
+    def test_submit_resolves_future(self):
+        """Test that submit() futures carry results and routing failures."""
+        orchestrator = self._make_orchestrator()
+        orchestrator.start()
+        try:
+            done = orchestrator.submit({"type": "record"})
+            unroutable = orchestrator.submit({"type": "other"})
+
+            assert done.result(timeout=5) == {"id": done.result()["id"]}
+            assert isinstance(unroutable.exception(timeout=5), LookupError)
+        finally:
+            orchestrator.stop(drain=True)
+
+    def test_submit_rejects_pending_task_id(self):
+        """Test that a task id cannot be submitted again until its task is done."""
+        orchestrator = self._make_orchestrator()
+        first = orchestrator.submit({"type": "record", "id": "task-1"})
+
+        with pytest.raises(ValueError):
+            orchestrator.submit({"type": "record", "id": "task-1"})
+
+        orchestrator.start()
+        try:
+            assert first.result(timeout=5) == {"id": "task-1"}
+            again = orchestrator.submit({"type": "record", "id": "task-1"})
+            assert again.result(timeout=5) == {"id": "task-1"}
+        finally:
+            orchestrator.stop(drain=True)
+        assert orchestrator.get_stats()["tasks_processed"] == 2
+
+    def test_submit_releases_id_when_enqueueing_fails(self, tmp_path):
+        """Test that a task the queue rejects can be submitted again once fixed."""
+        orchestrator = self._make_orchestrator(
+            queue_backend=SQLiteQueueBackend(str(tmp_path / "queue.sqlite3"))
+        )
+
+        with pytest.raises(TypeError):
+            orchestrator.submit({"type": "record", "id": "a", "payload": b"raw"})
+
+        orchestrator.start()
+        try:
+            future = orchestrator.submit({"type": "record", "id": "a", "payload": "text"})
+            assert future.result(timeout=5)["id"] == "a"
+        finally:
+            orchestrator.stop(drain=True, timeout=5)
+
+    def test_routing_prefers_least_loaded_agent(self):
+        """Test that routing spreads tasks over agents of the same type."""
+        orchestrator = self._make_orchestrator()
+        orchestrator.create_agent("record", "recorder_2")
+
+        first = orchestrator._find_agent_for_task({"type": "record"})
+        second = orchestrator._find_agent_for_task({"type": "record"})
+        assert {first.name, second.name} == {"recorder", "recorder_2"}
+
+        orchestrator._release_agent(first)
+        assert orchestrator._find_agent_for_task({"type": "record"}) is first
+
+    def test_routing_ignores_other_task_types(self):
+        """Test that agents are only offered tasks of the types they declare."""
+        orchestrator = self._make_orchestrator()
+
+        assert orchestrator._find_agent_for_task({"type": "other"}) is None
+        assert orchestrator.remove_agent("recorder") is not None
+        assert orchestrator._find_agent_for_task({"type": "record"}) is None
+
+    def test_async_mode_runs_async_and_sync_agents(self):
+        """Test that async mode awaits async agents and bridges sync agents."""
+        orchestrator = self._make_orchestrator(mode="async", max_workers=2)
+        orchestrator.register_agent_class("async", AsyncAgent)
+        orchestrator.create_agent("async", "async_agent")
+
+        tasks = [{"id": i, "type": "async"} for i in range(20)]
+        tasks.append({"id": "sync", "type": "record"})
+        for task in tasks:
+            orchestrator.add_task(task)
+
+        start = time.monotonic()
+        orchestrator.start()
+        orchestrator.stop(drain=True)
+
+        assert orchestrator.tasks_succeeded == 21
+        assert all(task["status"] == "completed" for task in tasks)
+        # The 20 async tasks overlap on the event loop rather than run serially
+        assert time.monotonic() - start < 0.05 * 20
+
+    def test_batches_coalesce_tasks_of_the_same_type(self):
+        """Test that queued tasks of one type reach the agent as batches in both modes."""
+        for mode in ("thread", "async"):
+            orchestrator = Orchestrator(mode=mode, max_workers=1, batch_size=4)
+            orchestrator.register_agent_class("batch", BatchAgent)
+            agent = orchestrator.create_agent("batch", "batcher")
+            tasks = [{"id": i, "type": "batch", "fail": i == 5} for i in range(10)]
+            orchestrator.add_tasks(tasks)
+            orchestrator.add_task({"id": "other", "type": "other"})
+
+            orchestrator.start()
+            orchestrator.stop(drain=True)
+
+            assert agent.batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+            assert orchestrator.tasks_succeeded == 9
+            assert orchestrator.tasks_failed == 2
+            assert tasks[0]["result"] == {"id": 0}
+            assert tasks[5]["status"] == "failed"
+            assert orchestrator.task_queue.qsize() == 0
@@ -0,0 +1,116 @@
+"""Unit tests for the path index."""
+
+import pickle
+
+from agents.implementations.analysis_state import RepositoryAnalysisState
+from agents.implementations.path_index import PathIndex
+
+PATHS = {
+    "config/app.php": "php",
+    "config.php": "php",
+    "src/app_config.php": "php",
+    "app/Http/Controllers/UserController.php": "php",
+    "app/Http/Controllers/Api/TokenController.php": "php",
+    "app/Http/Middleware/Auth.php": "php",
+    "legacy/app/Http/ControllersOld/Base.php": "php",
+    "src/App.js": "javascript",
+    "src/Application.jsx": "javascript",
+    "web/src/App/index.js": "javascript",
+    "README": None,
+}
+
+
+def naive_matches(pattern: str, language: str, paths=PATHS):
+    """Reference implementation: scan every path for the pattern at a segment start."""
+    return [
+        path
+        for path, path_language in paths.items()
+        if path_language == language and ("/" + pattern) in ("/" + path)
+    ]
+
+
+class TestPathIndex:
+    """Test class for the PathIndex."""
+
+    def test_matches_segment_scan(self):
+        """Test that pattern lookups find exactly the paths a full scan finds."""
+        index = PathIndex(PATHS.items())
+        patterns = {
+            "php": ["config", "app/Http/Controllers", "Http/Middleware", "Controllers", "routes"],
+            "javascript": ["src/App", "App", "index.js", "components"],
+        }
+
+        for language, language_patterns in patterns.items():
+            for pattern in language_patterns:
+                found = []
+                while True:
+                    path = index.first_match(pattern, language, lambda p: p not in found)
+                    if path is None:
+                        break
+                    found.append(path)
+                assert sorted(found) == sorted(naive_matches(pattern, language)), pattern
+
+        assert len(index) == 10
+        assert list(index.files("javascript")) == [
+            "src/App.js",
+            "src/Application.jsx",
+            "web/src/App/index.js",
+        ]
+
+    def test_updated_matches_fresh_build(self):
+        """Test that an updated index answers like one built from the new paths."""
+        original = PathIndex(PATHS.items())
+        changed = dict(PATHS)
+        del changed["config/app.php"]
+        changed["src/App.js"] = None
+        changed["app/Http/Controllers/AdminController.php"] = "php"
+        changed["config/cache/store.php"] = "php"
+
+        updated = original.updated(changed)
+        fresh = PathIndex(changed.items())
+        journaled = original.updated(changed, ["config/app.php", "src/App.js", "README"])
+
+        assert len(journaled) == 8
+        assert journaled.first_match("config", "php") == "config.php"
+
+        assert original.updated(PATHS) is original
+        assert original.first_match("config", "php") == "config.php"
+        for pattern, language in [
+            ("config", "php"),
+            ("app/Http/Controllers", "php"),
+            ("cache", "php"),
+            ("src/App", "javascript"),
+        ]:
+            found = []
+            while True:
+                path = updated.first_match(pattern, language, lambda p: p not in found)
+                if path is None:
+                    break
+                found.append(path)
+            expected = naive_matches(pattern, language, changed)
+            assert sorted(found) == sorted(expected), pattern
+            assert fresh.first_match(pattern, language) == updated.first_match(pattern, language)
+        assert len(updated) == len(fresh) == 10
+
+    def test_paths_version_tracks_path_changes(self):
+        """Test that the version changes with the path set and survives pickling."""
+        state = RepositoryAnalysisState()
+        state.set_path("a.py", "python")
+        version = state.paths_version
+
+        state.set_path("a.py", "python")
+        state.set_file("a.py", "hash", {})
+        assert state.paths_version == version
+        assert pickle.loads(pickle.dumps(state)).paths_version == version
+
+        state.set_path("b.py", "python")
+        state.set_path("a.py", None)
+        assert state.paths_version != version
+        assert state.paths_changed_since(version) == ["b.py", "a.py"]
+        assert state.paths_changed_since(state.paths_version) == []
+
+        previous, version = version, state.paths_version
+        state.remove_path("b.py")
+        assert state.paths_version != version
+        assert state.paths_changed_since(version) == ["b.py"]
+        assert state.paths_changed_since(previous) is None
@@ -0,0 +1,114 @@
+"""Unit tests for task tracing and profiling."""
+
+import os
+import time
+from typing import Any, Dict
+
+from agents.core.base_agent import BaseAgent
+from agents.core.orchestrator import Orchestrator
+from agents.core.profiling import Tracer, span
+from agents.implementations.codebase_analysis_agent import CodebaseAnalysisAgent
+
+
+class PhasedAgent(BaseAgent):
+    """Agent that marks two nested phases."""
+
+    handled_task_types = ("phased",)
+
+    def process_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        with self.span("outer"):
+            with self.span("inner"):
+                time.sleep(task.get("sleep", 0))
+        return {}
+
+    def can_handle_task(self, task: Dict[str, Any]) -> bool:
+        return bool(task.get("type") == "phased")
+
+
+def run_tasks(tracer: Tracer, *tasks: Dict[str, Any], mode: str = "thread") -> None:
+    """Run tasks on a PhasedAgent through an orchestrator using the tracer."""
+    orchestrator = Orchestrator(mode=mode, poll_timeout=0.05, tracer=tracer)
+    orchestrator.register_agent_class("phased", PhasedAgent)
+    orchestrator.create_agent("phased", "phased")
+    for task in tasks:
+        orchestrator.add_task(task)
+    orchestrator.start()
+    orchestrator.close()
+
+
+class TestProfiling:
+    """Test class for task tracing and profiling."""
+
+    def test_disabled_tracer_records_nothing(self):
+        """Test that spans are no-ops outside traced tasks and disabled tracers record nothing."""
+        assert span("phase") is span("other")
+
+        tracer = Tracer()
+        assert tracer.trace_task(PhasedAgent("a", "phased"), {}) is span("phase")
+        run_tasks(tracer, {"id": 1, "type": "phased"})
+        assert tracer.traces() == []
+
+    def test_traces_nested_spans_as_collapsed_stacks(self, tmp_path):
+        """Test that task phases are recorded per task and written as collapsed stacks."""
+        tracer = Tracer(enabled=True, output_dir=str(tmp_path))
+        run_tasks(tracer, {"id": 1, "type": "phased"}, {"id": 2, "type": "phased"})
+        tracer.configure(enabled=False)
+        run_tasks(tracer, {"id": 3, "type": "phased"})
+
+        traces = tracer.traces()
+        assert [trace.task_id for trace in traces] == [1, 2]
+        stacks = [line.rsplit(" ", 1)[0] for line in traces[0].collapsed().splitlines()]
+        assert sorted(stacks) == ["phased", "phased;outer", "phased;outer;inner"]
+        assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in tracer.collapsed().splitlines())
+
+        with open(tmp_path / "phased-1.folded", encoding="utf-8") as handle:
+            assert handle.read() == traces[0].collapsed()
+
+    def test_async_tasks_are_traced(self):
+        """Test that spans of tasks run on the event loop's executor reach their trace."""
+        tracer = Tracer(enabled=True, profile_sample_rate=1.0, slow_task_seconds=0)
+        run_tasks(tracer, {"id": 1, "type": "phased"}, mode="async")
+
+        (trace,) = tracer.traces()
+        assert "phased;outer;inner" in trace.collapsed()
+        assert trace.profile is None
+
+    def test_profiles_only_slow_sampled_tasks(self, tmp_path):
+        """Test that sampled tasks keep their cProfile statistics only when slow."""
+        tracer = Tracer(
+            enabled=True,
+            profile_sample_rate=1.0,
+            slow_task_seconds=0.05,
+            output_dir=str(tmp_path),
+        )
+        run_tasks(
+            tracer, {"id": "fast", "type": "phased"}, {"id": "slow", "type": "phased", "sleep": 0.1}
+        )
+
+        fast, slow = tracer.traces()
+        assert fast.profile is None
+        assert "sleep" in slow.profile_text()
+        assert os.path.exists(tmp_path / "phased-slow.pstats")
+        assert slow.to_dict()["profiled"] is True
+
+    def test_codebase_analysis_phases(self):
+        """Test that the codebase analysis agent marks its analysis phases."""
+        agent = CodebaseAnalysisAgent(name="traced", config={"ai_enabled": False})
+        task = {
+            "id": 1,
+            "type": "codebase_analysis",
+            "file_paths": ["app.py", "requirements.txt"],
+            "file_contents": {"app.py": "from flask import Flask\n", "requirements.txt": "flask\n"},
+        }
+
+        tracer = Tracer(enabled=True)
+        with tracer.trace_task(agent, task) as trace:
+            agent.process_task(task)
+
+        stacks = {line.rsplit(" ", 1)[0] for line in trace.collapsed().splitlines()}
+        assert {
+            "codebase_analysis;load_state",
+            "codebase_analysis;scan;scan_files",
+            "codebase_analysis;frameworks",
+            "codebase_analysis;dependencies",
+        } <= stacks
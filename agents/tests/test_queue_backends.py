@@ -0,0 +1,65 @@
+"""Unit tests for the task queue backends."""
+
+import time
+
+import pytest
+
+from agents.core.orchestrator import TaskQueue
+from agents.core.queue_backends import QUEUE_ATTEMPTS_KEY, SQLiteQueueBackend
+
+
+class TestSQLiteQueueBackend:
+    """Test class for the SQLiteQueueBackend."""
+
+    def test_priority_order_and_batches(self, tmp_path):
+        """Test that tasks come back in priority order, singly and in batches."""
+        backend = SQLiteQueueBackend(str(tmp_path / "queue.sqlite3"))
+        backend.put_many([({"id": "low"}, 2), ({"id": "medium"}, 1)])
+        backend.put({"id": "high"}, 0)
+
+        assert backend.depth() == {0: 1, 1: 1, 2: 1}
+        assert backend.get(block=False)["id"] == "high"
+        assert [task["id"] for task in backend.get_many(5, block=False)] == ["medium", "low"]
+        assert backend.get(block=False) is None
+
+    def test_tasks_survive_restart(self, tmp_path):
+        """Test that pending tasks are still queued after reopening the database."""
+        path = str(tmp_path / "queue.sqlite3")
+        TaskQueue(backend=SQLiteQueueBackend(path)).add_task({"id": "pending"})
+
+        task_queue = TaskQueue(backend=SQLiteQueueBackend(path))
+
+        assert task_queue.qsize() == 1
+        task = task_queue.get_next_task()
+        assert task["id"] == "pending"
+        task_queue.task_done(task)
+        assert task_queue.join(timeout=0)
+        assert task_queue.backend.unacknowledged() == 0
+
+    def test_unserializable_task_is_not_counted(self, tmp_path):
+        """Test that a task the backend rejects leaves the unfinished count unchanged."""
+        task_queue = TaskQueue(backend=SQLiteQueueBackend(str(tmp_path / "queue.sqlite3")))
+
+        with pytest.raises(TypeError):
+            task_queue.add_task({"id": "bytes", "payload": b"raw"})
+        with pytest.raises(TypeError):
+            task_queue.add_tasks([{"id": "ok"}, {"id": "bytes", "payload": b"raw"}])
+
+        assert task_queue.qsize() == 0
+        assert task_queue.join(timeout=0)
+
+    def test_unacknowledged_tasks_are_redelivered(self, tmp_path):
+        """Test at-least-once delivery once the visibility timeout expires."""
+        backend = SQLiteQueueBackend(str(tmp_path / "queue.sqlite3"), visibility_timeout=0.1)
+        backend.put({"id": "flaky"}, 1)
+
+        first = backend.get(block=False)
+        assert backend.get(block=False) is None
+
+        time.sleep(0.15)
+        second = backend.get(timeout=1.0)
+
+        assert second["id"] == first["id"]
+        assert second[QUEUE_ATTEMPTS_KEY] == 2
+        backend.ack(second)
+        assert backend.unacknowledged() == 0
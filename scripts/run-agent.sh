@@ -5,16 +5,16 @@ set -e
 if [ -f /.dockerenv ]; then
     # Check if virtual environment exists in Docker
     if [ -d "/var/www/agents/.venv" ]; then
-        echo "Using Docker virtual environment"
+        echo "Using Docker virtual environment" >&2
         PYTHON="/var/www/agents/.venv/bin/python"
     else
-        echo "Using system Python in Docker"
+        echo "Using system Python in Docker" >&2
         PYTHON="python3"
     fi
 else
     # Check if we have a virtual environment
     if [ -d "./agents/.venv" ]; then
-        echo "Using local virtual environment"
+        echo "Using local virtual environment" >&2
         PYTHON="./agents/.venv/bin/python"
     else
         echo "Virtual environment not found, please run 'make setup-python-env'"
@@ -24,13 +24,16 @@ fi
 
 # Check if we have an agent name
 if [ -z "$1" ]; then
-    echo "Usage: $0 <agent_name>"
+    echo "Usage: $0 <agent_name> [args...]"
+    echo "       $0 daemon serve [--agent TYPE[=COUNT]] [--config FILE]"
+    echo "       $0 daemon submit '<task json>'"
     exit 1
 fi
 
 AGENT_NAME=$1
 shift
 
-# Run the agent
+# Run the agent. "daemon serve" keeps agents warm behind a Unix socket
+# ($TEKO_AGENT_SOCKET); "daemon submit" then runs tasks without a cold start.
 cd agents
 $PYTHON -m agents.$AGENT_NAME "$@"